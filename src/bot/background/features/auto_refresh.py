@@ -1,26 +1,50 @@
+import heapq
+
 import disnake
 import pendulum as pend
 from disnake.ext import commands
 
 from classes.bot import CustomClient
+from utility.concurrency import bounded_gather
+from utility.tenure import next_change, tenure_months, tenure_role_changes
+
+
+TENURE_EDIT_CONCURRENCY = 5
 
 
 class AutoEvalBackground(commands.Cog):
     def __init__(self, bot: CustomClient):
         self.bot = bot
+        # (due timestamp, guild id, member id, guild generation), members whose tenure role changes at that time
+        self.tenure_due: list[tuple[float, int, int, int]] = []
+        # guild id -> status roles the guild's members were scheduled with, a change rescans the guild
+        self.tenure_configs: dict[int, list[dict]] = {}
+        self.tenure_generation: dict[int, int] = {}
         self.bot.scheduler.add_job(self.status_roles, 'interval', minutes=60)
 
-    async def status_roles(self):
-        servers_with_status_roles = await self.bot.server_db.find({'status_roles.discord': {'$exists': True, '$ne': {}}}).to_list(length=None)
+    @commands.Cog.listener()
+    async def on_member_join(self, member: disnake.Member):
+        if member.guild.id in self.tenure_configs and not member.bot:
+            heapq.heappush(self.tenure_due, (0, member.guild.id, member.id, self.tenure_generation.get(member.guild.id, 0)))
 
-        for server_config in servers_with_status_roles:
-            if server_config.get('server') not in self.bot.OUR_GUILDS:
+    async def status_roles(self):
+        """Applies tenure roles to members that crossed a threshold, guilds are only scanned when their roles change"""
+        servers_with_status_roles = await self.bot.server_db.find(
+            {'server': {'$in': list(self.bot.OUR_GUILDS)}, 'status_roles.discord': {'$exists': True, '$ne': []}},
+            {'_id': 0, 'server': 1, 'status_roles.discord': 1},
+        ).to_list(length=None)
+        configs = {server_config.get('server'): server_config.get('status_roles', {}).get('discord', []) for server_config in servers_with_status_roles}
+        now = pend.now(tz=pend.UTC)
+
+        members: list[disnake.Member] = []
+        for guild_id, status_roles in list(configs.items()):
+            if self.tenure_configs.get(guild_id) == status_roles:
                 continue
-
-            status_roles = server_config.get('status_roles', {}).get('discord', [])
-
-            guild = await self.bot.getch_guild(guild_id=server_config.get('server'))
+            self.tenure_generation[guild_id] = self.tenure_generation.get(guild_id, 0) + 1
+            guild = await self.bot.getch_guild(guild_id=guild_id)
             if guild is None:
+                # retried next run
+                del configs[guild_id]
                 continue
 
             if not guild.chunked:
@@ -28,49 +52,45 @@ class AutoEvalBackground(commands.Cog):
                     await guild.chunk(cache=True)
                 else:
                     self.bot.STARTED_CHUNK.add(guild.id)
+            members.extend(member for member in guild.members if not member.bot)
+        self.tenure_configs = configs
 
-            status_roles.sort(key=lambda role: role['months'], reverse=True)
-            status_roles_map: dict[int, tuple[dict, disnake.Role]] = {
-                role['id']: (role, disnake.utils.get(guild.roles, id=role['id'])) for role in status_roles
-            }
-
-            bot_member = guild.me
-
-            for count, member in enumerate(guild.members, start=1):
-                if member.bot:
-                    continue
-
-                # Calculate the number of months the member has been in the server
-                joined_at = member.joined_at
-                now = pend.now(tz=pend.UTC)
-                num_months = (now.year - joined_at.year) * 12 + (now.month - joined_at.month)
-
-                current_roles = set(member.roles)
-
-                role_to_add = None
-                roles_to_remove = []
-                for role, role_obj in status_roles_map.values():
-                    if bot_member.top_role <= role_obj:
-                        continue
-
-                    # if they have earned it, and role to be added leads to false, but they dont have it yet
-                    if num_months >= role['months'] and role_to_add is None:
-                        if role_obj not in current_roles:
-                            role_to_add = role_obj
-                        else:
-                            role_to_add = True
-                    # once it has found 1 role to add, any others should be removed, if they have them
-                    elif role_obj in current_roles:
-                        if role_obj in current_roles:
-                            roles_to_remove.append(role_obj)
-
-                try:
-                    if isinstance(role_to_add, disnake.Role):
-                        await member.add_roles(*[role_to_add], reason='Tenure Roles')
-                    if roles_to_remove:
-                        await member.remove_roles(*roles_to_remove, reason='Tenure Roles')
-                except Exception as e:
-                    continue
+        while self.tenure_due and self.tenure_due[0][0] <= now.timestamp():
+            _, guild_id, member_id, generation = heapq.heappop(self.tenure_due)
+            # entries from before a rescan (or for guilds without status roles now) are stale
+            if generation != self.tenure_generation.get(guild_id) or guild_id not in configs:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(member_id) if guild is not None else None
+            if member is not None:
+                members.append(member)
+
+        await bounded_gather(members, lambda member: self.apply_tenure(member=member, now=now), limit=TENURE_EDIT_CONCURRENCY)
+
+    async def apply_tenure(self, member: disnake.Member, now):
+        guild = member.guild
+        if member.joined_at is None:
+            return
+        bot_member = guild.me
+        status_roles = [
+            role for role in self.tenure_configs.get(guild.id, [])
+            if (role_obj := guild.get_role(role['id'])) is not None and role_obj < bot_member.top_role
+        ]
+
+        num_months = tenure_months(member.joined_at, now)
+        role_to_add, roles_to_remove = tenure_role_changes(status_roles, num_months, {role.id for role in member.roles})
+        due = next_change(status_roles, member.joined_at, now)
+        try:
+            if role_to_add is not None:
+                await member.add_roles(guild.get_role(role_to_add), reason='Tenure Roles')
+            if roles_to_remove:
+                await member.remove_roles(*[guild.get_role(role_id) for role_id in roles_to_remove], reason='Tenure Roles')
+        except Exception:
+            # retried next run
+            due = now
+
+        if due is not None:
+            heapq.heappush(self.tenure_due, (due.timestamp(), guild.id, member.id, self.tenure_generation.get(guild.id, 0)))
 
 
 def setup(bot: CustomClient):
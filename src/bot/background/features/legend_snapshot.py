@@ -0,0 +1,17 @@
+from disnake.ext import commands
+
+from classes.bot import CustomClient
+
+
+# how often clusters check whether the stored snapshot is due, only one rebuilds it
+CHECK_INTERVAL_MINUTES = 2
+
+
+class LegendSnapshotRefresh(commands.Cog):
+    def __init__(self, bot: CustomClient):
+        self.bot = bot
+        self.bot.scheduler.add_job(self.bot.legend_snapshot.refresh, 'interval', minutes=CHECK_INTERVAL_MINUTES, misfire_grace_time=None, max_instances=1)
+
+
+def setup(bot: CustomClient):
+    bot.add_cog(LegendSnapshotRefresh(bot))
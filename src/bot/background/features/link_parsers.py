@@ -27,7 +27,7 @@ class LinkParsing(commands.Cog):
         if message.guild.id in self.bot.OUR_GUILDS:
 
             if 'https://link.clashofclans.com/' in message.content and 'action=OpenPlayerProfile&tag=' in message.content:
-                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id)
+                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id, cached=True)
                 if (not server_settings.player_link_parse or
                         (server_settings.link_parse_channels and message.channel.id not in server_settings.link_parse_channels)):
                     return
@@ -55,7 +55,7 @@ class LinkParsing(commands.Cog):
                 await safe_run(func=message.delete)
 
             elif 'https://link.clashofclans.com/' in message.content and 'OpenClanProfile' in message.content:
-                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id)
+                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id, cached=True)
                 if (not server_settings.clan_link_parse or
                         (server_settings.link_parse_channels and message.channel.id not in server_settings.link_parse_channels)):
                     return
@@ -77,7 +77,7 @@ class LinkParsing(commands.Cog):
                 await message.channel.send(embed=embed, components=[buttons])
 
             elif 'https://link.clashofclans.com/' in message.content and 'CopyArmy' in message.content:
-                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id)
+                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id, cached=True)
                 if (not server_settings.army_link_parse or
                         (server_settings.link_parse_channels and message.channel.id not in server_settings.link_parse_channels)):
                     return
@@ -103,7 +103,7 @@ class LinkParsing(commands.Cog):
                 and message.attachments
                 and 'image' in message.attachments[0].content_type
             ):
-                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id)
+                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id, cached=True)
                 if (not server_settings.base_link_parse or
                         (server_settings.link_parse_channels and message.channel.id not in server_settings.link_parse_channels)):
                     return
@@ -142,7 +142,7 @@ class LinkParsing(commands.Cog):
                 )
 
             elif message.content.startswith('-show '):
-                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id)
+                server_settings = await self.bot.ck_client.get_server_settings(server_id=message.guild.id, cached=True)
                 if not server_settings.show_command_parse:
                     return
 
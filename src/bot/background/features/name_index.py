@@ -0,0 +1,54 @@
+import asyncio
+
+from disnake.ext import commands
+
+from classes.bot import CustomClient
+from utility.name_index import PLAYER_FIELDS, NameIndex
+
+
+# full rebuilds pick up name/clan changes that didn't arrive as events
+REBUILD_INTERVAL_HOURS = 1
+
+# documents indexed between yields to the event loop, a build never blocks it for long
+BUILD_CHUNK_SIZE = 1000
+
+
+class NameIndexLoader(commands.Cog):
+    """Builds `bot.name_index` for autocomplete, swapped in whole so lookups never see a partial index"""
+
+    def __init__(self, bot: CustomClient):
+        self.bot = bot
+        self.bot.scheduler.add_job(self.build, misfire_grace_time=None, max_instances=1)
+        self.bot.scheduler.add_job(self.build, 'interval', hours=REBUILD_INTERVAL_HOURS, misfire_grace_time=None, max_instances=1)
+
+    async def build(self):
+        index = NameIndex()
+        async for count, clan in _enumerate(self.bot.clan_db.find({}, {'_id': 0, 'server': 1, 'tag': 1, 'name': 1})):
+            index.update_clan(clan)
+            if count % BUILD_CHUNK_SIZE == 0:
+                await asyncio.sleep(0)
+
+        # past the limit only the players autocomplete narrows to are kept, "all players" stays on atlas search
+        filter = {}
+        if await self.bot.player_search.estimated_document_count() > self.bot._config.name_index_player_limit:
+            filter = {'$or': [{'league': 'Legend League'}, {'clan': {'$in': index.clan_tags}}]}
+        projection = {'_id': 0, **{field: 1 for field in PLAYER_FIELDS}}
+        async for count, player in _enumerate(self.bot.player_search.find(filter, projection, batch_size=BUILD_CHUNK_SIZE)):
+            index.update_player(player)
+            if count % BUILD_CHUNK_SIZE == 0:
+                await asyncio.sleep(0)
+
+        index.all_players = not filter
+        index.ready = True
+        self.bot.name_index = index
+
+
+async def _enumerate(cursor):
+    count = 0
+    async for document in cursor:
+        count += 1
+        yield count, document
+
+
+def setup(bot: CustomClient):
+    bot.add_cog(NameIndexLoader(bot))
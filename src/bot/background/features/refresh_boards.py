@@ -1,13 +1,36 @@
+import asyncio
+import hashlib
+from collections import defaultdict
+
 import disnake
 import pendulum as pend
+import sentry_sdk
+import ujson
 from disnake.ext import commands
 
 from classes.bot import CustomClient
 from commands.components.buttons import button_logic
 from exceptions.CustomExceptions import MissingWebhookPerms
+from utility.concurrency import bounded_gather
 from utility.discord_utils import get_webhook_for_channel
 
 
+# webhooks refreshed at once, and the pause between two edits on the same webhook (seconds)
+REFRESH_CONCURRENCY = 10
+WEBHOOK_EDIT_INTERVAL = 0.5
+
+
+def embed_hash(embed: disnake.Embed | list[disnake.Embed]) -> str:
+    """Hash of the rendered payload, the embed timestamp is left out so a re-render of the same data matches"""
+    embeds = embed if isinstance(embed, list) else [embed]
+    payload = []
+    for item in embeds:
+        data = item.to_dict()
+        data.pop('timestamp', None)
+        payload.append(data)
+    return hashlib.sha1(ujson.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
 class RefreshBoards(commands.Cog):
     def __init__(self, bot: CustomClient):
         self.bot = bot
@@ -21,46 +44,79 @@ class RefreshBoards(commands.Cog):
 
     async def refresh(self):
         all_refresh_boards = await self.bot.autoboards.find({'$and': [{'webhook_id': {'$ne': None}}, {'type': 'refresh'}]}).to_list(length=None)
-        for board in all_refresh_boards:
+        all_refresh_boards = [board for board in all_refresh_boards if board.get('server_id') in self.bot.OUR_GUILDS]
 
-            webhook_id = board.get('webhook_id')
-            thread_id = board.get('thread_id')
-            message_id = board.get('message_id')
-            button_id = board.get('button_id')
-            if board.get('server_id') not in self.bot.OUR_GUILDS:
-                continue
-            guild = await self.bot.getch_guild(board.get('server_id'))
-            if guild is None:
-                continue
-            embed, components = await button_logic(button_data=button_id, bot=self.bot, guild=guild, locale=disnake.Locale(board.get('locale')))
-            if embed is None:
-                continue
+        # a webhook's boards are edited one after another (spaced out), different webhooks concurrently
+        by_webhook = defaultdict(list)
+        for board in all_refresh_boards:
+            by_webhook[board.get('webhook_id')].append(board)
+
+        async def refresh_webhook(boards: list[dict]):
+            for board in boards:
+                try:
+                    edited = await self.refresh_board(board=board)
+                except Exception as e:
+                    # one broken board shouldn't hold back the rest on its webhook
+                    print(f"[WARN] Refreshing board {board.get('_id')} failed: {e!r}")
+                    sentry_sdk.capture_exception(e)
+                    continue
+                if edited:
+                    await asyncio.sleep(WEBHOOK_EDIT_INTERVAL)
 
-            try:
-                webhook: disnake.Webhook = await self.bot.getch_webhook(webhook_id)
+        await bounded_gather(list(by_webhook.values()), refresh_webhook, limit=REFRESH_CONCURRENCY)
+        self.position_check = False
 
-                if webhook.user.id != self.bot.user.id:
-                    webhook = await get_webhook_for_channel(bot=self.bot, channel=webhook.channel)
-                    if thread_id is None:
-                        if isinstance(embed, list):
-                            message = await webhook.send(embeds=embed, wait=True)
-                        else:
-                            message = await webhook.send(embed=embed, wait=True)
+    async def render_board(self, board: dict):
+        guild = await self.bot.getch_guild(board.get('server_id'))
+        if guild is None:
+            return None, None
+        embed, components = await button_logic(
+            button_data=board.get('button_id'), bot=self.bot, guild=guild, locale=disnake.Locale(board.get('locale'))
+        )
+        if embed is None:
+            return None, None
+        return embed, embed_hash(embed)
+
+    async def refresh_board(self, board: dict) -> bool:
+        """Refresh one board, returns whether anything was sent to its webhook"""
+        webhook_id = board.get('webhook_id')
+        thread_id = board.get('thread_id')
+        message_id = board.get('message_id')
+        embed, content_hash = await self.render_board(board)
+        if embed is None:
+            return False
+
+        unchanged = content_hash == board.get('content_hash')
+        if unchanged and not self.position_check:
+            return False
+
+        try:
+            webhook: disnake.Webhook = await self.bot.getch_webhook(webhook_id)
+
+            if webhook.user.id != self.bot.user.id:
+                webhook = await get_webhook_for_channel(bot=self.bot, channel=webhook.channel)
+                if thread_id is None:
+                    if isinstance(embed, list):
+                        message = await webhook.send(embeds=embed, wait=True)
                     else:
-                        thread = await self.bot.getch_channel(thread_id)
-                        if isinstance(embed, list):
-                            message = await webhook.send(embeds=embed, thread=thread, wait=True)
-                        else:
-                            message = await webhook.send(embed=embed, thread=thread, wait=True)
-                    await self.bot.autoboards.update_one(
-                        {'_id': board.get('_id')},
-                        {'$set': {'webhook_id': webhook.id, 'message_id': message.id}},
-                    )
-                    continue
-
-                thread = None
-                if thread_id is not None:
-                    thread = await self.bot.getch_channel(thread_id, raise_exception=True)
+                        message = await webhook.send(embed=embed, wait=True)
+                else:
+                    thread = await self.bot.getch_channel(thread_id)
+                    if isinstance(embed, list):
+                        message = await webhook.send(embeds=embed, thread=thread, wait=True)
+                    else:
+                        message = await webhook.send(embed=embed, thread=thread, wait=True)
+                await self.bot.autoboards.update_one(
+                    {'_id': board.get('_id')},
+                    {'$set': {'webhook_id': webhook.id, 'message_id': message.id, 'content_hash': content_hash}},
+                )
+                return True
+
+            thread = None
+            if thread_id is not None:
+                thread = await self.bot.getch_channel(thread_id, raise_exception=True)
+            if not unchanged:
+                if thread is not None:
                     if isinstance(embed, list):
                         await webhook.edit_message(message_id, thread=thread, embeds=embed)
                     else:
@@ -70,23 +126,24 @@ class RefreshBoards(commands.Cog):
                         await webhook.edit_message(message_id, embeds=embed)
                     else:
                         await webhook.edit_message(message_id, embed=embed)
-
-                if self.position_check:
-                    channel = webhook.channel
-                    if thread is not None:
-                        channel = thread
-                    messages = await channel.history(limit=15).flatten()
-                    found = False
-                    for position, message in enumerate(messages, start=1):
-                        if message.id == message_id:
-                            found = True
-                            break
-                    if not found:
-                        raise MissingWebhookPerms
-            except (disnake.NotFound, disnake.Forbidden, MissingWebhookPerms):
-                await self.bot.autoboards.update_one({'_id': board.get('_id')}, {'$set': {'webhook_id': None}})
-
-        self.position_check = False
+                await self.bot.autoboards.update_one({'_id': board.get('_id')}, {'$set': {'content_hash': content_hash}})
+
+            if self.position_check:
+                channel = webhook.channel
+                if thread is not None:
+                    channel = thread
+                messages = await channel.history(limit=15).flatten()
+                found = False
+                for position, message in enumerate(messages, start=1):
+                    if message.id == message_id:
+                        found = True
+                        break
+                if not found:
+                    raise MissingWebhookPerms
+            return not unchanged
+        except (disnake.NotFound, disnake.Forbidden, MissingWebhookPerms):
+            await self.bot.autoboards.update_one({'_id': board.get('_id')}, {'$set': {'webhook_id': None}})
+            return False
 
     async def post(self):
         current_day_name = pend.now(tz=pend.UTC).format('dddd').lower()
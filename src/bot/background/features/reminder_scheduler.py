@@ -0,0 +1,144 @@
+import time
+
+import sentry_sdk
+from disnake.ext import commands
+
+from classes.bot import CustomClient
+from classes.reminders import (
+    INACTIVITY_CHECK_INTERVAL,
+    SCHEDULED_REMINDER_TYPES,
+    Reminder,
+    schedule_fields,
+    wait_for_reminder_wakeup,
+)
+from commands.reminders.delivery import REMINDER_SEND_CONCURRENCY, ReminderBatch
+from commands.reminders.send import inactivity_reminder, roster_reminder
+from utility.concurrency import bounded_gather
+
+
+# longest sleep between checks, picks up reminders/rosters changed outside this process
+IDLE_WAKE = 5 * 60
+
+ROSTER_LOOKUP = [
+    {
+        '$lookup': {
+            'from': 'rosters',
+            'localField': 'roster',
+            'foreignField': '_id',
+            'as': 'roster',
+        }
+    },
+    {'$set': {'roster': {'$first': '$roster'}}},
+]
+
+
+class ReminderScheduler(commands.Cog):
+    """
+    Delivers inactivity & roster reminders from a `next_fire` index on the reminders collection.
+    Fire times are computed when a reminder (or its roster) is created/edited, the loop sleeps until
+    the earliest one is due instead of scanning every reminder on an interval.
+    """
+
+    def __init__(self, bot: CustomClient):
+        self.bot = bot
+        self.bot.scheduler.add_job(self.run, misfire_grace_time=None, max_instances=1)
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        await self.bot.reminders.create_index([('next_fire', 1)])
+        await self.backfill()
+        while not self.bot.is_closed():
+            delay = IDLE_WAKE
+            try:
+                await self.fire_due()
+                delay = await self.seconds_until_next()
+            except Exception as e:
+                print(f'[WARN] Reminder scheduler tick failed: {e!r}')
+                sentry_sdk.capture_exception(e)
+            await wait_for_reminder_wakeup(timeout=delay)
+
+    def _match(self, *conditions: dict) -> dict:
+        return {
+            '$and': [
+                {'type': {'$in': SCHEDULED_REMINDER_TYPES}},
+                {'server': {'$in': list(self.bot.OUR_GUILDS)}},
+                *conditions,
+            ]
+        }
+
+    async def backfill(self):
+        """Schedule this cluster's reminders saved before fire times were stored"""
+        # runs once the bot is ready, before `OUR_GUILDS` is first filled in
+        guild_ids = [guild.id for guild in self.bot.guilds]
+        pipeline = [
+            {
+                '$match': {
+                    '$and': [
+                        {'type': {'$in': SCHEDULED_REMINDER_TYPES}},
+                        {'server': {'$in': guild_ids}},
+                        {'next_fire': {'$exists': False}},
+                    ]
+                }
+            },
+            *ROSTER_LOOKUP,
+            {'$project': {'type': 1, 'time': 1, 'roster_time': '$roster.time'}},
+        ]
+        async for reminder in self.bot.reminders.aggregate(pipeline=pipeline):
+            await self.bot.reminders.update_one(
+                {'_id': reminder.get('_id')},
+                {'$set': schedule_fields(type=reminder.get('type'), time=reminder.get('time'), roster_time=reminder.get('roster_time'))},
+            )
+
+    async def seconds_until_next(self) -> float:
+        upcoming = await self.bot.reminders.find_one(self._match({'next_fire': {'$ne': None}}), {'next_fire': 1}, sort=[('next_fire', 1)])
+        if upcoming is None:
+            return IDLE_WAKE
+        return min(upcoming.get('next_fire') - time.time(), IDLE_WAKE)
+
+    async def fire_due(self):
+        now = int(time.time())
+        pipeline = [
+            {'$match': self._match({'next_fire': {'$ne': None, '$lte': now}})},
+            {'$sort': {'next_fire': 1}},
+            *ROSTER_LOOKUP,
+        ]
+        due = [Reminder(bot=self.bot, data=data) for data in await self.bot.reminders.aggregate(pipeline=pipeline).to_list(length=None)]
+        if not due:
+            return
+        batches = {type: ReminderBatch(bot=self.bot, type=type) for type in SCHEDULED_REMINDER_TYPES}
+
+        async def prepare(reminder: Reminder):
+            if await self.claim(reminder=reminder, now=now):
+                await self.deliver(reminder=reminder, now=now, batch=batches[reminder.type])
+
+        # claims & lookups run concurrently and are shared across the tick, then every channel is sent to in order
+        await bounded_gather(due, prepare, limit=REMINDER_SEND_CONCURRENCY)
+        for batch in batches.values():
+            await batch.send()
+
+    async def claim(self, reminder: Reminder, now: int) -> bool:
+        """Move the reminder to its next fire time, only the process that moves it delivers it"""
+        fields = {'next_fire': None}
+        if reminder.type == 'inactivity':
+            # step from the scheduled time so checks don't drift, unless we're a whole interval behind
+            next_fire = reminder.next_fire + INACTIVITY_CHECK_INTERVAL
+            if next_fire <= now:
+                next_fire = now + INACTIVITY_CHECK_INTERVAL
+            fields = {'next_fire': next_fire, 'last_fire': now}
+        result = await self.bot.reminders.update_one({'_id': reminder.reminder_id, 'next_fire': reminder.next_fire}, {'$set': fields})
+        return result.modified_count == 1
+
+    async def deliver(self, reminder: Reminder, now: int, batch: ReminderBatch):
+        if reminder.type == 'inactivity':
+            # the window covers everything since the previous check, capped so downtime doesn't ping stale inactivity
+            window_start = max(reminder.last_fire or now - INACTIVITY_CHECK_INTERVAL, now - 2 * INACTIVITY_CHECK_INTERVAL)
+            await inactivity_reminder(bot=self.bot, reminder=reminder, window_start=window_start, window_end=now, batch=batch)
+        elif reminder.type == 'roster':
+            roster_time = reminder.roster.time if reminder.roster.is_valid else None
+            if roster_time is None or float(roster_time) < now:
+                return
+            await roster_reminder(bot=self.bot, reminder=reminder, batch=batch)
+
+
+def setup(bot: CustomClient):
+    bot.add_cog(ReminderScheduler(bot))
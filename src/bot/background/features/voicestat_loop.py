@@ -1,7 +1,11 @@
+import time
+from typing import Callable
+
 import disnake
 import pytz
 from disnake.ext import commands
 
+from utility.concurrency import bounded_gather
 from utility.general import calculate_time
 
 
@@ -12,149 +16,111 @@ from classes.DatabaseClient.Classes.settings import DatabaseClan
 from exceptions.CustomExceptions import MissingWebhookPerms
 
 
+# server_db field -> (calculate_time type, channel label), the text is the same for every server
+SERVER_COUNTDOWNS = {
+    'cwlCountdown': ('CWL', 'CWL'),
+    'gamesCountdown': ('Clan Games', 'CG'),
+    'raidCountdown': ('Raid Weekend', 'Raids'),
+    'eosCountdown': ('EOS', 'EOS'),
+    'eosDayCountdown': ('Season Day', 'Day'),
+}
+
+# channel renames are limited to 2 per 10 minutes, past that disnake waits the limit out and stalls the tick
+RENAME_INTERVAL = 5 * 60
+
+VOICE_UPDATE_CONCURRENCY = 10
+
+
 class VoiceStatCron(commands.Cog):
     def __init__(self, bot: CustomClient):
         self.bot = bot
-        self.bot.scheduler.add_job(self.voice_update, 'interval', minutes=15)
+        # channel id -> name we last saw or set, a channel whose next name matches isn't fetched
+        self.channel_names: dict[int, str] = {}
+        self.renamed_at: dict[int, float] = {}
+        self.bot.scheduler.add_job(self.voice_update, 'interval', minutes=15, max_instances=1)
+
+    async def rename(self, channel_id: int, render: Callable[[str], str]) -> bool:
+        """
+        Rename a channel to `render(current name)` if that changes it.
+        Channels whose last known name renders to itself aren't fetched at all.
+        """
+        known = self.channel_names.get(channel_id)
+        if known is not None and render(known) == known:
+            return False
+        channel = await self.bot.getch_channel(channel_id=channel_id, raise_exception=True)
+        self.channel_names[channel_id] = channel.name
+        name = render(channel.name)
+        if name == channel.name:
+            return False
+        if time.monotonic() - self.renamed_at.get(channel_id, 0) < RENAME_INTERVAL:
+            return False
+        await channel.edit(name=name)
+        self.renamed_at[channel_id] = time.monotonic()
+        self.channel_names[channel_id] = name
+        return True
 
     async def voice_update(self):
-        results = self.bot.server_db.find()
-        limit = await self.bot.server_db.count_documents(filter={})
-        for r in await results.to_list(length=limit):
-            channel = r.get('cwlCountdown')
-            server = r.get('server')
-            if server not in self.bot.OUR_GUILDS:
-                continue
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    time_ = await calculate_time('CWL')
-                    prev_name = channel.name
-                    text = f'CWL {time_}'
-                    if '|' in prev_name:
-                        custom = prev_name.split('|')[0]
-                        text = f'{custom}| {text}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'cwlCountdown': None}})
-
-            channel = r.get('gamesCountdown')
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    time_ = await calculate_time('Clan Games')
-                    prev_name = channel.name
-                    text = f'CG {time_}'
-                    if '|' in prev_name:
-                        custom = prev_name.split('|')[0]
-                        text = f'{custom}| {text}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'gamesCountdown': None}})
-
-            channel = r.get('raidCountdown')
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    time_ = await calculate_time('Raid Weekend')
-                    prev_name = channel.name
-                    text = f'Raids {time_}'
-                    if '|' in prev_name:
-                        custom = prev_name.split('|')[0]
-                        text = f'{custom}| {text}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'raidCountdown': None}})
-
-            channel = r.get('eosCountdown')
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    time_ = await calculate_time('EOS')
-                    prev_name = channel.name
-                    text = f'EOS {time_}'
-                    if '|' in prev_name:
-                        custom = prev_name.split('|')[0]
-                        text = f'{custom}| {text}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'eosCountdown': None}})
-
-            channel = r.get('eosDayCountdown')
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    time_ = await calculate_time('Season Day')
-                    prev_name = channel.name
-                    text = f'Day {time_}'
-                    if '|' in prev_name:
-                        custom = prev_name.split('|')[0]
-                        text = f'{custom}| {text}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'eosDayCountdown': None}})
-
-            channel = r.get('memberCount')
-            if channel is not None:
-                try:
-                    channel = await self.bot.getch_channel(channel_id=channel, raise_exception=True)
-                    member_tags = await self.bot.get_family_member_tags(guild_id=server)
-                    await channel.edit(name=f'{len(member_tags)} Clan Members')
-                except (disnake.NotFound, disnake.Forbidden):
-                    await self.bot.server_db.update_one({'server': server}, {'$set': {'memberCount': None}})
-
-        for clan_result in await self.bot.clan_db.find({'warCountdown': {'$ne': None}}).to_list(length=None):
+        texts = {field: f'{label} {await calculate_time(type)}' for field, (type, label) in SERVER_COUNTDOWNS.items()}
+        fields = [*SERVER_COUNTDOWNS, 'memberCount']
+        servers = await self.bot.server_db.find(
+            {'$and': [{'server': {'$in': list(self.bot.OUR_GUILDS)}}, {'$or': [{field: {'$ne': None}} for field in fields]}]},
+            {'_id': 0, 'server': 1, **{field: 1 for field in fields}},
+        ).to_list(length=None)
+
+        def countdown(text: str):
+            # keeps a custom prefix (`custom| CWL ...`) from the current name
+            return lambda name: f"{name.split('|')[0]}| {text}" if '|' in name else text
+
+        async def update(item: tuple[dict, str]):
+            server, field = item
+            channel_id = server.get(field)
             try:
-                db_clan = DatabaseClan(bot=self.bot, data=clan_result)
+                if field == 'memberCount':
+                    member_tags = await self.bot.get_family_member_tags(guild_id=server.get('server'))
+                    await self.rename(channel_id=channel_id, render=lambda name: f'{len(member_tags)} Clan Members')
+                else:
+                    await self.rename(channel_id=channel_id, render=countdown(texts[field]))
+            except (disnake.NotFound, disnake.Forbidden):
+                self.channel_names.pop(channel_id, None)
+                await self.bot.server_db.update_one({'server': server.get('server')}, {'$set': {field: None}})
+                await self.bot.settings_cache.invalidate(server.get('server'))
+
+        updates = [(server, field) for server in servers for field in fields if server.get(field) is not None]
+        await bounded_gather(updates, update, limit=VOICE_UPDATE_CONCURRENCY)
+        await self.war_update()
+
+    async def war_update(self):
+        clan_results = await self.bot.clan_db.find(
+            {'$and': [{'server': {'$in': list(self.bot.OUR_GUILDS)}}, {'$or': [{'warCountdown': {'$ne': None}}, {'warTimerCountdown': {'$ne': None}}]}]}
+        ).to_list(length=None)
+        db_clans = [DatabaseClan(bot=self.bot, data=data) for data in clan_results]
+        wars = await self.bot.get_clan_wars(tags=list({db_clan.tag for db_clan in db_clans}))
+        war_map = {w.clan.tag: w for w in wars if w is not None}
 
-                if db_clan.server_id not in self.bot.OUR_GUILDS:
-                    continue
+        def render(time_):
+            def render_name(prev_name: str):
+                if ':' not in prev_name:
+                    raise MissingWebhookPerms
+                return f"{prev_name.split(':')[0]}: {time_}"
 
+            return render_name
+
+        async def update(db_clan: DatabaseClan):
+            war = war_map.get(db_clan.tag)
+            if db_clan.war_countdown is not None:
                 try:
-                    channel = await self.bot.getch_channel(channel_id=db_clan.war_countdown, raise_exception=True)
-                    war = await self.bot.get_clanwar(clanTag=db_clan.tag)
                     time_ = await calculate_time('War Score', war=war)
-                    prev_name = channel.name
-                    if ':' not in prev_name:
-                        raise MissingWebhookPerms
-                    previous_identifier = prev_name.split(':')[0]
-                    text = f'{previous_identifier}: {time_}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
+                    await self.rename(channel_id=db_clan.war_countdown, render=render(time_))
                 except (disnake.NotFound, disnake.Forbidden, MissingWebhookPerms):
                     await db_clan.set_war_countdown(id=None)
-            except Exception:
-                continue
-
-        war_tags = await self.bot.clan_db.distinct('tag', filter={'warTimerCountdown': {'$ne': None}})
-        wars = await self.bot.get_clan_wars(tags=war_tags)
-        war_map = {w.clan.tag: w for w in wars if w is not None}
-        for clan_result in await self.bot.clan_db.find({'warTimerCountdown': {'$ne': None}}).to_list(length=None):
-            try:
-                db_clan = DatabaseClan(bot=self.bot, data=clan_result)
-                if db_clan.server_id not in self.bot.OUR_GUILDS:
-                    continue
-
+            if db_clan.war_timer_countdown is not None:
                 try:
-                    channel = await self.bot.getch_channel(channel_id=db_clan.war_timer_countdown, raise_exception=True)
-                    war = war_map.get(db_clan.tag)
                     time_ = await calculate_time('War Timer', war=war)
-                    prev_name = channel.name
-                    if ':' not in prev_name:
-                        raise MissingWebhookPerms
-                    previous_identifier = prev_name.split(':')[0]
-                    text = f'{previous_identifier}: {time_}'
-                    if text != channel.name:
-                        await channel.edit(name=text)
+                    await self.rename(channel_id=db_clan.war_timer_countdown, render=render(time_))
                 except (disnake.NotFound, disnake.Forbidden, MissingWebhookPerms):
                     await db_clan.set_war_timer_countdown(id=None)
-            except Exception:
-                continue
+
+        await bounded_gather(db_clans, update, limit=VOICE_UPDATE_CONCURRENCY)
 
 
 def setup(bot: CustomClient):
@@ -0,0 +1,51 @@
+import pendulum as pend
+from disnake.ext import commands
+
+from classes.bot import CustomClient
+from utility.clash.war_attacks import WAR_ATTACK_INDEXES, WAR_KEY_PROJECTION
+
+
+SYNC_INTERVAL_MINUTES = 30
+
+# first run after a restart looks this far back, later runs pick up where the last one stopped
+INITIAL_LOOKBACK_HOURS = 24
+
+
+class WarAttackSync(commands.Cog):
+    """Writes the attack rows of family wars as they end, so stat commands rarely decode a war themselves"""
+
+    def __init__(self, bot: CustomClient):
+        self.bot = bot
+        self.synced_until = pend.now(tz=pend.UTC).subtract(hours=INITIAL_LOOKBACK_HOURS)
+        self.bot.scheduler.add_job(self.create_indexes, misfire_grace_time=None)
+        self.bot.scheduler.add_job(self.sync, 'interval', minutes=SYNC_INTERVAL_MINUTES, misfire_grace_time=None, max_instances=1)
+
+    async def create_indexes(self):
+        for index in WAR_ATTACK_INDEXES:
+            await self.bot.war_attacks.create_index(index)
+
+    async def sync(self):
+        if self.bot.ck_client is None:
+            return
+        now = pend.now(tz=pend.UTC)
+        clan_tags = await self.bot.clan_db.distinct('tag', filter={'server': {'$in': list(self.bot.OUR_GUILDS)}})
+        if not clan_tags:
+            return
+        # a run of overlap catches wars whose document hadn't caught up to their end yet
+        since = self.synced_until.subtract(minutes=SYNC_INTERVAL_MINUTES)
+        ended = await self.bot.clan_wars.find(
+            {
+                '$and': [
+                    {'$or': [{'data.clan.tag': {'$in': clan_tags}}, {'data.opponent.tag': {'$in': clan_tags}}]},
+                    {'data.endTime': {'$gte': since.strftime('%Y%m%dT%H%M%S.000Z')}},
+                    {'data.endTime': {'$lte': now.strftime('%Y%m%dT%H%M%S.000Z')}},
+                ]
+            },
+            projection=WAR_KEY_PROJECTION,
+        ).to_list(length=None)
+        await self.bot.ck_client.sync_war_attacks(wars=ended)
+        self.synced_until = now
+
+
+def setup(bot: CustomClient):
+    bot.add_cog(WarAttackSync(bot))
@@ -6,14 +6,15 @@ Only started if BOT_ENABLE_METRICS=1 to avoid overhead when unused.
 from __future__ import annotations
 
 import os
-import time
 import threading
+import time
 from typing import Optional
 
 from fastapi import FastAPI, Response
 
+
 try:  # optional dependency pattern (fastapi is already in requirements)
-    from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, Counter, Gauge
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
 except Exception:  # pragma: no cover - if missing, metrics just disabled
     CollectorRegistry = None  # type: ignore
 
@@ -21,11 +22,21 @@ _app: Optional[FastAPI] = None
 _thread: Optional[threading.Thread] = None
 _registry = None
 _bot_latency = None
+_http_requests = None
+_http_latency = None
+_http_pool = None
+_render_jobs = None
+_render_latency = None
+_render_queue = None
+_reminder_sends = None
+_reminder_latency = None
+_autocomplete_lookups = None
 _startup_time = time.time()
 
 
 def get_app() -> Optional[FastAPI]:
-    global _app, _registry, _bot_latency
+    global _app, _registry, _bot_latency, _http_requests, _http_latency, _http_pool
+    global _render_jobs, _render_latency, _render_queue, _reminder_sends, _reminder_latency, _autocomplete_lookups
     if _app is not None:
         return _app
     if CollectorRegistry is None:
@@ -34,6 +45,17 @@ def get_app() -> Optional[FastAPI]:
     _bot_latency = Gauge('bot_ws_latency_seconds', 'Last measured Discord websocket latency (seconds)', registry=_registry)
     Gauge('bot_uptime_seconds', 'Bot process uptime in seconds', registry=_registry)
     Counter('bot_events_total', 'Total Discord gateway events observed', registry=_registry)
+    _http_requests = Counter('bot_http_requests_total', 'Outbound HTTP requests by host and status', ['host', 'status'], registry=_registry)
+    _http_latency = Histogram('bot_http_request_seconds', 'Outbound HTTP request latency (seconds)', ['host'], registry=_registry)
+    _http_pool = Gauge('bot_http_pool_connections', 'Shared HTTP pool connections by state', ['state'], registry=_registry)
+    _render_jobs = Counter('bot_render_jobs_total', 'Render pool jobs by kind and status', ['kind', 'status'], registry=_registry)
+    _render_latency = Histogram('bot_render_job_seconds', 'Render job latency including queue wait (seconds)', ['kind'], registry=_registry)
+    _render_queue = Gauge('bot_render_queue_jobs', 'Render pool jobs by state', ['state'], registry=_registry)
+    _reminder_sends = Counter('bot_reminder_messages_total', 'Reminder messages by reminder type and status', ['type', 'status'], registry=_registry)
+    _reminder_latency = Histogram(
+        'bot_reminder_delivery_seconds', 'Time from a reminder batch starting to its message being sent (seconds)', ['type'], registry=_registry
+    )
+    _autocomplete_lookups = Counter('bot_autocomplete_cache_lookups_total', 'Autocomplete cache lookups by result', ['result'], registry=_registry)
     _app = FastAPI()
 
     @_app.get('/health')
@@ -74,3 +96,46 @@ def observe_ws_latency(seconds: float):  # integration point from bot heartbeat
             _bot_latency.set(seconds)
         except Exception:  # pragma: no cover
             pass
+
+
+def observe_http_request(host: str, status: str, seconds: float, pool_stats: dict):  # integration point from utility.http
+    if _http_requests is None:
+        return
+    try:
+        _http_requests.labels(host=host, status=status).inc()
+        _http_latency.labels(host=host).observe(seconds)
+        for state in ('in_use', 'idle'):
+            _http_pool.labels(state=state).set(pool_stats.get(state, 0))
+    except Exception:  # pragma: no cover
+        pass
+
+
+def observe_render_job(kind: str, status: str, seconds: float, pool_stats: dict):  # integration point from utility.render
+    if _render_jobs is None:
+        return
+    try:
+        _render_jobs.labels(kind=kind, status=status).inc()
+        _render_latency.labels(kind=kind).observe(seconds)
+        for state in ('waiting', 'in_flight'):
+            _render_queue.labels(state=state).set(pool_stats.get(state, 0))
+    except Exception:  # pragma: no cover
+        pass
+
+
+def observe_reminder_send(type: str, status: str, seconds: float):  # integration point from commands.reminders.delivery
+    if _reminder_sends is None:
+        return
+    try:
+        _reminder_sends.labels(type=type, status=status).inc()
+        _reminder_latency.labels(type=type).observe(seconds)
+    except Exception:  # pragma: no cover
+        pass
+
+
+def observe_autocomplete_lookup(result: str):  # integration point from utility.autocomplete_cache
+    if _autocomplete_lookups is None:
+        return
+    try:
+        _autocomplete_lookups.labels(result=result).inc()
+    except Exception:  # pragma: no cover
+        pass
@@ -83,67 +83,91 @@ class DatabaseServer:
 
         self.welcome_link_log = ServerLog(parent=self, type='welcome_link')
 
+    async def invalidate(self):
+        await self.bot.settings_cache.invalidate(self.server_id)
+
     async def set_flair_non_family(self, option: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'flair_non_family': option}})
+        await self.invalidate()
 
     async def set_allowed_link_parse(self, type: str, status: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {f'link_parse.{type}': status}})
+        await self.invalidate()
 
     async def set_allowed_link_parse_channels(self, channel_ids: list[int]):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {f'link_parse.channels': channel_ids}})
+        await self.invalidate()
 
     async def set_change_nickname(self, status: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'change_nickname': status}})
+        await self.invalidate()
 
     async def set_full_whitelist_role(self, id: int | None):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'full_whitelist_role': id}})
+        await self.invalidate()
 
     async def set_family_nickname_convention(self, rule: str):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'nickname_rule': rule}})
+        await self.invalidate()
 
     async def set_non_family_nickname_convention(self, rule: str):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'non_family_nickname_rule': rule}})
+        await self.invalidate()
 
     async def set_auto_eval_nickname(self, status: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'auto_eval_nickname': status}})
+        await self.invalidate()
 
     async def set_auto_eval_triggers(self, triggers: List[str]):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'autoeval_triggers': triggers}})
+        await self.invalidate()
 
     async def set_auto_eval_log(self, id: int | None):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'autoeval_log': id}})
+        await self.invalidate()
 
     async def set_banlist_channel(self, id: Union[int, None]):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'banlist': id}})
+        await self.invalidate()
 
     async def set_strike_log_channel(self, id: Union[int, None]):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'strike_log': id}})
+        await self.invalidate()
 
     async def set_api_token(self, status: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'api_token': status}})
+        await self.invalidate()
 
     async def set_autoboard_limit(self, limit: int):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'autoboard_limit': limit}})
+        await self.invalidate()
 
     async def set_leadership_eval(self, status: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'leadership_eval': status}})
+        await self.invalidate()
 
     async def add_blacklisted_role(self, id: int):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$push': {'blacklisted_roles': id}})
+        await self.invalidate()
 
     async def remove_blacklisted_role(self, id: int):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$pull': {'blacklisted_roles': id}})
+        await self.invalidate()
 
     async def set_role_treatment(self, treatment: List[str]):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'role_treatment': treatment}})
+        await self.invalidate()
 
     async def set_tied_stats(self, state: bool):
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'tied': state}})
+        await self.invalidate()
 
     async def set_hex_code(self, hex_code: str):
         hex_code = hex_code.replace('#', '')
         hex_code = int(hex_code, 16)
         await self.bot.server_db.update_one({'server': self.server_id}, {'$set': {'embed_color': hex_code}})
+        await self.bot.button_cache.invalidate(guilds=[self.server_id])
+        await self.invalidate()
 
     async def get_achievement_role_by_type(self, type: str, award_type: str = None):
 
@@ -170,6 +194,7 @@ class DatabaseServer:
                 }
             },
         )
+        await self.invalidate()
 
     async def add_status_role(self, months: int, role_id: int, type: str):
         # Retrieve the current set of status roles
@@ -191,12 +216,14 @@ class DatabaseServer:
                 {'server': self.server_id},
                 {'$addToSet': {f'status_roles.{type}': {'months': months, 'id': role_id}}},
             )
+        await self.invalidate()
 
     async def remove_status_role(self, months: int, type: str):
         await self.bot.server_db.update_one(
             {'server': self.server_id},
             {'$pull': {f'status_roles.{type}': {'months': months}}},
         )
+        await self.invalidate()
 
     def get_clan(self, clan_tag: str, silent=False):
         matching_clan = utils.get(self.clans, tag=clan_tag)
@@ -240,18 +267,21 @@ class ServerLog:
             {'server': self.parent.server_id},
             {'$set': {f'logs.{self.type}.webhook': id}},
         )
+        await self.parent.invalidate()
 
     async def set_thread(self, id: Union[int, None]):
         await self.parent.bot.server_db.update_one(
             {'server': self.parent.server_id},
             {'$set': {f'logs.{self.type}.thread': id}},
         )
+        await self.parent.invalidate()
 
     async def set_embeds(self, embeds: list[dict] | None):
         await self.parent.bot.server_db.update_one(
             {'server': self.parent.server_id},
             {'$set': {f'logs.{self.type}.embeds': embeds}},
         )
+        await self.parent.invalidate()
 
     async def set_buttons(self, buttons: list[str] | None, button_color: str = None):
         await self.parent.bot.server_db.update_one(
@@ -263,6 +293,7 @@ class ServerLog:
                 }
             },
         )
+        await self.parent.invalidate()
 
 
 class EvalRole:
@@ -354,83 +385,99 @@ class DatabaseClan:
         self.member_count_warning = MemberCountWarning(parent=self)
         self.auto_greet_option = data.get('auto_greet_option', 'Never')
 
+    async def invalidate(self):
+        await self.bot.settings_cache.invalidate(self.server_id)
+
     async def set_war_countdown(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'warCountdown': id}},
         )
+        await self.invalidate()
 
     async def set_war_timer_countdown(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'warTimerCountdown': id}},
         )
+        await self.invalidate()
 
     async def set_clan_channel(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'clanChannel': id}},
         )
+        await self.invalidate()
 
     async def set_member_role(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'generalRole': id}},
         )
+        await self.invalidate()
 
     async def set_leadership_role(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'leaderRole': id}},
         )
+        await self.invalidate()
 
     async def set_ban_alert_channel(self, id: Union[int, None]):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'ban_alert_channel': id}},
         )
+        await self.invalidate()
 
     async def set_greeting(self, text: str):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'greeting': text}},
         )
+        await self.invalidate()
 
     async def set_auto_greet(self, option: str):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'auto_greet_option': option}},
         )
+        await self.invalidate()
 
     async def set_category(self, category: str):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'category': category}},
         )
+        await self.invalidate()
 
     async def set_nickname_label(self, abbreviation: str):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'abbreviation': abbreviation}},
         )
+        await self.invalidate()
 
     async def set_strike_button(self, set: bool):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'logs.leave_log.strike_button': set}},
         )
+        await self.invalidate()
 
     async def set_ban_button(self, set: bool):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'logs.leave_log.ban_button': set}},
         )
+        await self.invalidate()
 
     async def set_profile_button(self, set: bool):
         await self.bot.clan_db.update_one(
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {'logs.join_log.profile_button': set}},
         )
+        await self.invalidate()
 
     async def add_refresh_board(self, type: str, scope: str, message_id: int, webhook_id: int):
         await self.bot.refresh_boards.insert_one(
@@ -447,6 +494,7 @@ class DatabaseClan:
             {'$and': [{'tag': self.tag}, {'server': self.server_id}]},
             {'$set': {f'events.{type.lower()}': status}},
         )
+        await self.invalidate()
 
 
 class MemberCountWarning:
@@ -463,24 +511,28 @@ class MemberCountWarning:
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'member_count_warning.channel': id}},
         )
+        await self.parent.invalidate()
 
     async def set_above(self, num: Union[int, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'member_count_warning.above': num}},
         )
+        await self.parent.invalidate()
 
     async def set_below(self, num: Union[int, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'member_count_warning.below': num}},
         )
+        await self.parent.invalidate()
 
     async def set_role(self, id: Union[int, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'member_count_warning.role': id}},
         )
+        await self.parent.invalidate()
 
 
 class ClanLog:
@@ -512,12 +564,14 @@ class ClanLog:
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.webhook': id}},
         )
+        await self.parent.invalidate()
 
     async def set_thread(self, id: Union[int, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.thread': id}},
         )
+        await self.parent.invalidate()
 
 
 class Join_Log(ClanLog):
@@ -541,18 +595,21 @@ class WarPanel(ClanLog):
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.war_id': war_id}},
         )
+        await self.parent.invalidate()
 
     async def set_message_id(self, id: Union[str, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.war_message': id}},
         )
+        await self.parent.invalidate()
 
     async def set_channel_id(self, id: Union[str, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.war_channel': id}},
         )
+        await self.parent.invalidate()
 
 
 class CapitalPanel(ClanLog):
@@ -567,12 +624,14 @@ class CapitalPanel(ClanLog):
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.raid_id': raid_id}},
         )
+        await self.parent.invalidate()
 
     async def set_message_id(self, id: Union[str, None]):
         await self.parent.bot.clan_db.update_one(
             {'$and': [{'tag': self.parent.tag}, {'server': self.parent.server_id}]},
             {'$set': {f'logs.{self.type}.raid_message': id}},
         )
+        await self.parent.invalidate()
 
 
 class CustomServer:
@@ -1,6 +1,47 @@
+from pymongo import ReplaceOne
+
+from utility.clash.war_attacks import attack_rows, build_war_attack_match, build_war_attack_pipeline, war_key
+
 from .playerclient import PlayerClient
 
 
 class ClanClient(PlayerClient):
     def __init__(self, bot):
         super().__init__(bot)
+
+    async def write_war_attacks(self, wars: list[dict]):
+        """Store the attack rows of raw wars, rows of wars seen before are rewritten"""
+        operations = [ReplaceOne({'_id': row['_id']}, row, upsert=True) for data in wars for row in attack_rows(data)]
+        if operations:
+            await self.bot.war_attacks.bulk_write(operations, ordered=False)
+
+    async def sync_war_attacks(self, wars: list[dict]) -> list[str]:
+        """
+        War ids of `clan_wars` documents (projected to at least `WAR_KEY_PROJECTION`), rows are written
+        first for the ones that haven't ended or aren't stored yet
+        """
+        by_key = {war_key(war['data']): war['data'] for war in wars}
+        if not by_key:
+            return []
+        stored = set(await self.bot.war_attacks.distinct('war_id', {'war_id': {'$in': list(by_key)}, 'ended': True}))
+        missing = [data for key, data in by_key.items() if key not in stored]
+        if missing:
+            full_wars = await self.bot.clan_wars.find(
+                {'$or': [{'data.clan.tag': data['clan']['tag'], 'data.preparationStartTime': data['preparationStartTime']} for data in missing]},
+                projection={'_id': 0, 'data': 1},
+            ).to_list(length=None)
+            await self.write_war_attacks([war['data'] for war in full_wars])
+        return list(by_key)
+
+    async def get_war_attack_stats(
+        self,
+        war_ids: list[str],
+        clan_tags: list[str],
+        war_types: list[str],
+        th_filter: str = 'all',
+    ) -> list[dict]:
+        """Per attacker counts of the family's side of `war_ids`, see `build_war_attack_pipeline`"""
+        if not war_ids:
+            return []
+        match = build_war_attack_match(war_ids=war_ids, clan_tags=clan_tags, war_types=war_types, th_filter=th_filter)
+        return await self.bot.war_attacks.aggregate(build_war_attack_pipeline(match=match)).to_list(length=None)
@@ -27,7 +27,7 @@ class BaseClient:
 
     async def get_server_settings(self, server_id: int, cached=False):
 
-        if cached and (d := self.bot.SETTINGS_CACHE.get(f'{server_id}-server-settings')) is not None:
+        if cached and (d := self.bot.settings_cache.get('server-settings', server_id)) is not None:
             data = d
         else:
             pipeline = [
@@ -211,10 +211,12 @@ class BaseClient:
                     },
                 ]
                 data = await self.bot.server_db.aggregate(pipeline).to_list(length=1)
-            self.bot.SETTINGS_CACHE.ttl(f'{server_id}-server-settings', data, 60 * 60 * 24)
+            self.bot.settings_cache.set('server-settings', server_id, data)
         return DatabaseServer(bot=self.bot, data=data[0])
 
     async def get_server_embed_color(self, server_id: int) -> disnake.Color:
+        if (color := self.bot.settings_cache.get('embed-color', server_id)) is not None:
+            return disnake.Color(color)
         server_data = await self.bot.server_db.find_one({'server': server_id}, {'server': 1, 'embed_color': 1})
         if server_data is None:
             await self.bot.server_db.insert_one(
@@ -230,4 +232,6 @@ class BaseClient:
                 }
             )
             server_data = await self.bot.server_db.find_one({'server': server_id}, {'server': 1, 'embed_color': 1})
-        return disnake.Color(server_data.get('embed_color', EMBED_COLOR))
+        color = server_data.get('embed_color', EMBED_COLOR)
+        self.bot.settings_cache.set('embed-color', server_id, color)
+        return disnake.Color(color)
@@ -1,6 +1,74 @@
+from typing import Awaitable, Callable
+
+import pendulum as pend
+
+from classes.player.projection import SEASON_SUMMARY_FIELDS, find_player_stats
+from utility.clash.capital import get_season_raid_weeks
+from utility.clash.other import gen_season_start_end_as_iso
+from utility.season_rollup import ROLLUP_SIZE, SeasonRollup, rollup_id, summary_metrics, war_stars_pipeline
+
 from .clanclient import ClanClient
 
 
 class FamilyClient(ClanClient):
     def __init__(self, bot):
         super().__init__(bot)
+
+    async def get_season_rollup(
+        self, kind: str, owner: str | int, season: str, members: list[str], build: Callable[[], Awaitable[dict]], size: int = ROLLUP_SIZE
+    ) -> dict:
+        """The stored rollup of `members`, rebuilt with `build` when it is stale or holds fewer than `size` entries"""
+        _id = rollup_id(kind=kind, owner=owner, season=season, members=members)
+        now = int(pend.now(tz=pend.UTC).timestamp())
+        rollup = await self.bot.season_rollups.find_one({'_id': _id})
+        if rollup is not None and rollup['size'] >= size and (rollup['final'] or rollup['built_at'] > now - self.bot._config.season_rollup_ttl):
+            return rollup
+
+        rollup = await build()
+        # built after the season ended, nothing feeding it changes anymore
+        rollup |= {'_id': _id, 'built_at': now, 'final': season != self.bot.gen_season_date()}
+        await self.bot.season_rollups.replace_one({'_id': _id}, rollup, upsert=True)
+        return rollup
+
+    async def get_summary_rollup(self, owner: str | int, member_tags: list[str], season: str, size: int = ROLLUP_SIZE) -> dict:
+        """Loot, activity, trophies, donations, capital gold & war stars from the members' season stats"""
+
+        async def build():
+            raid_weeks = get_season_raid_weeks(season=season)
+            # we dont want results w/ no name
+            results = await find_player_stats(
+                bot=self.bot,
+                tags=member_tags,
+                fields=SEASON_SUMMARY_FIELDS + [f'capital_gold.{week}' for week in raid_weeks],
+                season=season,
+                filter={'name': {'$ne': None}},
+            )
+            rollup = SeasonRollup()
+            for stats in results:
+                rollup.add(tag=stats['tag'], name=stats['name'], metrics=summary_metrics(stats, season=season, raid_weeks=raid_weeks))
+            document = rollup.document(size=size)
+
+            SEASON_START, SEASON_END = gen_season_start_end_as_iso(season=season)
+            war_stars = await self.bot.clan_war.aggregate(
+                pipeline=war_stars_pipeline(member_tags=member_tags, season_start=SEASON_START, season_end=SEASON_END, limit=size)
+            ).to_list(length=None)
+            document['top']['war_stars'] = [[result.get('totalStars'), result.get('_id'), result.get('name')] for result in war_stars]
+            return document
+
+        return await self.get_season_rollup(kind='summary', owner=owner, season=season, members=member_tags, build=build, size=size)
+
+    async def get_clan_stats_rollup(self, server_id: int, clan_tags: list[str], season: str, size: int = ROLLUP_SIZE) -> dict:
+        """Donations, received & activity of the family's members from `clan_stats`, summed over the clans they were in"""
+
+        async def build():
+            rollup = SeasonRollup()
+            async for clan_stats in self.bot.clan_stats.find({'tag': {'$in': clan_tags}}, projection={'_id': 0, f'{season}': 1}):
+                for tag, data in clan_stats.get(season, {}).items():
+                    rollup.add(
+                        tag=tag,
+                        name=None,
+                        metrics={'donations': data.get('donated', 0), 'received': data.get('received', 0), 'activity': data.get('activity', 0)},
+                    )
+            return rollup.document(size=size, ascending=('donations', 'received', 'activity'), details=True)
+
+        return await self.get_season_rollup(kind='clanstats', owner=server_id, season=season, members=clan_tags, build=build, size=size)
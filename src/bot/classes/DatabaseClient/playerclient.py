@@ -1,6 +1,8 @@
 import coc
 
+from classes.player.stats import DefenseRate, HitRate
 from exceptions.CustomExceptions import MessageException
+from utility.clash.hitrate import build_hitrate_match, build_hitrate_pipeline, build_townhall_hitrate_match, empty_hitrate, fold_hitrate_rows
 
 from .Classes.player import LegendPlayer
 from .client import BaseClient
@@ -91,3 +93,46 @@ class PlayerClient(BaseClient):
             player_list.append(LegendPlayer(data=data, ranking_data=ranking_data, api_player=member))
 
         return player_list
+
+    async def get_hit_rates(
+        self,
+        tags: list[str],
+        defense: bool = False,
+        townhall_level: list | None = None,
+        townhalls: dict[str, int] | None = None,
+        fresh_type: list = [False, True],
+        start_timestamp: int = 0,
+        end_timestamp: int = 9999999999,
+        war_types: list = ['random', 'cwl', 'friendly'],
+        war_statuses: list = ['lost', 'losing', 'winning', 'won'],
+        war_sizes: list = [],
+    ) -> dict[str, list[HitRate | DefenseRate]]:
+        """
+        Hit (or defense) rates for many players in one grouped aggregation, keyed by tag, same shape as StatsPlayer.hit_rate.
+        `townhall_level=None` counts each player at their current townhall from `townhalls`, an empty list counts every townhall.
+        """
+        tags = list(set(tags))
+        if not tags:
+            return {}
+        filters = dict(
+            defense=defense,
+            fresh_type=fresh_type,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            war_types=war_types,
+            war_statuses=war_statuses,
+            war_sizes=war_sizes,
+        )
+        if townhall_level is None:
+            townhalls = townhalls or {}
+            match = build_townhall_hitrate_match(townhalls={tag: townhalls.get(tag) for tag in tags}, **filters)
+        else:
+            match = build_hitrate_match(tags=tags, townhall_level=townhall_level, **filters)
+        rows = await self.bot.warhits.aggregate(build_hitrate_pipeline(match=match, defense=defense)).to_list(length=None)
+        folded = fold_hitrate_rows(rows)
+
+        rate_class = DefenseRate if defense else HitRate
+        return {tag: [rate_class(hitrate_dict=hitrate, type=type) for type, hitrate in (folded.get(tag) or empty_hitrate()).items()] for tag in tags}
+
+    async def get_defense_rates(self, tags: list[str], **filters) -> dict[str, list[DefenseRate]]:
+        return await self.get_hit_rates(tags=tags, defense=True, **filters)
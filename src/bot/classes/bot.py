@@ -5,7 +5,7 @@ import io
 import re
 from datetime import datetime, timedelta
 from math import ceil
-from typing import Callable, Dict, List
+from typing import Callable, Dict, Iterable, List
 
 import aiohttp
 import coc
@@ -50,11 +50,21 @@ from classes.clashofstats import COSPlayerHistory
 from classes.config import Config
 from classes.DatabaseClient.familyclient import FamilyClient
 from classes.emoji import Emojis, EmojiType
+from classes.player.projection import find_player_stats, projection_keys
 from classes.player.stats import CustomClanClass, StatsPlayer
+from utility.button_cache import ButtonCache
 from utility.clash.other import is_cwl
 from utility.constants import BADGE_GUILDS, locations
+from utility.cwl_cache import CWLCache
 from utility.general import create_superscript, fetch
+from utility.http import HTTPClient, create_http_client
+from utility.imagegen.assets import BadgeCache, create_badge_cache
+from utility.legend_snapshot import LegendSnapshot
 from utility.login import coc_login
+from utility.name_index import NameIndex
+from utility.render import RenderPool, create_render_pool
+from utility.settings_cache import SettingsCache
+from utility.table_cache import TableCache, create_table_cache
 
 
 class CustomClient(commands.AutoShardedBot):
@@ -137,6 +147,8 @@ class CustomClient(commands.AutoShardedBot):
         self.bot_stats: collection_class = self.looper_db.feast.bot_stats
         self.clan_stats: collection_class = self.new_looper.clan_stats
         self.war_elo: collection_class = self.looper_db.looper.war_elo
+        self.war_attacks: collection_class = self.new_looper.war_attacks
+        self.season_rollups: collection_class = self.new_looper.season_rollups
 
         self.raid_weekend_db: collection_class = self.looper_db.looper.raid_weekends
         self.clan_join_leave: collection_class = self.looper_db.looper.join_leave_history
@@ -147,6 +159,7 @@ class CustomClient(commands.AutoShardedBot):
 
         self.autoboards: collection_class = self.looper_db.feast.autoboards
         self.legend_rankings: collection_class = self.new_looper.legend_rankings
+        self.legend_snapshots: collection_class = self.new_looper.legend_snapshots
         self.war_timers: collection_class = self.looper_db.looper.war_timer
         self.number_emojis: collection_class = self.looper_db.feast.number_emojis
 
@@ -201,6 +214,12 @@ class CustomClient(commands.AutoShardedBot):
         self.player_search: collection_class = self.db_client.usafam.player_search
 
         self.coc_client: coc.Client = asyncio.get_event_loop().run_until_complete(coc_login())
+        self.cwl_cache: CWLCache = CWLCache.from_config(config, coc_client=self.coc_client, not_found=(coc.NotFound,))
+
+        self.http_client: HTTPClient = create_http_client(config)
+        self.render_pool: RenderPool = create_render_pool(config)
+        self.badge_cache: BadgeCache = create_badge_cache(config)
+        self.table_cache: TableCache = create_table_cache(config)
 
         self.loaded_emojis: dict = {}
 
@@ -213,6 +232,11 @@ class CustomClient(commands.AutoShardedBot):
             max_connections=250,
             retry_on_error=[redis.ConnectionError],
         )
+        self.button_cache: ButtonCache = ButtonCache.from_config(config, redis=self.redis)
+        self.legend_snapshot: LegendSnapshot = LegendSnapshot.from_config(
+            config, rankings=self.legend_rankings, snapshots=self.legend_snapshots, redis=self.redis
+        )
+        self.name_index: NameIndex = NameIndex()
 
         self.locations = locations
 
@@ -225,6 +249,8 @@ class CustomClient(commands.AutoShardedBot):
         self.IMAGE_CACHE = ExpiringDict()
 
         self.SETTINGS_CACHE = ExpiringDict()
+        self.settings_cache: SettingsCache = SettingsCache.from_config(config, cache=self.SETTINGS_CACHE, redis=self.redis)
+        self.loop.create_task(self.settings_cache.listen())
 
         self.OUR_GUILDS = set()
 
@@ -233,6 +259,11 @@ class CustomClient(commands.AutoShardedBot):
 
         self.BADGE_GUILDS = BADGE_GUILDS
 
+    async def close(self):
+        await self.http_client.close()
+        await self.render_pool.close()
+        await super().close()
+
     def clean_string(self, text: str):
         text = emoji.replace_emoji(text)
         text = re.sub('[*_`~/]', '', text)
@@ -495,10 +526,9 @@ class CustomClient(commands.AutoShardedBot):
         tag = player.tag.replace('#', '')
         url = f'https://api.clashk.ing/ss/{tag}/706149153431879760'
 
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5 * 60)) as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    image_data = await response.read()
+        async with self.http_client.get(url, timeout=aiohttp.ClientTimeout(total=5 * 60)) as response:
+            if response.status == 200:
+                image_data = await response.read()
 
         image_file = io.BytesIO(image_data)
         image_file.seek(0)
@@ -558,7 +588,13 @@ class CustomClient(commands.AutoShardedBot):
         use_cache=True,
         fake_results=False,
         found_results=None,
+        fields: Iterable[str] | None = None,
+        season: str | None = None,
     ):
+        """
+        `fields` (with `season` for seasonal sections) limits the `player_stats` sections loaded for custom players,
+        see `classes/player/projection.py`, anything else can be fetched later with `StatsPlayer.load_fields`
+        """
         fresh_tags = fresh_tags or []
 
         tags = [p.split('|')[-1].strip() for p in tags]
@@ -567,10 +603,13 @@ class CustomClient(commands.AutoShardedBot):
         results_dict = {}
         results_list = found_results if found_results else []
         player_class = coc.Player
+        extra_kwargs = {}
         if custom is not False and not fake_results:
             if custom is True:
                 player_class = StatsPlayer
-                results_list = await self.player_stats.find({'tag': {'$in': tags}}).to_list(length=None)
+                results_list = await find_player_stats(bot=self, tags=tags, fields=fields, season=season)
+                if fields is not None:
+                    extra_kwargs['loaded_fields'] = projection_keys(fields, season=season)
             else:
                 player_class = custom
         elif custom is not False and fake_results:
@@ -587,9 +626,8 @@ class CustomClient(commands.AutoShardedBot):
             'Accept-Encoding': 'gzip',
         }
         data = [f"players/{t.replace('#', '%23')}" for t in tag_set]
-        async with aiohttp.ClientSession() as session:
-            async with session.post('https://api.clashk.ing/ck/bulk', json=data, headers=headers) as response:
-                data = await response.read()
+        async with self.http_client.post('https://api.clashk.ing/ck/bulk', json=data, headers=headers) as response:
+            data = await response.read()
         player_data: dict = ujson.loads(data)
         players.extend(
             (player_class)(
@@ -597,6 +635,7 @@ class CustomClient(commands.AutoShardedBot):
                 client=self.coc_client,
                 bot=self,
                 results=results_dict.get(data['tag'], {}),
+                **extra_kwargs,
             )
             for data in player_data
         )
@@ -714,14 +753,12 @@ class CustomClient(commands.AutoShardedBot):
         await self.cwl_db.delete_many({'data': None})
         missing = set(dates) - set(names)
         tasks = []
-        async with aiohttp.ClientSession() as session:
-            tag = clan.tag.replace('#', '')
-            for date in missing:
-                url = f'https://api.clashofstats.com/clans/{tag}/cwl/seasons/{date}'
-                task = asyncio.ensure_future(fetch(url, session, extra=date))
-                tasks.append(task)
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            await session.close()
+        tag = clan.tag.replace('#', '')
+        for date in missing:
+            url = f'https://api.clashofstats.com/clans/{tag}/cwl/seasons/{date}'
+            task = asyncio.ensure_future(fetch(url, self.http_client, extra=date))
+            tasks.append(task)
+        responses = await asyncio.gather(*tasks, return_exceptions=True)
 
         for response, date in responses:
             try:
@@ -734,11 +771,9 @@ class CustomClient(commands.AutoShardedBot):
 
     async def get_player_history(self, player_tag: str):
         url = f"https://api.clashofstats.com/players/{player_tag.replace('#', '')}/history/clans"
-        async with aiohttp.ClientSession(headers={'User-Agent': self._config.clashofstats_user_agent}) as session:
-            async with session.get(url) as resp:
-                history = await resp.json()
-                await session.close()
-                return COSPlayerHistory(data=history)
+        async with self.http_client.get(url, headers={'User-Agent': self._config.clashofstats_user_agent}) as resp:
+            history = await resp.json()
+            return COSPlayerHistory(data=history)
 
     @cached(ttl=None, cache=SimpleMemoryCache)
     async def get_country_names(self):
@@ -1,3 +1,5 @@
+from os import getenv
+
 from dotenv import load_dotenv
 
 
@@ -47,3 +49,27 @@ class Config:
 
         self.emoji_asset_version = remote_settings.get('emoji_version')
         self.websocket_url = remote_settings.get('websocket_url')
+
+        self.http_pool_limit = int(getenv('HTTP_POOL_LIMIT', '100'))
+        self.http_pool_limit_per_host = int(getenv('HTTP_POOL_LIMIT_PER_HOST', '20'))
+        self.http_total_timeout = float(getenv('HTTP_TOTAL_TIMEOUT', '30'))
+        self.http_connect_timeout = float(getenv('HTTP_CONNECT_TIMEOUT', '10'))
+        self.http_retries = int(getenv('HTTP_RETRIES', '2'))
+
+        self.render_workers = int(getenv('RENDER_WORKERS', '2'))
+        self.render_queue_size = int(getenv('RENDER_QUEUE_SIZE', '64'))
+        self.render_timeout = float(getenv('RENDER_TIMEOUT', '60'))
+
+        self.badge_cache_bytes = int(getenv('BADGE_CACHE_BYTES', str(64 * 1024 * 1024)))
+        self.badge_cache_dir = getenv('BADGE_CACHE_DIR')
+        self.table_cache_dir = getenv('TABLE_CACHE_DIR')
+        self.table_cache_bytes = int(getenv('TABLE_CACHE_BYTES', str(256 * 1024 * 1024)))
+
+        self.button_cache_ttl = int(getenv('BUTTON_CACHE_TTL', '300'))
+        self.button_cache_fresh = int(getenv('BUTTON_CACHE_FRESH', '30'))
+        self.settings_cache_ttl = int(getenv('SETTINGS_CACHE_TTL', '600'))
+        self.cwl_group_ttl = int(getenv('CWL_GROUP_TTL', '300'))
+        self.cwl_war_ttl = int(getenv('CWL_WAR_TTL', '60'))
+        self.season_rollup_ttl = int(getenv('SEASON_ROLLUP_TTL', '300'))
+        self.legend_snapshot_ttl = int(getenv('LEGEND_SNAPSHOT_TTL', '600'))
+        self.name_index_player_limit = int(getenv('NAME_INDEX_PLAYER_LIMIT', '0'))
@@ -0,0 +1,82 @@
+"""
+Field-level access to `player_stats`.
+
+A stats document carries years of `last_online_times`, legend days, donations and loot, most callers
+need one or two sections of one season. Callers name the sections they read (and the season, for
+sections keyed by season) and only those are projected, `StatsPlayer.load_fields` fetches anything
+that was left out later on.
+"""
+from typing import TYPE_CHECKING, Iterable, List
+
+
+if TYPE_CHECKING:
+    from classes.bot import CustomClient
+else:
+    from disnake import AutoShardedClient as CustomClient
+
+
+# sections keyed by season (`clan_games` by games season), a seasoned projection only pulls that season
+SEASONAL_SECTIONS = {
+    'activity',
+    'attack_wins',
+    'clan_games',
+    'dark_elixir',
+    'donations',
+    'elixir',
+    'gold',
+    'last_online_times',
+    'season_trophies',
+}
+
+# always projected, everything built from a stats document keys off them
+BASE_FIELDS = ('tag', 'name')
+
+# sections read by the clan & family season summaries (plus the season's `capital_gold.<week>` keys)
+SEASON_SUMMARY_FIELDS = ['gold', 'elixir', 'dark_elixir', 'activity', 'attack_wins', 'season_trophies', 'donations']
+
+
+def projection_keys(fields: Iterable[str], season: str | None = None) -> set[str]:
+    """Mongo paths for `fields`, dotted paths (i.e `capital_gold.<week>`) are kept as is"""
+    keys = set(BASE_FIELDS)
+    for field in fields:
+        if season is not None and field in SEASONAL_SECTIONS:
+            keys.add(f'{field}.{season}')
+        else:
+            keys.add(field)
+    # mongo rejects a projection holding both a path and one of its children
+    return {key for key in keys if '.' not in key or key.split('.')[0] not in keys}
+
+
+def stats_projection(fields: Iterable[str] | None, season: str | None = None) -> dict | None:
+    """`None` fields means the whole document"""
+    if fields is None:
+        return None
+    return {'_id': 0, **{key: 1 for key in projection_keys(fields, season=season)}}
+
+
+def covers(loaded: set[str] | None, key: str) -> bool:
+    """Whether a document projected on `loaded` (`None` for a whole document) holds `key`"""
+    if loaded is None:
+        return True
+    return key in loaded or key.split('.')[0] in loaded
+
+
+def merge_sections(results: dict, fetched: dict):
+    for key, value in fetched.items():
+        if isinstance(value, dict) and isinstance(results.get(key), dict):
+            merge_sections(results[key], value)
+        else:
+            results[key] = value
+
+
+async def find_player_stats(
+    bot: CustomClient,
+    tags: List[str],
+    fields: Iterable[str] | None = None,
+    season: str | None = None,
+    filter: dict | None = None,
+) -> List[dict]:
+    query = {'tag': {'$in': tags}}
+    if filter:
+        query = {'$and': [query, filter]}
+    return await bot.player_stats.find(query, stats_projection(fields, season=season)).to_list(length=None)
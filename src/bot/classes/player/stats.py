@@ -1,13 +1,14 @@
 import re
-from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Iterable, List
 
 import coc
 import emoji
 from coc import utils
 
+from classes.player.projection import covers, merge_sections, projection_keys
 from utility.clash.capital import gen_raid_weekend_datestrings
+from utility.clash.hitrate import build_hitrate_match, build_hitrate_pipeline, empty_hitrate, fold_hitrate_rows
 from utility.constants import SHORT_PLAYER_LINK, SUPER_SCRIPTS
 
 
@@ -29,10 +30,28 @@ class StatsPlayer(coc.Player):
         self.role_as_string = str(self.role)
         self.league_as_string = str(self.league)
         self.results = kwargs.pop('results')
+        # projection keys the results were fetched with, `None` for a whole document
+        self.loaded_fields: set[str] | None = kwargs.pop('loaded_fields', None)
         self.streak = self.results.get('legends', {}).get('streak', 0)
         self.town_hall_cls = CustomTownHall(self.town_hall)
         self.clear_name = self.get_name()
 
+    def missing_fields(self, fields: Iterable[str], season: str | None = None) -> set[str]:
+        return {key for key in projection_keys(fields, season=season) if not covers(self.loaded_fields, key)}
+
+    async def load_fields(self, fields: Iterable[str], season: str | None = None):
+        """Fetch stats sections left out of the projection this player was built with"""
+        missing = self.missing_fields(fields, season=season)
+        if not missing:
+            return self
+        fetched = await self.bot.player_stats.find_one({'tag': self.tag}, {'_id': 0, **{key: 1 for key in missing}})
+        if self.results is None:
+            self.results = {}
+        merge_sections(self.results, fetched or {})
+        self.loaded_fields |= missing
+        self.streak = self.results.get('legends', {}).get('streak', 0)
+        return self
+
     def get_name(self):
         name = emoji.replace_emoji(self.name)
         name = re.sub('[*_`~/]', '', name)
@@ -283,81 +302,17 @@ class StatsPlayer(coc.Player):
         war_statuses=['lost', 'losing', 'winning', 'won'],
         war_sizes=[],
     ):
-        if townhall_level is None:
-            townhall_level = self.town_hall
-        if townhall_level == []:
-            townhall_level = list(range(1, self.town_hall + 1))
-
-        if war_sizes == []:
-            war_sizes = [x for x in range(5, 55, 5)]
-
-        results = self.bot.warhits.find({'tag': self.tag})
-        count = await self.bot.warhits.count_documents({'tag': self.tag})
-
-        hit_rate_default = {
-            'num_hits': 0,
-            'total_stars': 0,
-            'total_destruction': 0,
-            'total_triples': 0,
-            'two_stars': 0,
-            'one_stars': 0,
-            'zero_stars': 0,
-        }
-        if count == 0:
-            return [HitRate(hitrate_dict=hit_rate_default, type='All')]
-        prev_ = []
-        hit_rates = defaultdict(lambda: defaultdict(int))
-        async for result in results:
-            townhall = result.get('townhall')
-            fresh = result.get('fresh')
-            time = result.get('_time')
-            type = result.get('war_type')
-            status = result.get('war_status')
-            war_size = result.get('war_size')
-            if f"{self.tag}-{result.get('war_start')}-{result.get('defender_tag')}" in prev_:
-                continue
-            prev_.append(f"{self.tag}-{result.get('war_start')}-{result.get('defender_tag')}")
-
-            if (
-                (townhall in townhall_level)
-                and (fresh in fresh_type)
-                and (time >= start_timestamp)
-                and (time <= end_timestamp)
-                and (type in war_types)
-                and (status in war_statuses)
-            ):
-                if len(war_sizes) == 1 and war_size not in war_sizes:
-                    continue
-                hr_type = f"{townhall}v{result.get('defender_townhall')}"
-                hit_rates['All']['num_hits'] += 1
-                hit_rates[hr_type]['num_hits'] += 1
-
-                hit_rates['All']['total_stars'] += result.get('stars')
-                hit_rates[hr_type]['total_stars'] += result.get('stars')
-
-                hit_rates['All']['total_destruction'] += result.get('destruction')
-                hit_rates[hr_type]['total_destruction'] += result.get('destruction')
-
-                if result.get('stars') == 3:
-                    hit_rates['All']['total_triples'] += 1
-                    hit_rates[hr_type]['total_triples'] += 1
-                elif result.get('stars') == 2:
-                    hit_rates['All']['two_stars'] += 1
-                    hit_rates[hr_type]['two_stars'] += 1
-                elif result.get('stars') == 1:
-                    hit_rates['All']['one_stars'] += 1
-                    hit_rates[hr_type]['one_stars'] += 1
-                elif result.get('stars') == 0:
-                    hit_rates['All']['zero_stars'] += 1
-                    hit_rates[hr_type]['zero_stars'] += 1
-
-        list_hr = []
-        for type, hitrate in hit_rates.items():
-            list_hr.append(HitRate(hitrate_dict=hitrate, type=type))
-        if list_hr == []:
-            list_hr.append(HitRate(hitrate_dict=hit_rate_default, type='All'))
-
-        return list_hr
+        hit_rates = await self._aggregate_rates(
+            defense=False,
+            townhall_level=townhall_level,
+            fresh_type=fresh_type,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            war_types=war_types,
+            war_statuses=war_statuses,
+            war_sizes=war_sizes,
+        )
+        return [HitRate(hitrate_dict=hitrate, type=type) for type, hitrate in hit_rates.items()]
 
     async def defense_rate(
         self,
@@ -369,80 +324,27 @@ class StatsPlayer(coc.Player):
         war_statuses=['lost', 'losing', 'winning', 'won'],
         war_sizes=[],
     ):
-        if townhall_level is None:
-            townhall_level = self.town_hall
+        hit_rates = await self._aggregate_rates(
+            defense=True,
+            townhall_level=townhall_level,
+            fresh_type=fresh_type,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            war_types=war_types,
+            war_statuses=war_statuses,
+            war_sizes=war_sizes,
+        )
+        return [DefenseRate(hitrate_dict=hitrate, type=type) for type, hitrate in hit_rates.items()]
 
+    async def _aggregate_rates(self, defense: bool, townhall_level, war_sizes, **filters):
+        if townhall_level is None:
+            townhall_level = [self.town_hall]
         if townhall_level == []:
             townhall_level = list(range(1, self.town_hall + 1))
 
-        if war_sizes == []:
-            war_sizes = [x for x in range(5, 55, 5)]
-
-        results = self.bot.warhits.find({'defender_tag': self.tag})
-        count = await self.bot.warhits.count_documents({'defender_tag': self.tag})
-
-        hit_rate_default = {
-            'num_hits': 0,
-            'total_stars': 0,
-            'total_destruction': 0,
-            'total_triples': 0,
-            'two_stars': 0,
-            'one_stars': 0,
-            'zero_stars': 0,
-        }
-        if count == 0:
-            return [DefenseRate(hitrate_dict=hit_rate_default, type='All')]
-        prev_ = []
-        hit_rates = defaultdict(lambda: defaultdict(int))
-        async for result in results:
-            townhall = result.get('defender_townhall')
-            fresh = result.get('fresh')
-            time = result.get('_time')
-            type = result.get('war_type')
-            status = result.get('war_status')
-            war_size = result.get('war_size')
-            if f"{self.tag}-{result.get('war_start')}-{result.get('defender_tag')}" in prev_:
-                continue
-            prev_.append(f"{self.tag}-{result.get('war_start')}-{result.get('defender_tag')}")
-            if (
-                (townhall in townhall_level)
-                and (fresh in fresh_type)
-                and (time >= start_timestamp)
-                and (time <= end_timestamp)
-                and (type in war_types)
-                and (status in war_statuses)
-            ):
-                if len(war_sizes) == 1 and war_size not in war_sizes:
-                    continue
-                hr_type = f"{townhall}v{result.get('defender_townhall')}"
-                hit_rates['All']['num_hits'] += 1
-                hit_rates[hr_type]['num_hits'] += 1
-
-                hit_rates['All']['total_stars'] += result.get('stars')
-                hit_rates[hr_type]['total_stars'] += result.get('stars')
-
-                hit_rates['All']['total_destruction'] += result.get('destruction')
-                hit_rates[hr_type]['total_destruction'] += result.get('destruction')
-
-                if result.get('stars') == 3:
-                    hit_rates['All']['total_triples'] += 1
-                    hit_rates[hr_type]['total_triples'] += 1
-                elif result.get('stars') == 2:
-                    hit_rates['All']['two_stars'] += 1
-                    hit_rates[hr_type]['two_stars'] += 1
-                elif result.get('stars') == 1:
-                    hit_rates['All']['one_stars'] += 1
-                    hit_rates[hr_type]['one_stars'] += 1
-                elif result.get('stars') == 0:
-                    hit_rates['All']['zero_stars'] += 1
-                    hit_rates[hr_type]['zero_stars'] += 1
-
-        list_hr = []
-        for type, hitrate in hit_rates.items():
-            list_hr.append(DefenseRate(hitrate_dict=hitrate, type=type))
-        if list_hr == []:
-            list_hr.append(DefenseRate(hitrate_dict=hit_rate_default, type='All'))
-        return list_hr
+        match = build_hitrate_match(tags=self.tag, defense=defense, townhall_level=townhall_level, war_sizes=war_sizes, **filters)
+        rows = await self.bot.warhits.aggregate(build_hitrate_pipeline(match=match, defense=defense)).to_list(length=None)
+        return fold_hitrate_rows(rows).get(self.tag) or empty_hitrate()
 
     def clan_games(self, date=None):
         if date is None:
@@ -1,3 +1,5 @@
+import asyncio
+import time as _time
 from typing import List
 
 from classes.bot import CustomClient
@@ -5,6 +7,62 @@ from classes.roster import Roster
 from utility.constants import ROLES, TOWNHALL_LEVELS
 
 
+# reminder types the scheduler delivers, war/capital/games reminders are sent from their game events
+SCHEDULED_REMINDER_TYPES = ['inactivity', 'roster']
+
+# inactivity reminders are checked on this interval, each check covers the window since the previous one
+INACTIVITY_CHECK_INTERVAL = 30 * 60
+
+_scheduler_wakeup = asyncio.Event()
+
+
+def reminder_hours(time: str) -> float:
+    return float(str(time).replace('hr', ''))
+
+
+def next_fire_time(type: str, time: str | None, roster_time: int | None = None, now: int | None = None) -> int | None:
+    """Unix time a scheduled reminder is next due, `None` if it has nothing to fire"""
+    now = int(_time.time()) if now is None else now
+    if type == 'inactivity':
+        return now + INACTIVITY_CHECK_INTERVAL
+    if type == 'roster':
+        if time is None or roster_time is None:
+            return None
+        return int(float(roster_time) - reminder_hours(time) * 3600)
+    return None
+
+
+def schedule_fields(type: str, time: str | None, roster_time: int | None = None) -> dict:
+    """Scheduling fields to store on a (new) reminder document"""
+    now = int(_time.time())
+    fields = {'next_fire': next_fire_time(type=type, time=time, roster_time=roster_time, now=now)}
+    if type == 'inactivity':
+        fields['last_fire'] = now
+    return fields
+
+
+def wake_reminder_scheduler():
+    _scheduler_wakeup.set()
+
+
+async def wait_for_reminder_wakeup(timeout: float):
+    """Sleep until `timeout` passes or a reminder is created/edited"""
+    try:
+        await asyncio.wait_for(_scheduler_wakeup.wait(), timeout=max(timeout, 0))
+    except asyncio.TimeoutError:
+        pass
+    _scheduler_wakeup.clear()
+
+
+async def reschedule_roster_reminders(bot: CustomClient, roster_id, roster_time: int | None):
+    async for reminder in bot.reminders.find({'$and': [{'roster': roster_id}, {'type': 'roster'}]}, {'time': 1}):
+        await bot.reminders.update_one(
+            {'_id': reminder.get('_id')},
+            {'$set': {'next_fire': next_fire_time(type='roster', time=reminder.get('time'), roster_time=roster_time)}},
+        )
+    wake_reminder_scheduler()
+
+
 class Reminder:
     def __init__(self, bot: CustomClient, data):
         self.__bot = bot
@@ -16,6 +74,8 @@ class Reminder:
         self.time: str = data.get('time')
         self.custom_text: str = data.get('custom_text', '')
         self.reminder_id = data.get('_id')
+        self.next_fire: int | None = data.get('next_fire')
+        self.last_fire: int | None = data.get('last_fire')
 
     @property
     def townhalls(self):
@@ -66,109 +126,46 @@ class Reminder:
             return Roster(bot=self.__bot, roster_result=result)
         return None
 
-    async def set_channel_id(self, id: int):
+    async def _update(self, fields: dict, key: dict = None):
+        key = key or {'clan': self.clan_tag}
         await self.__bot.reminders.update_one(
             {
                 '$and': [
-                    {'clan': self.clan_tag},
+                    key,
                     {'type': self.type},
                     {'time': self.time},
                     {'server': self.server_id},
                 ]
             },
-            {'$set': {'channel': id}},
+            {'$set': fields},
         )
+        # an edited reminder may be due sooner (or deliverable again, i.e a new channel), let the scheduler re-check
+        wake_reminder_scheduler()
+
+    async def set_channel_id(self, id: int):
+        await self._update({'channel': id})
 
     async def set_roles(self, roles: List[str]):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'roles': roles}},
-        )
+        await self._update({'roles': roles})
 
     async def set_townhalls(self, townhalls: List[int]):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'townhall_filter': townhalls}},
-        )
+        await self._update({'townhall_filter': townhalls})
 
     async def set_custom_text(self, custom_text: str):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'custom_text': custom_text}},
-        )
+        await self._update({'custom_text': custom_text})
 
     async def set_war_types(self, types: List[str]):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'types': types}},
-        )
+        await self._update({'types': types})
 
     async def set_ping_type(self, type: str):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'roster': self.__data.get('roster')},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'ping_type': type}},
-        )
+        await self._update({'ping_type': type}, key={'roster': self.__data.get('roster')})
 
     async def set_attack_threshold(self, threshold: int):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'attack_threshold': threshold}},
-        )
+        await self._update({'attack_threshold': threshold})
 
     async def set_point_threshold(self, threshold: int):
-        await self.__bot.reminders.update_one(
-            {
-                '$and': [
-                    {'clan': self.clan_tag},
-                    {'type': self.type},
-                    {'time': self.time},
-                    {'server': self.server_id},
-                ]
-            },
-            {'$set': {'point_threshold': threshold}},
-        )
+        await self._update({'point_threshold': threshold})
 
     async def delete(self):
         await self.__bot.reminders.delete_one({'_id': self.reminder_id})
+        wake_reminder_scheduler()
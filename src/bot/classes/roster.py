@@ -10,7 +10,6 @@ import disnake
 import emoji
 
 from classes.bot import CustomClient
-from classes.player.stats import StatsPlayer
 from exceptions.CustomExceptions import *
 from utility.cdn import general_upload_to_cdn
 
@@ -402,7 +401,7 @@ class Roster:
         columns = self.columns
         members = await self.bot.get_players(
             tags=[member.get('tag') for member in members],
-            custom=('30 Day Hitrate' in columns),
+            custom=False,
             use_cache=False,
         )
         has_ran = False
@@ -416,14 +415,16 @@ class Roster:
 
         if '30 Day Hitrate' in columns:
             has_ran = True
+            hit_rates = await self.bot.ck_client.get_hit_rates(
+                tags=[member.tag for member in members if member is not None],
+                townhalls={member.tag: member.town_hall for member in members if member is not None},
+                start_timestamp=int((datetime.utcnow() - timedelta(days=30)).timestamp()),
+                end_timestamp=int(datetime.utcnow().timestamp()),
+            )
             for member in members:
-                member: StatsPlayer
                 if member is None:
                     continue
-                hr = await member.hit_rate(
-                    start_timestamp=int((datetime.utcnow() - timedelta(days=30)).timestamp()),
-                    end_timestamp=int(datetime.utcnow().timestamp()),
-                )
+                hr = hit_rates[member.tag]
                 await self.update_member(
                     player=member,
                     field='hitrate',
@@ -841,6 +842,10 @@ class Roster:
             },
             {'$set': {'time': time}},
         )
+        # roster reminders fire relative to the roster time
+        from classes.reminders import reschedule_roster_reminders
+
+        await reschedule_roster_reminders(bot=self.bot, roster_id=self._id, roster_time=time)
 
     async def set_description(self, description: (str, None)):
         await self.bot.rosters.update_one(
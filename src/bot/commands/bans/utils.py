@@ -112,7 +112,7 @@ async def remove_ban(bot: CustomClient, player: coc.Player, removed_by: disnake.
 
 
 async def send_ban_log(bot: CustomClient, guild: disnake.Guild, reason: disnake.Embed):
-    server_db = await bot.ck_client.get_server_settings(server_id=guild.id)
+    server_db = await bot.ck_client.get_server_settings(server_id=guild.id, cached=True)
     if server_db.banlist_channel is not None:
         ban_log_channel = await bot.getch_channel(channel_id=server_db.banlist_channel)
         if ban_log_channel is not None:
@@ -200,7 +200,15 @@ class MessageCommands(commands.Cog):
                 webhook_message = await webhook.send(embed=placeholder, components=[], wait=True)
             await self.bot.autoboards.update_one(
                 {'$and': [{'button_id': custom_id}, {'server_id': ctx.guild_id}, {'type': 'refresh'}]},
-                {'$set': {'webhook_id': webhook.id, 'thread_id': thread, 'message_id': webhook_message.id, 'locale': str(ctx.locale)}},
+                {
+                    '$set': {
+                        'webhook_id': webhook.id,
+                        'thread_id': thread,
+                        'message_id': webhook_message.id,
+                        'locale': str(ctx.locale),
+                        'content_hash': None,
+                    }
+                },
                 upsert=True,
             )
             await message.delete()
@@ -10,14 +10,15 @@ from disnake import Embed
 from disnake.utils import get
 
 from classes.bot import CustomClient
-from classes.player.stats import ClanCapitalWeek, LegendRanking, StatsPlayer
+from classes.player.stats import LegendRanking, StatsPlayer
 from exceptions.CustomExceptions import MessageException
-from utility.clash.capital import calc_raid_medals, gen_raid_weekend_datestrings, get_raidlog_entry, get_season_raid_weeks
+from utility.clash.capital import calc_raid_medals, gen_raid_weekend_datestrings, get_raidlog_entry
 from utility.clash.other import *
 from utility.constants import EMBED_COLOR_CLASS, SUPER_SCRIPTS, item_to_name
 from utility.discord_utils import register_button
 from utility.general import create_superscript, response_to_line, smart_convert_seconds
 from utility.imagegen.ClanCapitalResult import generate_raid_result_image
+from utility.season_rollup import ROLLUP_SIZE, ranked
 
 from ..graphs.utils import daily_graph
 
@@ -1288,170 +1289,54 @@ async def clan_summary(
 ):
     season = bot.gen_season_date() if season is None else season
     member_tags = [member.tag for member in clan.members]
-    # we dont want results w/ no name
-    results = await bot.player_stats.find({'$and': [{'tag': {'$in': member_tags}}, {'name': {'$ne': None}}]}).to_list(length=None)
-
-    if not results:
+    rollup = await bot.ck_client.get_summary_rollup(owner=clan.tag, member_tags=member_tags, season=season, size=max(limit, ROLLUP_SIZE))
+    if not rollup['count']:
         raise MessageException("No stats for this clan found. If you haven't already, add it with `/addclan`")
     text = ''
     for option, emoji in zip(
         ['gold', 'elixir', 'dark_elixir'],
         [bot.emoji.gold, bot.emoji.elixir, bot.emoji.dark_elixir],
     ):
-        top_results = sorted(results, key=lambda x: x.get(option, {}).get(season, 0), reverse=True)[:limit]
-        if top_results[0] == 0:
-            continue
-        for count, result in enumerate(top_results, 1):
-            looted = result.get(option, {}).get(season, 0)
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
             if looted == 0:
                 continue
             if count == 1:
                 text += f"**{emoji} {option.replace('_', ' ').title()}\n**"
-            text += f"`{count:<2} {'{:,}'.format(looted):11} \u200e{result['name']}`\n"
+            text += f"`{count:<2} {'{:,}'.format(looted):11} \u200e{name}`\n"
         text += '\n'
 
     for option, emoji in zip(
         ['activity', 'attack_wins', 'season_trophies'],
         [bot.emoji.clock, bot.emoji.wood_swords, bot.emoji.trophy],
     ):
-        top_results = sorted(results, key=lambda x: x.get(option, {}).get(season, 0), reverse=True)[:limit]
-        if top_results[0] == 0:
-            continue
-        for count, result in enumerate(top_results, 1):
-            looted = result.get(option, {}).get(season, 0)
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
             if looted == 0:
                 continue
             if count == 1:
                 text += f"**{emoji} {option.replace('_', ' ').title()}\n**"
-            text += f"`{count:<2} {'{:,}'.format(looted):4} \u200e{result['name']}`\n"
+            text += f"`{count:<2} {'{:,}'.format(looted):4} \u200e{name}`\n"
         text += '\n'
 
     first_embed = disnake.Embed(description=text, color=embed_color)
     first_embed.set_author(name=f'{clan.name} Season Summary ({season})', icon_url=clan.badge.url)
     text = ''
 
-    top_results = sorted(
-        results,
-        key=lambda x: x.get('donations', {}).get(season, {}).get('donated', 0),
-        reverse=True,
-    )[:limit]
-    text += f'**{bot.emoji.up_green_arrow} Donations\n**'
-    for count, result in enumerate(top_results, 1):
-        looted = result.get('donations', {}).get(season, {}).get('donated', 0)
-        text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    top_results = sorted(
-        results,
-        key=lambda x: x.get('donations', {}).get(season, {}).get('received', 0),
-        reverse=True,
-    )[:limit]
-    text += f'**{bot.emoji.down_red_arrow} Received\n**'
-    for count, result in enumerate(top_results, 1):
-        looted = result.get('donations', {}).get(season, {}).get('received', 0)
-        text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    season_raid_weeks = get_season_raid_weeks(season=season)
-
-    def capital_gold_donated(elem):
-        cc_results = []
-        for week in season_raid_weeks:
-            week_result = elem.get('capital_gold', {}).get(week)
-            cc_results.append(ClanCapitalWeek(week_result))
-        return sum([sum(cap.donated) for cap in cc_results])
-
-    top_capital_donos = sorted(results, key=capital_gold_donated, reverse=True)[:limit]
-    text += f'**{bot.emoji.capital_gold} CG Donated\n**'
-    for count, result in enumerate(top_capital_donos, 1):
-        cg_donated = capital_gold_donated(result)
-        text += f"`{count:<2} {'{:,}'.format(cg_donated):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    def capital_gold_raided(elem):
-        cc_results = []
-        for week in season_raid_weeks:
-            week_result = elem.get('capital_gold', {}).get(week)
-            cc_results.append(ClanCapitalWeek(week_result))
-        return sum([sum(cap.raided) for cap in cc_results])
-
-    top_capital_raided = sorted(results, key=capital_gold_raided, reverse=True)[:limit]
-    text += f'**{bot.emoji.capital_gold} CG Raided\n**'
-    for count, result in enumerate(top_capital_raided, 1):
-        cg_raided = capital_gold_raided(result)
-        text += f"`{count:<2} {'{:,}'.format(cg_raided):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    SEASON_START, SEASON_END = gen_season_start_end_as_iso(season=season)
-    pipeline = [
-        {
-            '$match': {
-                '$and': [
-                    {
-                        '$or': [
-                            {'data.clan.members.tag': {'$in': member_tags}},
-                            {'data.opponent.members.tag': {'$in': member_tags}},
-                        ]
-                    },
-                    {'data.preparationStartTime': {'$gte': SEASON_START}},
-                    {'data.preparationStartTime': {'$lte': SEASON_END}},
-                    {'type': {'$ne': 'friendly'}},
-                ]
-            }
-        },
-        {
-            '$project': {
-                '_id': 0,
-                'uniqueKey': {
-                    '$concat': [
-                        {
-                            '$cond': {
-                                'if': {'$lt': ['$data.clan.tag', '$data.opponent.tag']},
-                                'then': '$data.clan.tag',
-                                'else': '$data.opponent.tag',
-                            }
-                        },
-                        {
-                            '$cond': {
-                                'if': {'$lt': ['$data.opponent.tag', '$data.clan.tag']},
-                                'then': '$data.opponent.tag',
-                                'else': '$data.clan.tag',
-                            }
-                        },
-                        '$data.preparationStartTime',
-                    ]
-                },
-                'data': 1,
-            }
-        },
-        {'$group': {'_id': '$uniqueKey', 'data': {'$first': '$data'}}},
-        {'$project': {'members': {'$concatArrays': ['$data.clan.members', '$data.opponent.members']}}},
-        {'$unwind': '$members'},
-        {'$match': {'members.tag': {'$in': member_tags}}},
-        {
-            '$project': {
-                '_id': 0,
-                'tag': '$members.tag',
-                'name': '$members.name',
-                'stars': {'$sum': '$members.attacks.stars'},
-            }
-        },
-        {
-            '$group': {
-                '_id': '$tag',
-                'name': {'$last': '$name'},
-                'totalStars': {'$sum': '$stars'},
-            }
-        },
-        {'$sort': {'totalStars': -1}},
-        {'$limit': limit},
-    ]
-    war_star_results = await bot.clan_war.aggregate(pipeline=pipeline).to_list(length=None)
+    for option, emoji, title in (
+        ('donated', bot.emoji.up_green_arrow, 'Donations'),
+        ('received', bot.emoji.down_red_arrow, 'Received'),
+        ('capital_donated', bot.emoji.capital_gold, 'CG Donated'),
+        ('capital_raided', bot.emoji.capital_gold, 'CG Raided'),
+    ):
+        text += f'**{emoji} {title}\n**'
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
+            text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{name}`\n"
+        text += '\n'
 
+    war_star_results = ranked(rollup, 'war_stars', limit)
     if war_star_results:
         text += f'**{bot.emoji.war_star} War Stars\n**'
-        for count, result in enumerate(war_star_results, 1):
-            text += f"`{count:<2} {'{:,}'.format(result.get('totalStars')):3} \u200e{result.get('name')}`\n"
+        for count, (stars, tag, name) in enumerate(war_star_results, 1):
+            text += f"`{count:<2} {'{:,}'.format(stars):3} \u200e{name}`\n"
 
     second_embed = disnake.Embed(description=text, color=embed_color)
     second_embed.timestamp = pend.now(tz=pend.UTC)
@@ -1628,17 +1513,18 @@ async def create_offensive_hitrate(
     if not townhall_level:
         townhall_level = list(range(1, 17))
     tasks = []
+    hit_rates = await bot.ck_client.get_hit_rates(
+        tags=[player.tag for player in players],
+        townhall_level=townhall_level,
+        fresh_type=fresh_type,
+        start_timestamp=start_timestamp,
+        end_timestamp=end_timestamp,
+        war_types=war_types,
+        war_statuses=war_statuses,
+    )
 
     async def fetch_n_rank(player: StatsPlayer):
-        hitrate = await player.hit_rate(
-            townhall_level=townhall_level,
-            fresh_type=fresh_type,
-            start_timestamp=start_timestamp,
-            end_timestamp=end_timestamp,
-            war_types=war_types,
-            war_statuses=war_statuses,
-        )
-        hr = hitrate[0]
+        hr = hit_rates[player.tag][0]
         if hr.num_attacks == 0:
             return None
         hr_nums = f'{hr.total_triples}/{hr.num_attacks}'.center(5)
@@ -1699,17 +1585,18 @@ async def create_defensive_hitrate(
     if not townhall_level:
         townhall_level = list(range(1, 17))
     tasks = []
+    hit_rates = await bot.ck_client.get_defense_rates(
+        tags=[player.tag for player in players],
+        townhall_level=townhall_level,
+        fresh_type=fresh_type,
+        start_timestamp=start_timestamp,
+        end_timestamp=end_timestamp,
+        war_types=war_types,
+        war_statuses=war_statuses,
+    )
 
     async def fetch_n_rank(player: StatsPlayer):
-        hitrate = await player.defense_rate(
-            townhall_level=townhall_level,
-            fresh_type=fresh_type,
-            start_timestamp=start_timestamp,
-            end_timestamp=end_timestamp,
-            war_types=war_types,
-            war_statuses=war_statuses,
-        )
-        hr = hitrate[0]
+        hr = hit_rates[player.tag][0]
         if hr.num_attacks == 0:
             return None
         hr_nums = f'{hr.total_triples}/{hr.num_attacks}'.center(5)
@@ -1770,17 +1657,18 @@ async def create_stars_leaderboard(
     if not townhall_level:
         townhall_level = list(range(1, 17))
     tasks = []
+    hit_rates = await bot.ck_client.get_hit_rates(
+        tags=[player.tag for player in players],
+        townhall_level=townhall_level,
+        fresh_type=fresh_type,
+        start_timestamp=start_timestamp,
+        end_timestamp=end_timestamp,
+        war_types=war_types,
+        war_statuses=war_statuses,
+    )
 
     async def fetch_n_rank(player: StatsPlayer):
-        hitrate = await player.hit_rate(
-            townhall_level=townhall_level,
-            fresh_type=fresh_type,
-            start_timestamp=start_timestamp,
-            end_timestamp=end_timestamp,
-            war_types=war_types,
-            war_statuses=war_statuses,
-        )
-        hr = hitrate[0]
+        hr = hit_rates[player.tag][0]
         if hr.num_attacks == 0:
             return None
         name = str(player.name)[0:12]
@@ -4,39 +4,21 @@ import disnake
 from disnake.ext import commands
 
 from classes.bot import CustomClient
+from utility.button_cache import ButtonCache
 from utility.components import button_generator
 from utility.discord_utils import registered_functions
 import pendulum as pend
 
-async def button_logic(
-    button_data: str,
+async def render_button(
+    function,
+    split_data: list[str],
+    parser_split: list[str],
     bot: CustomClient,
     guild: disnake.Guild,
     locale: disnake.Locale,
     ctx: disnake.MessageInteraction | None = None,
-    autoboard: bool = False,
 ):
-    split_data = button_data.split(':')
-    lookup_name = button_data.split(':')[0]
-
-    function, parser, ephemeral, no_embed, pagination = registered_functions.get(lookup_name, (None, '', False, False, False))
-
-    if function is None:
-        return None, 0  # maybe change this
-    if ctx:
-        await ctx.response.defer(ephemeral=ephemeral)
-
-    page = 0
-    if pagination and 'page=' in split_data[-1]:
-        page = int(split_data.pop(-1).replace('page=', ''))
-
-    if ctx is not None and not autoboard and pagination and ctx.author.id != ctx.message.interaction.author.id and page != -1:
-        await ctx.send('Must run the command to interact with pagination', ephemeral=True)
-        return None, 0
-
-    page = max(page, 0)
-
-    parser_split = parser.split(':')
+    """Resolve the button id's args (clans, players, members...) and call the registered function"""
     hold_kwargs = {'bot': bot, 'server': guild, 'locale': locale}
     for data, name in zip(split_data[1:], parser_split[1:]):
         if data.isdigit():
@@ -72,7 +54,60 @@ async def button_logic(
 
     # Keep only valid keys
     hold_kwargs = {key: hold_kwargs[key] for key in valid_keys if key in hold_kwargs}
-    embed = await function(**hold_kwargs)
+    return await function(**hold_kwargs)
+
+
+async def button_logic(
+    button_data: str,
+    bot: CustomClient,
+    guild: disnake.Guild,
+    locale: disnake.Locale,
+    ctx: disnake.MessageInteraction | None = None,
+    autoboard: bool = False,
+):
+    split_data = button_data.split(':')
+    lookup_name = button_data.split(':')[0]
+
+    function, parser, ephemeral, no_embed, pagination = registered_functions.get(lookup_name, (None, '', False, False, False))
+
+    if function is None:
+        return None, 0  # maybe change this
+    if ctx:
+        await ctx.response.defer(ephemeral=ephemeral)
+
+    page = 0
+    if pagination and 'page=' in split_data[-1]:
+        page = int(split_data.pop(-1).replace('page=', ''))
+
+    if ctx is not None and not autoboard and pagination and ctx.author.id != ctx.message.interaction.author.id and page != -1:
+        await ctx.send('Must run the command to interact with pagination', ephemeral=True)
+        return None, 0
+
+    # a board's own button (refresh, or the page counter of a paginated one) only takes a recent render
+    refresh = ctx is not None and not autoboard and ctx.data.component_type == disnake.ComponentType.button and (not pagination or page < 0)
+    if page <= -2:
+        page = -page - 2
+    page = max(page, 0)
+
+    parser_split = parser.split(':')
+    embed = None
+    cache_key = None
+    # renders are shared across presses, boards & clusters, unless they depend on who pressed the button
+    guild_id = guild.id if guild else None
+    dependencies = None if no_embed else ButtonCache.dependencies(guild_id=guild_id, split_data=split_data, parser_split=parser_split)
+    if dependencies is not None:
+        try:
+            cache_key = await bot.button_cache.key(button_id=':'.join(split_data), guild_id=guild_id, locale=locale, dependencies=dependencies)
+            embed = await bot.button_cache.get(cache_key, max_age=bot.button_cache.fresh if refresh else None)
+        except Exception:
+            cache_key = None
+
+    if embed is None:
+        embed = await render_button(
+            function=function, split_data=split_data, parser_split=parser_split, bot=bot, guild=guild, locale=locale, ctx=ctx
+        )
+        if cache_key is not None:
+            await bot.button_cache.set(cache_key, embed)
 
     components = 0
     if pagination and isinstance(embed, list):
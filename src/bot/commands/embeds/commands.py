@@ -1,4 +1,3 @@
-import aiohttp
 import disnake
 from disnake.ext import commands
 
@@ -36,12 +35,11 @@ class Embeds(commands.Cog):
         if 'discohook.app' in discohook_url_or_messsage_link:
 
             id = discohook_url_or_messsage_link.split('share=')[-1]
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f'https://discohook.app/api/v1/share/{id}') as response:
-                    if response.status == 200:
-                        discohook_data = await response.json()
-                    else:
-                        raise MessageException('Invalid Discohook Link. Must use https://discohook.app')
+            async with self.bot.http_client.get(f'https://discohook.app/api/v1/share/{id}') as response:
+                if response.status == 200:
+                    discohook_data = await response.json()
+                else:
+                    raise MessageException('Invalid Discohook Link. Must use https://discohook.app')
             decoded_embed = reverse_encoding(embed_dict=dict(discohook_data))
 
         elif 'discord.com' in discohook_url_or_messsage_link:
@@ -89,12 +87,11 @@ class Embeds(commands.Cog):
             await ctx.edit_original_message(content='Click the button below to edit your embed', components=[buttons])
         else:
             id = discohook_url.split('share=')[-1]
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f'https://discohook.app/api/v1/share/{id}') as response:
-                    if response.status == 200:
-                        discohook_data = await response.json()
-                    else:
-                        raise MessageException('Invalid Discohook Link. Must use https://discohook.app')
+            async with self.bot.http_client.get(f'https://discohook.app/api/v1/share/{id}') as response:
+                if response.status == 200:
+                    discohook_data = await response.json()
+                else:
+                    raise MessageException('Invalid Discohook Link. Must use https://discohook.app')
             decoded_embed = reverse_encoding(embed_dict=dict(discohook_data))
             await self.bot.custom_embeds.update_one(
                 {'$and': [{'server': ctx.guild_id}, {'name': name}]},
@@ -170,6 +170,7 @@ class eval(commands.Cog, name='Refresh'):
 
         if state is not None:
             await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$set': {'autoeval': state == 'On'}})
+            await self.bot.settings_cache.invalidate(ctx.guild.id)
             changed_text += f'- **AutoRefresh State:** {state}\n'
 
         if role_treatment is not None:
@@ -258,6 +259,7 @@ class eval(commands.Cog, name='Refresh'):
             raise MessageException(f'No category - **{category}** - on this server')
 
         await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$set': {f'category_roles.{category}': role.id}})
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             description=f'Category role set to {role.mention}',
@@ -308,6 +310,7 @@ class eval(commands.Cog, name='Refresh'):
             embed = await family_role_remove(database=database, role=remove, guild=ctx.guild, type=type)
         else:
             raise MessageException('Must specify either a role to add or to remove')
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         await ctx.edit_original_message(embed=embed)
 
@@ -367,6 +370,7 @@ class eval(commands.Cog, name='Refresh'):
                 {'$set': {'role': role.id}},
                 upsert=True,
             )
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             title='**Townhall Roles that were set:**',
@@ -407,6 +411,7 @@ class eval(commands.Cog, name='Refresh'):
                 {'$set': {'role': role.id}},
                 upsert=True,
             )
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             title='**Builderhall Roles that were set:**',
@@ -471,6 +476,7 @@ class eval(commands.Cog, name='Refresh'):
                 {'$set': {'role': role.id}},
                 upsert=True,
             )
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             title='**League Roles that were set:**',
@@ -551,6 +557,7 @@ class eval(commands.Cog, name='Refresh'):
                 {'$set': {'role': role.id}},
                 upsert=True,
             )
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             title='**Builder League Roles that were set:**',
@@ -817,6 +824,8 @@ class eval(commands.Cog, name='Refresh'):
 
             removed_text += f'{builder_league} eval role removed - <@&{mention}>\n'
 
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
+
         embed = disnake.Embed(
             title='Eval Role Removals',
             description=removed_text,
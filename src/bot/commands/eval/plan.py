@@ -0,0 +1,201 @@
+from collections import namedtuple
+from typing import TYPE_CHECKING, Iterable
+
+import coc
+import disnake
+import ujson
+
+from classes.DatabaseClient.Classes.settings import DatabaseServer
+from exceptions.CustomExceptions import MessageException
+from utility.constants import DEFAULT_EVAL_ROLE_TYPES
+
+
+if TYPE_CHECKING:
+    from classes.bot import CustomClient
+else:
+    from disnake import AutoShardedClient as CustomClient
+
+
+EvalResult = namedtuple('EvalResult', ['is_family', 'roles_to_add'])
+
+EVAL_PLAN_TTL = 60 * 60 * 24
+
+
+def settings_fingerprint(db_server: DatabaseServer) -> str:
+    """
+    Everything an eval plan is compiled from, serialized
+    role collections are written to directly by some commands, so this catches changes the setters never see
+    """
+    return ujson.dumps(
+        [
+            db_server._data.get('eval', {}),
+            [(c.tag, c.member_role, c.leader_role, c.category, c.abbreviation) for c in db_server.clans],
+            db_server.category_roles,
+            db_server.flair_non_family,
+            db_server.leadership_eval,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+class EvalPlan:
+    """
+    A guild's eval settings compiled into lookup tables, built once and reused by every refresh/autoeval
+    until the server settings change
+    """
+
+    def __init__(self, db_server: DatabaseServer, eval_types: Iterable[str], fingerprint: str = None):
+        self.server_id = db_server.server_id
+        self.eval_types = frozenset(eval_types)
+        self.fingerprint = fingerprint or settings_fingerprint(db_server)
+
+        self.flair_non_family = db_server.flair_non_family
+        self.leadership_eval = db_server.leadership_eval
+
+        self.ignored_roles = {r.id for r in db_server.ignored_roles}
+        self.family_roles = {r.id for r in db_server.family_roles}
+        self.not_family_roles = {r.id for r in db_server.not_family_roles}
+        self.only_family_roles = {r.id for r in db_server.only_family_roles}
+        self.family_elder_roles = {r.id for r in db_server.family_elder_roles}
+        self.family_coleader_roles = {r.id for r in db_server.family_coleader_roles}
+        self.family_leader_roles = {r.id for r in db_server.family_leader_roles}
+
+        self.clan_member_roles = {c.tag: c.member_role for c in db_server.clans}
+        self.clan_leadership_roles = {c.tag: c.leader_role for c in db_server.clans}
+        self.clan_tags = {c.tag for c in db_server.clans}
+        self.townhall_roles = {int(r.townhall.replace('th', '')): r.id for r in db_server.townhall_roles}
+        self.builderhall_roles = {int(r.builderhall.replace('bh', '')): r.id for r in db_server.builderhall_roles}
+        self.league_roles = {r.type: r.id for r in db_server.league_roles}
+        self.builder_league_roles = {r.type: r.id for r in db_server.builder_league_roles}
+        self.clan_category_roles = {c.tag: db_server.category_roles.get(c.category) for c in db_server.clans}
+        self.clan_abbreviations = {c.tag: c.abbreviation for c in db_server.clans}
+
+        type_to_roles = {
+            'family': list(self.family_roles)
+            + list(self.family_elder_roles)
+            + list(self.family_coleader_roles)
+            + list(self.family_leader_roles),
+            'not_family': list(self.not_family_roles),
+            'only_family': list(self.only_family_roles),
+            'clan': list(self.clan_member_roles.values()),
+            'leadership': [r for r in self.clan_leadership_roles.values() if r is not None],
+            'townhall': list(self.townhall_roles.values()),
+            'builderhall': list(self.builderhall_roles.values()),
+            'league': list(self.league_roles.values()),
+            'category': [r for r in self.clan_category_roles.values() if r is not None],
+            'builder_league': list(self.builder_league_roles.values()),
+        }
+        for eval_type in DEFAULT_EVAL_ROLE_TYPES:
+            if eval_type not in self.eval_types:
+                type_to_roles.pop(eval_type, None)
+
+        # leadership roles are not position checked, matching what eval has always done
+        self.checked_roles = {inner for type, outer in type_to_roles.items() for inner in outer if type != 'leadership'}
+        self.all_clash_roles = set(self.checked_roles)
+        if 'leadership' in self.eval_types and self.leadership_eval:
+            self.all_clash_roles |= set(type_to_roles.get('leadership', []))
+
+        self.eval_townhall = 'townhall' in self.eval_types
+        self.eval_builderhall = 'builderhall' in self.eval_types
+        self.eval_league = 'league' in self.eval_types
+        self.eval_builder_league = 'builder_league' in self.eval_types
+        self.eval_clan = 'clan' in self.eval_types
+        self.eval_category = 'category' in self.eval_types
+        self.eval_leadership = self.leadership_eval and 'leadership' in self.eval_types
+
+        self._checked_against = None
+
+    def check_hierarchy(self, guild: disnake.Guild, bot_member: disnake.Member):
+        """Raise if any eval role sits above the bot's top role, skipped when nothing could have moved"""
+        # positions are contiguous, so any role created, deleted or moved across the bot's top role shifts its position
+        key = (guild.id, bot_member.top_role.id, bot_member.top_role.position)
+        if key == self._checked_against:
+            return
+        for role in self.checked_roles:
+            role = guild.get_role(role)
+            if role is None:
+                continue
+            if role > bot_member.top_role:
+                raise MessageException(
+                    f"{role.mention} is higher than {bot_member.mention}'s top role ({bot_member.top_role}), cannot assign that role to users."
+                )
+        self._checked_against = key
+
+    def evaluate(self, player: coc.Player) -> EvalResult:
+        is_family = player.clan is not None and player.clan.tag in self.clan_tags
+
+        # if not family & they don't want to flair non family, skip
+        do_eval = is_family or self.flair_non_family
+
+        ROLES_TO_ADD = set()
+        if self.eval_townhall and do_eval:
+            ROLES_TO_ADD.add(self.townhall_roles.get(player.town_hall))
+
+        if self.eval_builderhall and do_eval:
+            ROLES_TO_ADD.add(self.builderhall_roles.get(player.builder_hall))
+
+        if self.eval_league and do_eval:
+            league = player.league.name.split(' ')[0].lower()
+            if player.league.name != 'Unranked':
+                if player.league.name == 'Legend League':
+                    lookup = 'legends_league'
+                else:
+                    lookup = f'{league}_league'
+                ROLES_TO_ADD.add(self.league_roles.get(lookup))
+
+            if player.best_trophies >= 6000:
+                ROLES_TO_ADD.add(self.league_roles.get('6000_personal_best'))
+            elif player.best_trophies >= 5000:
+                ROLES_TO_ADD.add(self.league_roles.get('5000_personal_best'))
+
+        if self.eval_builder_league and do_eval:
+            league = player.builder_base_league.name.split(' ')[0].lower()
+            ROLES_TO_ADD.add(self.builder_league_roles.get(f'{league}_league'))
+
+            if player.best_builder_base_trophies >= 7000:
+                ROLES_TO_ADD.add(self.builder_league_roles.get('7000_personal_best'))
+            elif player.best_builder_base_trophies >= 6000:
+                ROLES_TO_ADD.add(self.builder_league_roles.get('6000_personal_best'))
+            elif player.best_builder_base_trophies >= 5000:
+                ROLES_TO_ADD.add(self.builder_league_roles.get('5000_personal_best'))
+
+        if player.clan is not None and self.eval_clan:
+            ROLES_TO_ADD.add(self.clan_member_roles.get(player.clan.tag))
+
+        if player.clan is not None and self.eval_category:
+            ROLES_TO_ADD.add(self.clan_category_roles.get(player.clan.tag))
+
+        if player.clan is not None and self.eval_leadership:
+            if player.role.in_game_name in ['Co-Leader', 'Leader']:
+                ROLES_TO_ADD.add(self.clan_leadership_roles.get(player.clan.tag))
+
+        if is_family:
+            if player.role.in_game_name == 'Elder':
+                ROLES_TO_ADD |= self.family_elder_roles
+            elif player.role.in_game_name == 'Co-Leader':
+                ROLES_TO_ADD |= self.family_coleader_roles
+            elif player.role.in_game_name == 'Leader':
+                ROLES_TO_ADD |= self.family_leader_roles
+        return EvalResult(is_family=is_family, roles_to_add=ROLES_TO_ADD)
+
+
+def get_eval_plan(bot: CustomClient, db_server: DatabaseServer, eval_types: Iterable[str]) -> EvalPlan:
+    key = f'{db_server.server_id}-eval-plan'
+    eval_types = frozenset(eval_types)
+
+    cached: dict = bot.SETTINGS_CACHE.get(key)
+    # same (cached) settings document as the plans were checked against, writes drop the plans through invalidation.
+    # a reloaded document is fingerprinted once, to catch role collections written to without invalidating
+    if cached is None or cached['settings'] is not db_server._data:
+        fingerprint = settings_fingerprint(db_server)
+        if cached is None or cached['fingerprint'] != fingerprint:
+            cached = {'fingerprint': fingerprint, 'plans': {}}
+        cached['settings'] = db_server._data
+        bot.SETTINGS_CACHE.ttl(key, cached, EVAL_PLAN_TTL)
+
+    plans: dict = cached['plans']
+    plan = plans.get(eval_types)
+    if plan is None:
+        plan = plans[eval_types] = EvalPlan(db_server=db_server, eval_types=eval_types, fingerprint=cached['fingerprint'])
+    return plan
@@ -1,5 +1,5 @@
 import time
-from collections import defaultdict, namedtuple
+from collections import defaultdict
 from typing import List
 
 import coc
@@ -7,11 +7,34 @@ import disnake
 
 from classes.bot import CustomClient
 from classes.DatabaseClient.Classes.settings import DatabaseServer
+from commands.eval.plan import get_eval_plan
 from exceptions.CustomExceptions import MessageException
+from utility.concurrency import bounded_gather
 from utility.constants import DEFAULT_EVAL_ROLE_TYPES, ROLE_TREATMENT_TYPES
 from utility.general import create_superscript, get_guild_icon
 
 
+# member edits share the guild's rate limit bucket, so only a few are kept in flight at once
+EVAL_EDIT_CONCURRENCY = 5
+
+
+class MemberEval:
+    def __init__(self, member: disnake.Member, roles: List[disnake.Role], new_name: str, added: str, removed: str):
+        self.member = member
+        self.roles = roles
+        self.new_name = new_name
+        self.added = added
+        self.removed = removed
+
+    @property
+    def changes_name(self):
+        return self.new_name not in ('None', '`Cannot Change`')
+
+    @property
+    def needs_edit(self):
+        return self.changes_name or {r.id for r in self.roles} != {r.id for r in self.member.roles}
+
+
 async def logic(
     bot: CustomClient,
     guild: disnake.Guild,
@@ -34,30 +57,8 @@ async def logic(
     auto_eval_tag = kwargs.pop('auto_eval_tag', None)
     role_treatment = kwargs.pop('role_treatment', ROLE_TREATMENT_TYPES)
 
-    ignored_roles = {r.id for r in db_server.ignored_roles}
-    family_roles = {r.id for r in db_server.family_roles}
-    not_family_roles = {r.id for r in db_server.not_family_roles}
-    only_family_roles = {r.id for r in db_server.only_family_roles}
-    family_elder_roles = {r.id for r in db_server.family_elder_roles}
-    family_coleader_roles = {r.id for r in db_server.family_coleader_roles}
-    family_leader_roles = {r.id for r in db_server.family_leader_roles}
-
-    clan_member_roles = {c.tag: c.member_role for c in db_server.clans}
-    clan_leadership_roles = {c.tag: c.leader_role for c in db_server.clans}
-    clan_tags = {c.tag for c in db_server.clans}
-    townhall_roles = {int(r.townhall.replace('th', '')): r.id for r in db_server.townhall_roles}
-    builderhall_roles = {int(r.builderhall.replace('bh', '')): r.id for r in db_server.builderhall_roles}
-    league_roles = {r.type: r.id for r in db_server.league_roles}
-    builder_league_roles = {r.type: r.id for r in db_server.builder_league_roles}
-    clan_category_roles = {c.tag: db_server.category_roles.get(c.category) for c in db_server.clans}
-    clan_abbreviations = {c.tag: c.abbreviation for c in db_server.clans}
-    """
-    How to find roles:
-    clan: by clan tag
-    family: manually
-    townhall, league: by attribute
-    status: by month
-    """
+    plan = get_eval_plan(bot=bot, db_server=db_server, eval_types=eval_types)
+    ALL_CLASH_ROLES = plan.all_clash_roles
 
     all_discord_links = await bot.link_client.get_many_linked_players(*[m.id for m in members])
     discord_link_dict = defaultdict(list)
@@ -66,27 +67,6 @@ async def logic(
         discord_link_dict[discord_id].append(player_tag)
         all_tags.append(player_tag)
 
-
-
-
-    type_to_roles = {
-        'family': list(family_roles) + list(family_elder_roles) + list(family_coleader_roles) + list(family_leader_roles),
-        'not_family': list(not_family_roles),
-        'only_family': list(only_family_roles),
-        'clan': list(clan_member_roles.values()),
-        'leadership': [r for r in clan_leadership_roles.values() if r is not None],
-        'townhall': list(townhall_roles.values()),
-        'builderhall': list(builderhall_roles.values()),
-        'league': list(league_roles.values()),
-        'category': [r for r in clan_category_roles.values() if r is not None],
-        'builder_league': list(builder_league_roles.values()),
-    }
-
-    for eval_type in DEFAULT_EVAL_ROLE_TYPES:
-        if eval_type not in eval_types:
-            type_to_roles.pop(eval_type, None)
-
-    ALL_CLASH_ROLES = {inner for type, outer in type_to_roles.items() for inner in outer if type != 'leadership'}
     bot_member = await guild.getch_member(bot.user.id)
 
     if not bot_member.guild_permissions.manage_roles:
@@ -95,17 +75,7 @@ async def logic(
     if db_server.change_nickname and not bot_member.guild_permissions.manage_nicknames:
         raise MessageException('Missing Change Nicknames Permission, Cannot Edit Nicknames')
 
-    for role in ALL_CLASH_ROLES:
-        role = guild.get_role(role)
-        if role is None:
-            continue
-        if role > bot_member.top_role:
-            raise MessageException(
-                f"{role.mention} is higher than {bot_member.mention}'s top role ({bot_member.top_role}), cannot assign that role to users."
-            )
-
-    if 'leadership' in eval_types and db_server.leadership_eval:
-        ALL_CLASH_ROLES = ALL_CLASH_ROLES | set(type_to_roles.get('leadership', []))
+    plan.check_hierarchy(guild=guild, bot_member=bot_member)
 
     fresh_tags = []
     if auto_eval_tag is not None:
@@ -125,87 +95,18 @@ async def logic(
         for settings in user_settings
     }
 
-    changed = 0
-    num_changes = 0
-    text = ''
-    embeds = []
+    evaluations: List[MemberEval] = []
     for member in members:
         if member.bot:
             continue
 
-        EvalResult = namedtuple('EvalResult', ['is_family', 'roles_to_add'])
-
         member_accounts = discord_link_dict.get(member.id, [])
         member_accounts = [player_dict.get(tag) for tag in member_accounts if player_dict.get(tag) is not None]
 
-        def mini_eval(player: coc.Player) -> EvalResult:
-            is_family = False
-            if player.clan is not None and player.clan.tag in clan_tags:
-                is_family = True
-
-            do_eval = True
-            # if not family & they don't want to flair non family, skip
-            if not is_family and not db_server.flair_non_family:
-                do_eval = False
-
-            ROLES_TO_ADD = set()
-            if 'townhall' in eval_types and do_eval:
-                ROLES_TO_ADD.add(townhall_roles.get(player.town_hall))
-
-            if 'builderhall' in eval_types and do_eval:
-                ROLES_TO_ADD.add(builderhall_roles.get(player.builder_hall))
-
-            if 'league' in eval_types and do_eval:
-                league = player.league.name.split(' ')[0].lower()
-                if player.league.name != 'Unranked':
-                    if player.league.name == 'Legend League':
-                        lookup = 'legends_league'
-                    else:
-                        lookup = f'{league}_league'
-                    ROLES_TO_ADD.add(league_roles.get(lookup))
-
-                if player.best_trophies >= 6000:
-                    ROLES_TO_ADD.add(league_roles.get('6000_personal_best'))
-                elif player.best_trophies >= 5000:
-                    ROLES_TO_ADD.add(league_roles.get('5000_personal_best'))
-
-            if 'builder_league' in eval_types and do_eval:
-                league = player.builder_base_league.name.split(' ')[0].lower()
-                ROLES_TO_ADD.add(builder_league_roles.get(f'{league}_league'))
-
-                if player.best_builder_base_trophies >= 7000:
-                    ROLES_TO_ADD.add(builder_league_roles.get('7000_personal_best'))
-                elif player.best_builder_base_trophies >= 6000:
-                    ROLES_TO_ADD.add(builder_league_roles.get('6000_personal_best'))
-                elif player.best_builder_base_trophies >= 5000:
-                    ROLES_TO_ADD.add(builder_league_roles.get('5000_personal_best'))
-
-            if player.clan is not None and 'clan' in eval_types:
-                ROLES_TO_ADD.add(clan_member_roles.get(player.clan.tag))
-
-            if player.clan is not None and 'category' in eval_types:
-                ROLES_TO_ADD.add(clan_category_roles.get(player.clan.tag))
-
-            if player.clan is not None and db_server.leadership_eval and ('leadership' in eval_types):
-                if player.role.in_game_name in ['Co-Leader', 'Leader']:
-                    ROLES_TO_ADD.add(clan_leadership_roles.get(player.clan.tag))
-
-            if is_family:
-                if player.role.in_game_name == 'Elder':
-                    for role_id in family_elder_roles:
-                        ROLES_TO_ADD.add(role_id)
-                elif player.role.in_game_name == 'Co-Leader':
-                    for role_id in family_coleader_roles:
-                        ROLES_TO_ADD.add(role_id)
-                elif player.role.in_game_name == 'Leader':
-                    for role_id in family_leader_roles:
-                        ROLES_TO_ADD.add(role_id)
-            return EvalResult(is_family=is_family, roles_to_add=ROLES_TO_ADD)
-
         results = []
         family_accounts = []
         for account in member_accounts:
-            result = mini_eval(player=account)
+            result = plan.evaluate(player=account)
             results.append(result)
             if result.is_family:
                 family_accounts.append(account)
@@ -218,12 +119,12 @@ async def logic(
             ROLES_TO_ADD = ROLES_TO_ADD | result.roles_to_add
 
         if has_family_account and 'family' in eval_types:
-            ROLES_TO_ADD = ROLES_TO_ADD | family_roles
+            ROLES_TO_ADD = ROLES_TO_ADD | plan.family_roles
         elif 'not_family' in eval_types:
-            ROLES_TO_ADD = ROLES_TO_ADD | not_family_roles
+            ROLES_TO_ADD = ROLES_TO_ADD | plan.not_family_roles
 
         if all_family_accounts and 'family' in eval_types:
-            ROLES_TO_ADD = ROLES_TO_ADD | only_family_roles
+            ROLES_TO_ADD = ROLES_TO_ADD | plan.only_family_roles
 
         ROLES_TO_ADD.discard(None)
 
@@ -238,7 +139,7 @@ async def logic(
             but if it is and they have a family account, ignore by skipping
             """
             if role not in ROLES_TO_ADD and 'Remove' in role_treatment:
-                if role in ignored_roles:
+                if role in plan.ignored_roles:
                     if has_family_account:
                         continue
                 CLASH_ROLES.discard(role)
@@ -299,7 +200,7 @@ async def logic(
                     '{player_warstars}': main_account.war_stars,
                     '{player_role}': (main_account.role if main_account.role is not None else ''),
                     '{player_clan}': (main_account.clan.name if main_account.clan is not None else ''),
-                    '{player_clan_abbreviation}': (clan_abbreviations.get(main_account.clan.tag) if main_account.clan is not None else ''),
+                    '{player_clan_abbreviation}': (plan.clan_abbreviations.get(main_account.clan.tag) if main_account.clan is not None else ''),
                     '{player_league}': main_account.league.name,
                 }
                 for type, replace in types.items():
@@ -308,24 +209,37 @@ async def logic(
 
         FINAL_ROLES = FINAL_CLASH_ROLES + NON_CLASH_ROLES
 
-        if new_name is None or new_name == member.display_name:
+        # discord caps nicknames at 32 characters, that's what the edit below writes
+        if new_name is None or new_name[:32] == member.display_name:
             new_name = 'None'
         if not added:
             added = 'None'
         if not removed:
             removed = 'None'
-        if not test:
-            try:
-                if new_name != '`Cannot Change`' and new_name != 'None':
-                    await member.edit(nick=new_name[:32], roles=FINAL_ROLES, reason=reason)
-                else:
-                    await member.edit(roles=FINAL_ROLES, reason=reason)
-            except Exception as e:
-                if new_name is not None:
-                    new_name = 'Error'
-                added = str(e)[:1000]
-                removed = 'Error'
+        evaluations.append(MemberEval(member=member, roles=FINAL_ROLES, new_name=new_name, added=added, removed=removed))
+
+    async def apply_edit(evaluation: MemberEval):
+        try:
+            if evaluation.changes_name:
+                await evaluation.member.edit(nick=evaluation.new_name[:32], roles=evaluation.roles, reason=reason)
+            else:
+                await evaluation.member.edit(roles=evaluation.roles, reason=reason)
+        except Exception as e:
+            evaluation.new_name = 'Error'
+            evaluation.added = str(e)[:1000]
+            evaluation.removed = 'Error'
+
+    if not test:
+        # members already in the right state are skipped entirely, no no-op PATCHes
+        await bounded_gather([e for e in evaluations if e.needs_edit], apply_edit, limit=EVAL_EDIT_CONCURRENCY)
 
+    changed = 0
+    num_changes = 0
+    text = ''
+    embeds = []
+    for evaluation in evaluations:
+        member = evaluation.member
+        added, removed, new_name = evaluation.added, evaluation.removed, evaluation.new_name
         had_change = False
         for change_text, change in zip(['Added', 'Removed', 'Name Change'], [added, removed, new_name]):
             if len(members) >= 2 and change == 'None':
@@ -1,187 +1,145 @@
 import calendar
 import io
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List
 
 import coc
-import openpyxl.worksheet.worksheet
 from coc import utils
 from disnake.ext import commands
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 from pytz import utc
 
 from classes.bot import CustomClient
 from classes.player.stats import LegendDay, StatsPlayer
+from commands.exports.engine import ExportWriter, create_writer
+
+
+# players fetched (and turned into rows) per page, so an export never holds the whole player list
+EXPORT_PAGE_SIZE = 100
 
 
 class ExportCreator(commands.Cog):
+    # (sheet name key, builder, whether the builder takes a season)
+    # templates are matched by substring, so the order matters if a key is ever contained in another
+    EXPORT_SHEETS = [
+        ('legend_stats', 'create_legend_export', True),
+        ('war_hits', 'create_warhit_export', True),
+        ('season_trophies', 'create_season_trophies_export', True),
+        ('season_troops', 'create_troops_export', False),
+        ('player_achievements', 'create_achievements_export', False),
+        ('player_activity', 'create_player_activity_export', True),
+        ('player_stats', 'create_player_stats_export', False),
+        ('advanced_stats', 'create_advanced_player_stats_export', True),
+    ]
+
+    # default (raw data) export types and the sheet they produce
+    DEFAULT_EXPORT_SHEETS = {
+        'Legend Stats': 'legend_stats',
+        'War Hits': 'war_hits',
+        'Season Trophies': 'season_trophies',
+        'Troops': 'season_troops',
+        'Player Achievements': 'player_achievements',
+        'Player Activity': 'player_activity',
+        'Player Stats': 'player_stats',
+        'Advanced Stats': 'advanced_stats',
+    }
+
     def __init__(self, bot: CustomClient):
         self.bot = bot
 
-    async def write_data(
+    async def _player_pages(
         self,
-        worksheet: openpyxl.worksheet.worksheet.Worksheet,
-        column_names: List[str],
-        data: List[List],
-    ):
-        col = 1
-        data.insert(0, column_names)
-        for row, d in enumerate(data, start=1):
-            for item in d:
-                worksheet.cell(row=row, column=col).value = item
-                col += 1
-            col = 1
-        return worksheet
+        player_tags: List[str],
+        custom: bool,
+        use_cache: bool = True,
+        fields: List[str] = None,
+        season: str = None,
+    ) -> AsyncIterator[List[StatsPlayer]]:
+        for i in range(0, len(player_tags), EXPORT_PAGE_SIZE):
+            yield await self.bot.get_players(
+                tags=player_tags[i : i + EXPORT_PAGE_SIZE],
+                custom=custom,
+                use_cache=use_cache,
+                fields=fields,
+                season=season,
+            )
 
-    async def export_manager(self, player_tags: List[str], season: str = None, template: str = None):
-        # get list of custom players (which have lots of db info), use the cache since not time sensitive
-        players: List[StatsPlayer] = await self.bot.get_players(tags=player_tags, custom=True, use_cache=True)
-        output = io.BytesIO()
+    def _sheet_season(self, sheet_name: str, season: str = None):
+        season_for_sheet = season
+        # this code assumes that all export type names are 2 parts seperated by underscore. if this is different, then other logic can apply
+        # i.e. could split & check if the last item is an integer
+        # also as a sidenote, a lot of functions of mine, assume that if "season" is None, then it defaults to the current season
+        # whether this is in helper functions, core code, or even button mechanics for users
+        if len(sheet_name.split('_')) == 3:
+            season_spot = int(sheet_name.split('_')[-1])
+            # generate this number of seasons
+            # since we generate the *exact amount* the one we need will always be the last one
+            season_for_sheet = self.bot.gen_season_date(season_spot)[-1]
+            # however this returns it as Month Year & we need YYYY-MM
+            # not convenient, but we have written the code once before (exports.py - season convertor)
+            # could skip this all by writting a season generator that actually gives the right thing, if u feel inclined xD
+            # or we could switch all generators to give back datetimes which would allow us to create whatever we want with them...hindsight is 20/20 lol
+            month = list(calendar.month_name).index(season_for_sheet.split(' ')[0])
+            year = int(season_for_sheet.split(' ')[1])
+            if month == 1:
+                month = 13
+                year -= 1
+            end_date = coc.utils.get_season_end(month=int(month - 1), year=year)
+            month = end_date.month
+            if month <= 9:
+                month = f'0{month}'
+            season_for_sheet = f'{end_date.year}-{month}'
+        return season_for_sheet
+
+    async def export_manager(self, player_tags: List[str], season: str = None, template: str = None, format: str = 'xlsx') -> tuple[io.BytesIO, str]:
+        """
+        Build an export and return the file with its extension, `format` is one of `EXPORT_FORMATS`.
+        Sheets are streamed into the writer page by page, several csv/parquet sheets come back as a zip.
+        """
         # if the "template" is just the name of a default type (raw data), just export the 1 sheet
-        if template in self.DEFAULT_EXPORT_TYPES:
-            workbook = Workbook()
-            workbook.remove_sheet(workbook['Sheet'])
-            if template == 'Legend Stats':
-                await self.create_legend_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='legend_stats',
-                )
-            elif template == 'War Hits':
-                await self.create_warhit_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='war_hits',
-                )
-            elif template == 'Season Trophies':
-                await self.create_season_trophies_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='season_trophies',
-                )
-            elif template == 'Troops':
-                await self.create_troops_export(players=players, workbook=workbook, sheet_name='season_troops')
-            elif template == 'Player Achievements':
-                await self.create_achievements_export(players=players, workbook=workbook, sheet_name='player_achievements')
-            elif template == 'Player Activity':
-                await self.create_player_activity_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='player_activity',
-                )
-            elif template == 'Player Stats':
-                await self.create_player_stats_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='player_stats',
-                )
-            elif template == 'Advanced Stats':
-                await self.create_advanced_player_stats_export(
-                    players=players,
-                    workbook=workbook,
-                    season=season,
-                    sheet_name='advanced_stats',
-                )
+        if template in self.DEFAULT_EXPORT_SHEETS:
+            writer = create_writer(format=format)
+            sheets = [(self.DEFAULT_EXPORT_SHEETS[template], season)]
         else:
             # if it is not, then it is a template
             # 1. load the template
-            # 2. look for sheet names that match export types so they can be removed & replaced with an updated version
+            # 2. look for sheet names that match export types so they can be replaced with an updated version
             # 3. look if they have a number to find what season that is being exported, else it is just the current
-            workbook = load_workbook(template)
-            for sheet_name in workbook.sheetnames:
-                print(sheet_name)
-                season_for_sheet = season
-                # this code assumes that all export type names are 2 parts seperated by underscore. if this is different, then other logic can apply
-                # i.e. could split & check if the last item is an integer
-                # also as a sidenote, a lot of functions of mine, assume that if "season" is None, then it defaults to the current season
-                # whether this is in helper functions, core code, or even button mechanics for users
-                if len(sheet_name.split('_')) == 3:
-                    season_spot = int(sheet_name.split('_')[-1])
-                    # generate this number of seasons
-                    # since we generate the *exact amount* the one we need will always be the last one
-                    season_for_sheet = self.bot.gen_season_date(season_spot)[-1]
-                    # however this returns it as Month Year & we need YYYY-MM
-                    # not convenient, but we have written the code once before (exports.py - season convertor)
-                    # could skip this all by writting a season generator that actually gives the right thing, if u feel inclined xD
-                    # or we could switch all generators to give back datetimes which would allow us to create whatever we want with them...hindsight is 20/20 lol
-                    month = list(calendar.month_name).index(season_for_sheet.split(' ')[0])
-                    year = int(season_for_sheet.split(' ')[1])
-                    if month == 1:
-                        month = 13
-                        year -= 1
-                    end_date = coc.utils.get_season_end(month=int(month - 1), year=year)
-                    month = end_date.month
-                    if month <= 9:
-                        month = f'0{month}'
-                    season_for_sheet = f'{end_date.year}-{month}'
-                if 'legend_stats' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_legend_export(
-                        players=players,
-                        workbook=workbook,
-                        season=season_for_sheet,
-                        sheet_name=sheet_name,
-                    )
-                elif 'war_hits' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_warhit_export(
-                        players=players,
-                        workbook=workbook,
-                        season=season_for_sheet,
-                        sheet_name=sheet_name,
-                    )
-                elif 'season_trophies' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_season_trophies_export(
-                        players=players,
-                        workbook=workbook,
-                        season=season_for_sheet,
-                        sheet_name=sheet_name,
-                    )
-                elif 'season_troops' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_troops_export(players=players, workbook=workbook, sheet_name=sheet_name)
-                elif 'player_achievements' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_achievements_export(players=players, workbook=workbook, sheet_name=sheet_name)
-                elif 'player_activity' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_player_activity_export(
-                        players=players,
-                        workbook=workbook,
-                        season=season_for_sheet,
-                        sheet_name=sheet_name,
-                    )
-                elif 'player_stats' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_player_stats_export(players=players, workbook=workbook, sheet_name=sheet_name)
-                elif 'advanced_stats' in sheet_name:
-                    workbook.remove(workbook.get_sheet_by_name(sheet_name))
-                    await self.create_advanced_player_stats_export(
-                        players=players,
-                        workbook=workbook,
-                        season=season_for_sheet,
-                        sheet_name=sheet_name,
-                    )
-                # more if statements to find other export types
-        workbook.save(output)
-        xlsx_data = output
-        xlsx_data.seek(0)
-        return xlsx_data
+            writer = create_writer(format=format, template=template)
+            sheet_names = await self._template_sheet_names(writer=writer, template=template)
+            sheets = [(sheet_name, self._sheet_season(sheet_name=sheet_name, season=season)) for sheet_name in sheet_names]
+
+        for sheet_name, season_for_sheet in sheets:
+            for key, builder, takes_season in self.EXPORT_SHEETS:
+                if key not in sheet_name:
+                    continue
+                kwargs = {'season': season_for_sheet} if takes_season else {}
+                await getattr(self, builder)(writer=writer, player_tags=player_tags, sheet_name=sheet_name, **kwargs)
+                break
+            # more keys in EXPORT_SHEETS to find other export types
+        data = await writer.finish()
+        return data, writer.extension
+
+    async def _template_sheet_names(self, writer: ExportWriter, template: str) -> List[str]:
+        workbook = getattr(writer, 'workbook', None)
+        if workbook is not None:
+            return list(workbook.sheetnames)
+        # csv/parquet only need the sheet names out of the template
+        workbook = load_workbook(template, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
 
     async def create_advanced_player_stats_export(
         self,
-        players: List[StatsPlayer],
-        workbook: openpyxl.Workbook,
+        writer: ExportWriter,
+        player_tags: List[str],
         sheet_name: str,
         season: str = None,
     ):
-        advanced_player_Stats_page = workbook.create_sheet(sheet_name)
+        if season is None:
+            season = self.bot.gen_season_date()
         year = season[:4]
         month = season[-2:]
         SEASON_START = utils.get_season_start(month=int(month) - 1, year=int(year))
@@ -193,39 +151,38 @@ class ExportCreator(commands.Cog):
             if week > SEASON_END:
                 break
             weeks.append(week)
-        players_data = await self.bot.get_players(tags=[player.tag for player in players], custom=True)
-        if season is None:
-            season = self.bot.gen_season_date()
-        data = []
-        for player in players_data:
-            donos = player.donos(season)
-            capital_raided = 0
-            capital_donated = 0
-            for date in weeks:
-                capital = player.clan_capital_stats(week=str(date.date()))
-                capital_raided += sum(capital.raided)
-                capital_donated += sum(capital.donated)
-
-            if player.last_online is None:
-                lastOnline = '-'
-            else:
-                lastOnline = datetime.fromtimestamp(player.last_online, tz=utc).strftime('%Y-%m-%d-%H:%M:%S')
-            data.append(
-                [
-                    player.name,
-                    player.tag,
-                    lastOnline,
-                    len(player.season_last_online(season)),
-                    player.attack_wins,
-                    donos.received,
-                    donos.donated,
-                    player.gold_looted(season),
-                    player.elixir_looted(season),
-                    player.dark_elixir_looted(season),
-                    capital_raided,
-                    capital_donated,
-                ]
-            )
+
+        async def rows():
+            fields = ['donations', 'last_online', 'last_online_times', 'gold', 'elixir', 'dark_elixir']
+            fields += [f'capital_gold.{date.date()}' for date in weeks]
+            async for players_data in self._player_pages(player_tags, custom=True, fields=fields, season=season):
+                for player in players_data:
+                    donos = player.donos(season)
+                    capital_raided = 0
+                    capital_donated = 0
+                    for date in weeks:
+                        capital = player.clan_capital_stats(week=str(date.date()))
+                        capital_raided += sum(capital.raided)
+                        capital_donated += sum(capital.donated)
+
+                    if player.last_online is None:
+                        lastOnline = '-'
+                    else:
+                        lastOnline = datetime.fromtimestamp(player.last_online, tz=utc).strftime('%Y-%m-%d-%H:%M:%S')
+                    yield [
+                        player.name,
+                        player.tag,
+                        lastOnline,
+                        len(player.season_last_online(season)),
+                        player.attack_wins,
+                        donos.received,
+                        donos.donated,
+                        player.gold_looted(season),
+                        player.elixir_looted(season),
+                        player.dark_elixir_looted(season),
+                        capital_raided,
+                        capital_donated,
+                    ]
 
         columns = [
             'Player Name',
@@ -241,47 +198,48 @@ class ExportCreator(commands.Cog):
             'Capital Raided',
             'Capital Donated',
         ]
-        await self.write_data(worksheet=advanced_player_Stats_page, column_names=columns, data=data)
-
-    async def create_player_stats_export(self, players: List[StatsPlayer], workbook: openpyxl.Workbook, sheet_name: str):
-        player_stats_page = workbook.create_sheet(sheet_name)
-        players_data = await self.bot.get_players(tags=[player.tag for player in players], custom=False)
-        data = []
-        for player in players_data:
-            info = [
-                'name',
-                'tag',
-                'town_hall',
-                'town_hall_weapon',
-                'exp_level',
-                'trophies',
-                'best_trophies',
-                'labels',
-                'league',
-                'donations',
-                'received',
-                'attack_wins',
-                'defense_wins',
-                'clan',
-                'role',
-                'war_opted_in',
-                'war_stars',
-                'builder_hall',
-                'best_versus_trophies',
-                'clan_capital_contributions',
-                'versus_trophies',
-            ]
-            line = []
-            for i in info:
-                value = getattr(player, i, None)
-                value = value.name if i == 'league' else value
-                value = '-' if value is None or value == '' else value
-                if i == 'labels':
-                    labels = [label.name for label in value] + ['-' for x in range(3 - len(value))]
-                    line.extend(labels)
-                else:
-                    line.append(str(value))
-            data.append(line)
+        await writer.add_sheet(sheet_name, columns, rows())
+
+    async def create_player_stats_export(self, writer: ExportWriter, player_tags: List[str], sheet_name: str):
+        info = [
+            'name',
+            'tag',
+            'town_hall',
+            'town_hall_weapon',
+            'exp_level',
+            'trophies',
+            'best_trophies',
+            'labels',
+            'league',
+            'donations',
+            'received',
+            'attack_wins',
+            'defense_wins',
+            'clan',
+            'role',
+            'war_opted_in',
+            'war_stars',
+            'builder_hall',
+            'best_versus_trophies',
+            'clan_capital_contributions',
+            'versus_trophies',
+        ]
+
+        async def rows():
+            async for players_data in self._player_pages(player_tags, custom=False):
+                for player in players_data:
+                    line = []
+                    for i in info:
+                        value = getattr(player, i, None)
+                        value = value.name if i == 'league' else value
+                        value = '-' if value is None or value == '' else value
+                        if i == 'labels':
+                            labels = [label.name for label in value] + ['-' for x in range(3 - len(value))]
+                            line.extend(labels)
+                        else:
+                            line.append(str(value))
+                    yield line
+
         columns = [
             'Player Name',
             'Player Tag',
@@ -307,12 +265,9 @@ class ExportCreator(commands.Cog):
             'Clan Capital Contributions',
             'Versus Trophies',
         ]
+        await writer.add_sheet(sheet_name, columns, rows())
 
-        await self.write_data(worksheet=player_stats_page, column_names=columns, data=data)
-
-    async def create_troops_export(self, players: List[StatsPlayer], workbook: openpyxl.Workbook, sheet_name: str):
-        troops_page = workbook.create_sheet(sheet_name)
-        players_data = await self.bot.get_players(tags=[player.tag for player in players], custom=False)
+    async def create_troops_export(self, writer: ExportWriter, player_tags: List[str], sheet_name: str):
         # Note home_troop_order already includes siege machines
         home_troops = coc.enums.HOME_TROOP_ORDER
         super_troops = coc.enums.SUPER_TROOP_ORDER
@@ -323,27 +278,27 @@ class ExportCreator(commands.Cog):
         builder_heroes = coc.enums.BUILDER_BASE_HERO_ORDER
 
         columns = home_troops + super_troops + spells + pets + home_heroes + builder_troops + builder_heroes
-        data = []
-        for player in players_data:
-            _troops = {troop.name: troop.level for troop in player.troops}
-            _spells = {spell.name: spell.level for spell in player.spells}
-            _super_troops = {super_troop.name: super_troop.level for super_troop in player.super_troops}
-            _pets = {pet.name: pet.level for pet in player.pets}
-            _heros = {hero.name: hero.level for hero in player.heroes}
-            all_troops_data = {**_troops, **_spells, **_super_troops, **_pets, **_heros}
-            line = [player.name, player.tag] + [all_troops_data.get(column, '-') for column in columns]
-            data.append(line)
-        columns = ['Player Name', 'Player Tag'] + columns
-        await self.write_data(worksheet=troops_page, column_names=columns, data=data)
+
+        async def rows():
+            async for players_data in self._player_pages(player_tags, custom=False):
+                for player in players_data:
+                    _troops = {troop.name: troop.level for troop in player.troops}
+                    _spells = {spell.name: spell.level for spell in player.spells}
+                    _super_troops = {super_troop.name: super_troop.level for super_troop in player.super_troops}
+                    _pets = {pet.name: pet.level for pet in player.pets}
+                    _heros = {hero.name: hero.level for hero in player.heroes}
+                    all_troops_data = {**_troops, **_spells, **_super_troops, **_pets, **_heros}
+                    yield [player.name, player.tag] + [all_troops_data.get(column, '-') for column in columns]
+
+        await writer.add_sheet(sheet_name, ['Player Name', 'Player Tag'] + columns, rows())
 
     async def create_player_activity_export(
         self,
-        players: List[StatsPlayer],
-        workbook: openpyxl.Workbook,
+        writer: ExportWriter,
+        player_tags: List[str],
         sheet_name: str,
         season: str = None,
     ):
-        activity_page = workbook.create_sheet(sheet_name)
         year = season[:4]
         month = season[-2:]
         SEASON_START = utils.get_season_start(month=int(month) - 1, year=int(year)).timestamp()
@@ -352,7 +307,7 @@ class ExportCreator(commands.Cog):
             {
                 '$match': {
                     '$and': [
-                        {'tag': {'$in': [player.tag for player in players]}},
+                        {'tag': {'$in': player_tags}},
                         {'time': {'$gte': SEASON_START}},
                         {'time': {'$lte': SEASON_END}},
                     ]
@@ -383,19 +338,18 @@ class ExportCreator(commands.Cog):
             },
             {'$set': {'name': '$name.name'}},
         ]
-        results: List[dict] = await self.bot.player_history.aggregate(pipeline).to_list(length=None)
-        data = []
         leagues = ['builderBaseLeague', 'league']
-        for result in results:
-            for change in result['changes']:
-                p_value = change.get('p_value', '-')
-                value = change['value']
-                if change['type'] in leagues:
-                    value = change['value']['name']
-                    p_value = change['p_value']['name'] if p_value != '-' else p_value
-                time = datetime.fromtimestamp(change['time'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S')
-                data.append(
-                    [
+
+        async def rows():
+            async for result in self.bot.player_history.aggregate(pipeline):
+                for change in result['changes']:
+                    p_value = change.get('p_value', '-')
+                    value = change['value']
+                    if change['type'] in leagues:
+                        value = change['value']['name']
+                        p_value = change['p_value']['name'] if p_value != '-' else p_value
+                    time = datetime.fromtimestamp(change['time'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S')
+                    yield [
                         result['name'][0],
                         result['_id'],
                         change['type'],
@@ -404,7 +358,7 @@ class ExportCreator(commands.Cog):
                         time,
                         change['clan'],
                     ]
-                )
+
         columns = [
             'Player Name',
             'Player Tag',
@@ -414,59 +368,56 @@ class ExportCreator(commands.Cog):
             'Time',
             'Clan Tag',
         ]
-        await self.write_data(worksheet=activity_page, column_names=columns, data=data)
+        await writer.add_sheet(sheet_name, columns, rows())
 
-    async def create_achievements_export(self, players: List[StatsPlayer], workbook: openpyxl.workbook, sheet_name: str):
-        achievement_page = workbook.create_sheet(sheet_name)
-        players_data = await self.bot.get_players(tags=[player.tag for player in players], custom=False)
-        data = []
+    async def create_achievements_export(self, writer: ExportWriter, player_tags: List[str], sheet_name: str):
         achievement_order = coc.enums.ACHIEVEMENT_ORDER
-        for player in players_data:
-            achievements = []
-            entry = [player.name, player.tag]
-            for achievement in player.achievements:
-                achievements.append(achievement.name)
-                entry.append(achievement.value)
-            if 'Get those Goblins!' not in achievements:
-                entry.insert(33, '-')
-            data.append(entry)
+
+        async def rows():
+            async for players_data in self._player_pages(player_tags, custom=False):
+                for player in players_data:
+                    achievements = []
+                    entry = [player.name, player.tag]
+                    for achievement in player.achievements:
+                        achievements.append(achievement.name)
+                        entry.append(achievement.value)
+                    if 'Get those Goblins!' not in achievements:
+                        entry.insert(33, '-')
+                    yield entry
+
         columns = ['Player Name', 'Player Tag'] + achievement_order
         columns.remove('Get those other Goblins!')
         # columns.remove("Get even more Goblins!")
-        await self.write_data(worksheet=achievement_page, column_names=columns, data=data)
-        return workbook
+        await writer.add_sheet(sheet_name, columns, rows())
 
     async def create_season_trophies_export(
         self,
-        players: List[StatsPlayer],
-        workbook: openpyxl.Workbook,
+        writer: ExportWriter,
+        player_tags: List[str],
         sheet_name: str,
         season: str = None,
     ):
-        season_trophies_page = workbook.create_sheet(sheet_name)
-        trophies_data = await self.bot.history_db.find(
-            {
-                '$and': [
-                    {'tag': {'$in': [player.tag for player in players]}},
-                    {'season': season},
+        async def rows():
+            async for entry in self.bot.history_db.find(
+                {
+                    '$and': [
+                        {'tag': {'$in': player_tags}},
+                        {'season': season},
+                    ]
+                }
+            ):
+                yield [
+                    entry['name'],
+                    entry['tag'],
+                    entry['expLevel'],
+                    entry['trophies'],
+                    entry['attackWins'],
+                    entry['defenseWins'],
+                    entry['rank'],
+                    entry['clan']['name'],
+                    entry['clan']['tag'],
+                    entry['season'],
                 ]
-            }
-        ).to_list(length=None)
-        data = [
-            [
-                entry['name'],
-                entry['tag'],
-                entry['expLevel'],
-                entry['trophies'],
-                entry['attackWins'],
-                entry['defenseWins'],
-                entry['rank'],
-                entry['clan']['name'],
-                entry['clan']['tag'],
-                entry['season'],
-            ]
-            for entry in trophies_data
-        ]
 
         columns = [
             'Player Name',
@@ -480,89 +431,54 @@ class ExportCreator(commands.Cog):
             'Clan Tag',
             'Season',
         ]
-
-        await self.write_data(worksheet=season_trophies_page, column_names=columns, data=data)
-        return workbook
+        await writer.add_sheet(sheet_name, columns, rows())
 
     async def create_warhit_export(
         self,
-        players: List[StatsPlayer],
-        workbook: openpyxl.Workbook,
+        writer: ExportWriter,
+        player_tags: List[str],
         sheet_name: str,
         season: str = None,
     ):
-        warhit_stat_page = workbook.create_sheet(sheet_name)
         year = season[:4]
         month = season[-2:]
         SEASON_START = utils.get_season_start(month=int(month) - 1, year=int(year)).timestamp()
         SEASON_END = utils.get_season_end(month=int(month) - 1, year=int(year)).timestamp()
-        attacks = await self.bot.warhits.find(
-            {
-                '$and': [
-                    {'tag': {'$in': [player.tag for player in players]}},
-                    {'_time': {'$gte': SEASON_START}},
-                    {'_time': {'$lte': SEASON_END}},
-                ]
-            }
-        ).to_list(length=None)
 
-        defends = await self.bot.warhits.find(
-            {
-                '$and': [
-                    {'defender_tag': {'$in': [player.tag for player in players]}},
-                    {'_time': {'$gte': SEASON_START}},
-                    {'_time': {'$lte': SEASON_END}},
-                ]
-            }
-        ).to_list(length=None)
-        data = []
-        for attack in attacks:
-            data.append(
-                [
-                    'Attack',
-                    attack['name'],
-                    attack['tag'],
-                    attack['townhall'],
-                    datetime.fromtimestamp(attack['_time'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
-                    attack['destruction'],
-                    attack['stars'],
-                    attack['fresh'],
-                    datetime.fromtimestamp(attack['war_start'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
-                    attack['defender_tag'],
-                    attack['defender_name'],
-                    attack['defender_townhall'],
-                    attack['war_type'],
-                    attack['war_status'],
-                    attack['attack_order'],
-                    attack['map_position'],
-                    attack.get('war_size', 0),
-                    attack.get('clan', 'No Clan'),
-                ]
-            )
+        def hit_row(hit_type: str, hit: dict) -> list:
+            return [
+                hit_type,
+                hit['name'],
+                hit['tag'],
+                hit['townhall'],
+                datetime.fromtimestamp(hit['_time'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
+                hit['destruction'],
+                hit['stars'],
+                hit['fresh'],
+                datetime.fromtimestamp(hit['war_start'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
+                hit['defender_tag'],
+                hit['defender_name'],
+                hit['defender_townhall'],
+                hit['war_type'],
+                hit['war_status'],
+                hit['attack_order'],
+                hit['map_position'],
+                hit.get('war_size', 0),
+                hit.get('clan', 'No Clan'),
+            ]
 
-        for defense in defends:
-            data.append(
-                [
-                    'Defense',
-                    defense['name'],
-                    defense['tag'],
-                    defense['townhall'],
-                    datetime.fromtimestamp(defense['_time'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
-                    defense['destruction'],
-                    defense['stars'],
-                    defense['fresh'],
-                    datetime.fromtimestamp(defense['war_start'], tz=utc).strftime('%Y-%m-%d-%H:%M:%S'),
-                    defense['defender_tag'],
-                    defense['defender_name'],
-                    defense['defender_townhall'],
-                    defense['war_type'],
-                    defense['war_status'],
-                    defense['attack_order'],
-                    defense['map_position'],
-                    defense.get('war_size', 0),
-                    defense.get('clan', 'No Clan'),
-                ]
-            )
+        async def rows():
+            for hit_type, field in (('Attack', 'tag'), ('Defense', 'defender_tag')):
+                async for hit in self.bot.warhits.find(
+                    {
+                        '$and': [
+                            {field: {'$in': player_tags}},
+                            {'_time': {'$gte': SEASON_START}},
+                            {'_time': {'$lte': SEASON_END}},
+                        ]
+                    }
+                ):
+                    yield hit_row(hit_type, hit)
 
         columns = [
             'Hit Type',
@@ -584,46 +500,45 @@ class ExportCreator(commands.Cog):
             'War Size',
             'Clan',
         ]
-
-        await self.write_data(worksheet=warhit_stat_page, column_names=columns, data=data)
-        return workbook
+        await writer.add_sheet(sheet_name, columns, rows())
 
     async def create_legend_export(
         self,
-        players: List[StatsPlayer],
-        workbook: openpyxl.Workbook,
+        writer: ExportWriter,
+        player_tags: List[str],
         sheet_name: str,
         season: str = None,
     ):
-        legend_stats_page = workbook.create_sheet(sheet_name)
         start = utils.get_season_start().replace(tzinfo=utc).date()
         now = datetime.now(tz=utc).date()
         current_season_progress = now - start
         current_season_progress = current_season_progress.days
         if season != self.bot.gen_season_date():
             current_season_progress = 100
-        data = []
-        for player in players:
-            season_stats: Dict[str, LegendDay] = player.season_of_legends(season=season)
-            day_spot = 0
-            for day, legend_day in season_stats.items():
-                day_spot += 1
-                data.append(
-                    [
-                        player.name,
-                        player.tag,
-                        player.clan_name(),
-                        player.clan_tag(),
-                        day,
-                        legend_day.attack_sum,
-                        legend_day.defense_sum,
-                        legend_day.net_gain,
-                        legend_day.num_attacks.integer,
-                        legend_day.num_defenses.integer,
-                    ]
-                )
-                if day_spot == current_season_progress:
-                    break
+
+        async def rows():
+            # custom players (which have lots of db info), use the cache since not time sensitive
+            async for players in self._player_pages(player_tags, custom=True, use_cache=True, fields=['legends']):
+                for player in players:
+                    season_stats: Dict[str, LegendDay] = player.season_of_legends(season=season)
+                    day_spot = 0
+                    for day, legend_day in season_stats.items():
+                        day_spot += 1
+                        yield [
+                            player.name,
+                            player.tag,
+                            player.clan_name(),
+                            player.clan_tag(),
+                            day,
+                            legend_day.attack_sum,
+                            legend_day.defense_sum,
+                            legend_day.net_gain,
+                            legend_day.num_attacks.integer,
+                            legend_day.num_defenses.integer,
+                        ]
+                        if day_spot == current_season_progress:
+                            break
+
         columns = [
             'Player Name',
             'Player Tag',
@@ -636,9 +551,7 @@ class ExportCreator(commands.Cog):
             'Num Attacks',
             'Num Defenses',
         ]
-
-        await self.write_data(worksheet=legend_stats_page, column_names=columns, data=data)
-        return workbook
+        await writer.add_sheet(sheet_name, columns, rows())
 
     """#THESE ARE JUST PROTOTYPES, MAY HAVE SOME GOOD STUFF, MAY NOT.
     async def create_last_season_trophies_export(self, ctx, clan):
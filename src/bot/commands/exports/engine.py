@@ -0,0 +1,147 @@
+"""
+Streaming writers for the export templates.
+
+Sheets are written row by row as the rows are produced, so an export never holds more than a page
+of players plus the writer's own buffer. xlsx uses openpyxl's write-only mode (templates have to be
+loaded normally, their replaced sheets are still appended row-wise), csv and parquet emit one file per
+sheet, zipped together when there is more than one.
+"""
+import asyncio
+import csv
+import io
+import zipfile
+from abc import ABC, abstractmethod
+from typing import AsyncIterable, List
+
+from openpyxl import Workbook, load_workbook
+
+from exceptions.CustomExceptions import MessageException
+
+
+try:  # optional dependency, only needed for parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = None
+
+
+EXPORT_FORMATS = ['xlsx', 'csv', 'parquet']
+
+# rows buffered per parquet row group
+PARQUET_BATCH_SIZE = 1000
+
+
+class ExportWriter(ABC):
+    extension = ''
+
+    @abstractmethod
+    async def add_sheet(self, name: str, columns: List[str], rows: AsyncIterable[list]):
+        ...
+
+    @abstractmethod
+    async def finish(self) -> io.BytesIO:
+        """The finished file, `extension` matches it once this returns"""
+        ...
+
+
+class XlsxExportWriter(ExportWriter):
+    extension = 'xlsx'
+
+    def __init__(self, template: str = None):
+        if template is not None:
+            self.workbook = load_workbook(template)
+        else:
+            self.workbook = Workbook(write_only=True)
+
+    async def add_sheet(self, name: str, columns: List[str], rows: AsyncIterable[list]):
+        index = None
+        if name in self.workbook.sheetnames:
+            # a template sheet being refreshed keeps its place in the workbook
+            index = self.workbook.sheetnames.index(name)
+            self.workbook.remove(self.workbook[name])
+        sheet = self.workbook.create_sheet(name, index)
+        sheet.append(columns)
+        async for row in rows:
+            sheet.append(row)
+
+    async def finish(self) -> io.BytesIO:
+        output = io.BytesIO()
+        await asyncio.to_thread(self.workbook.save, output)
+        output.seek(0)
+        return output
+
+
+class _MultiFileWriter(ExportWriter):
+    """One file per sheet, a single sheet is returned as is and several are zipped"""
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+
+    async def finish(self) -> io.BytesIO:
+        if len(self.files) == 1:
+            return io.BytesIO(next(iter(self.files.values())))
+
+        def zip_files():
+            output = io.BytesIO()
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, data in self.files.items():
+                    archive.writestr(f'{name}.{self.extension}', data)
+            return output
+
+        output = await asyncio.to_thread(zip_files)
+        output.seek(0)
+        self.extension = 'zip'
+        return output
+
+
+class CsvExportWriter(_MultiFileWriter):
+    extension = 'csv'
+
+    async def add_sheet(self, name: str, columns: List[str], rows: AsyncIterable[list]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for row in rows:
+            writer.writerow(row)
+        self.files[name] = buffer.getvalue().encode('utf-8')
+
+
+class ParquetExportWriter(_MultiFileWriter):
+    extension = 'parquet'
+
+    def __init__(self):
+        if pa is None:
+            raise MessageException('Parquet exports are not available right now, try xlsx or csv instead')
+        super().__init__()
+
+    async def add_sheet(self, name: str, columns: List[str], rows: AsyncIterable[list]):
+        # every column is written as text, export columns mix numbers with '-' placeholders
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        output = io.BytesIO()
+        writer = pq.ParquetWriter(output, schema)
+
+        def write_batch(batch: List[list]):
+            table = pa.Table.from_pylist(
+                [{column: (None if value is None else str(value)) for column, value in zip(columns, row)} for row in batch],
+                schema=schema,
+            )
+            writer.write_table(table)
+
+        batch = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                await asyncio.to_thread(write_batch, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(write_batch, batch)
+        writer.close()
+        self.files[name] = output.getvalue()
+
+
+def create_writer(format: str = 'xlsx', template: str = None) -> ExportWriter:
+    if format == 'csv':
+        return CsvExportWriter()
+    if format == 'parquet':
+        return ParquetExportWriter()
+    return XlsxExportWriter(template=template)
@@ -1,5 +1,6 @@
 from disnake.ext import commands
 
+from commands.leaderboards.utils import image_board
 from discord import options
 from utility.components import button_generator
 
@@ -363,28 +364,21 @@ class FamilyCommands(commands.Cog, name='Family Commands'):
         await ctx.edit_original_message(embed=embed, components=[buttons])
 
 
-"""    @family.sub_command(
+    @family.sub_command(
         name='leaderboard',
-        description='Family Image LeaderBoard for Activity, Legends, Trophies, & War Stars!',
+        description='Family Image LeaderBoard for Legends',
     )
     async def image(
         self,
         ctx: disnake.ApplicationCommandInteraction,
         clan: coc.Clan = options.optional_clan,
-        board: str = commands.Param(choices=['Activity', 'Legends', 'Trophies', 'War Stars']),
+        board: str = commands.Param(choices=['Legends']),
         limit: int = commands.Param(default=30, min_value=5, max_value=50),
         server: disnake.Guild = options.optional_family,
     ):
-        await ctx.response.defer(ephemeral=True)
-        if clan is None:
-            server = server or ctx.guild
-        if board == 'Legends':
-            file = await image_board(bot=self.bot, clan=clan, server=server, type='legend', limit=limit)
-            board_type = 'clanboardlegend'
-
-        await ctx.edit_original_message(content='Image Board Created!')
-
-        await ctx.channel.send(content=file, components=[])"""
+        server = server or ctx.guild
+        file = await image_board(bot=self.bot, clan=clan, server=server, type='legend', limit=limit)
+        await ctx.edit_original_message(file=file)
 
 
 def setup(bot):
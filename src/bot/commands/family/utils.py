@@ -9,9 +9,8 @@ import disnake
 import pendulum as pend
 
 from classes.bot import CustomClient
-from classes.player.stats import ClanCapitalWeek
 from exceptions.CustomExceptions import MessageException
-from utility.clash.capital import calc_raid_medals, gen_raid_weekend_datestrings, get_raidlog_entry, get_season_raid_weeks
+from utility.clash.capital import calc_raid_medals, gen_raid_weekend_datestrings, get_raidlog_entry
 from utility.clash.other import (
     cwl_league_emojis,
     games_season_start_end_as_timestamp,
@@ -23,6 +22,7 @@ from utility.clash.other import (
 from utility.constants import SHORT_CLAN_LINK, TOWNHALL_LEVELS, item_to_name, leagues
 from utility.discord_utils import register_button
 from utility.general import create_superscript, get_guild_icon, smart_convert_seconds
+from utility.season_rollup import ROLLUP_SIZE, ranked
 
 from ..graphs.utils import daily_graph, monthly_bar_graph
 
@@ -111,167 +111,52 @@ async def family_summary(
 ):
     season = bot.gen_season_date() if season is None else season
     member_tags = await bot.get_family_member_tags(guild_id=server.id)
-    # we dont want results w/ no name
-    results = await bot.player_stats.find({'$and': [{'tag': {'$in': member_tags}}, {'name': {'$ne': None}}]}).to_list(length=None)
+    rollup = await bot.ck_client.get_summary_rollup(owner=f'guild-{server.id}', member_tags=member_tags, season=season, size=max(limit, ROLLUP_SIZE))
     text = ''
     for option, emoji in zip(
         ['gold', 'elixir', 'dark_elixir'],
         [bot.emoji.gold, bot.emoji.elixir, bot.emoji.dark_elixir],
     ):
-        top_results = sorted(results, key=lambda x: x.get(option, {}).get(season, 0), reverse=True)[:limit]
-        if top_results[0] == 0:
-            continue
-        for count, result in enumerate(top_results, 1):
-            looted = result.get(option, {}).get(season, 0)
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
             if looted == 0:
                 continue
             if count == 1:
                 text += f"**{emoji} {option.replace('_', ' ').title()}\n**"
-            text += f"`{count:<2} {'{:,}'.format(looted):11} \u200e{result['name']}`\n"
+            text += f"`{count:<2} {'{:,}'.format(looted):11} \u200e{name}`\n"
         text += '\n'
 
     for option, emoji in zip(
         ['activity', 'attack_wins', 'season_trophies'],
         [bot.emoji.clock, bot.emoji.wood_swords, bot.emoji.trophy],
     ):
-        top_results = sorted(results, key=lambda x: x.get(option, {}).get(season, 0), reverse=True)[:limit]
-        if top_results[0] == 0:
-            continue
-        for count, result in enumerate(top_results, 1):
-            looted = result.get(option, {}).get(season, 0)
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
             if looted == 0:
                 continue
             if count == 1:
                 text += f"**{emoji} {option.replace('_', ' ').title()}\n**"
-            text += f"`{count:<2} {'{:,}'.format(looted):4} \u200e{result['name']}`\n"
+            text += f"`{count:<2} {'{:,}'.format(looted):4} \u200e{name}`\n"
         text += '\n'
 
     first_embed = disnake.Embed(description=text, color=embed_color)
     first_embed.set_author(name=f'{server.name} Season Summary ({season})', icon_url=get_guild_icon(server))
     text = ''
 
-    top_results = sorted(
-        results,
-        key=lambda x: x.get('donations', {}).get(season, {}).get('donated', 0),
-        reverse=True,
-    )[:limit]
-    text += f'**{bot.emoji.up_green_arrow} Donations\n**'
-    for count, result in enumerate(top_results, 1):
-        looted = result.get('donations', {}).get(season, {}).get('donated', 0)
-        text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    top_results = sorted(
-        results,
-        key=lambda x: x.get('donations', {}).get(season, {}).get('received', 0),
-        reverse=True,
-    )[:limit]
-    text += f'**{bot.emoji.down_red_arrow} Received\n**'
-    for count, result in enumerate(top_results, 1):
-        looted = result.get('donations', {}).get(season, {}).get('received', 0)
-        text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    season_raid_weeks = get_season_raid_weeks(season=season)
-
-    def capital_gold_donated(elem):
-        cc_results = []
-        for week in season_raid_weeks:
-            week_result = elem.get('capital_gold', {}).get(week)
-            cc_results.append(ClanCapitalWeek(week_result))
-        return sum([sum(cap.donated) for cap in cc_results])
-
-    top_capital_donos = sorted(results, key=capital_gold_donated, reverse=True)[:limit]
-    text += f'**{bot.emoji.capital_gold} CG Donated\n**'
-    for count, result in enumerate(top_capital_donos, 1):
-        cg_donated = capital_gold_donated(result)
-        text += f"`{count:<2} {'{:,}'.format(cg_donated):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    def capital_gold_raided(elem):
-        cc_results = []
-        for week in season_raid_weeks:
-            week_result = elem.get('capital_gold', {}).get(week)
-            cc_results.append(ClanCapitalWeek(week_result))
-        return sum([sum(cap.raided) for cap in cc_results])
-
-    top_capital_raided = sorted(results, key=capital_gold_raided, reverse=True)[:limit]
-    text += f'**{bot.emoji.capital_gold} CG Raided\n**'
-    for count, result in enumerate(top_capital_raided, 1):
-        cg_raided = capital_gold_raided(result)
-        text += f"`{count:<2} {'{:,}'.format(cg_raided):7} \u200e{result['name']}`\n"
-    text += '\n'
-
-    SEASON_START, SEASON_END = gen_season_start_end_as_iso(season=season)
-    pipeline = [
-        {
-            '$match': {
-                '$and': [
-                    {
-                        '$or': [
-                            {'data.clan.members.tag': {'$in': member_tags}},
-                            {'data.opponent.members.tag': {'$in': member_tags}},
-                        ]
-                    },
-                    {'data.preparationStartTime': {'$gte': SEASON_START}},
-                    {'data.preparationStartTime': {'$lte': SEASON_END}},
-                    {'type': {'$ne': 'friendly'}},
-                ]
-            }
-        },
-        {
-            '$project': {
-                '_id': 0,
-                'uniqueKey': {
-                    '$concat': [
-                        {
-                            '$cond': {
-                                'if': {'$lt': ['$data.clan.tag', '$data.opponent.tag']},
-                                'then': '$data.clan.tag',
-                                'else': '$data.opponent.tag',
-                            }
-                        },
-                        {
-                            '$cond': {
-                                'if': {'$lt': ['$data.opponent.tag', '$data.clan.tag']},
-                                'then': '$data.opponent.tag',
-                                'else': '$data.clan.tag',
-                            }
-                        },
-                        '$data.preparationStartTime',
-                    ]
-                },
-                'data': 1,
-            }
-        },
-        {'$group': {'_id': '$uniqueKey', 'data': {'$first': '$data'}}},
-        {'$project': {'members': {'$concatArrays': ['$data.clan.members', '$data.opponent.members']}}},
-        {'$unwind': '$members'},
-        {'$match': {'members.tag': {'$in': member_tags}}},
-        {
-            '$project': {
-                '_id': 0,
-                'tag': '$members.tag',
-                'name': '$members.name',
-                'stars': {'$sum': '$members.attacks.stars'},
-            }
-        },
-        {
-            '$group': {
-                '_id': '$tag',
-                'name': {'$last': '$name'},
-                'totalStars': {'$sum': '$stars'},
-            }
-        },
-        {'$sort': {'totalStars': -1}},
-        {'$limit': limit},
-    ]
-    war_star_results = await bot.clan_war.aggregate(pipeline=pipeline).to_list(length=None)
+    for option, emoji, title in (
+        ('donated', bot.emoji.up_green_arrow, 'Donations'),
+        ('received', bot.emoji.down_red_arrow, 'Received'),
+        ('capital_donated', bot.emoji.capital_gold, 'CG Donated'),
+        ('capital_raided', bot.emoji.capital_gold, 'CG Raided'),
+    ):
+        text += f'**{emoji} {title}\n**'
+        for count, (looted, tag, name) in enumerate(ranked(rollup, option, limit), 1):
+            text += f"`{count:<2} {'{:,}'.format(looted):7} \u200e{name}`\n"
+        text += '\n'
 
+    war_star_results = ranked(rollup, 'war_stars', limit)
     if war_star_results:
         text += f'**{bot.emoji.war_star} War Stars\n**'
-        for count, result in enumerate(war_star_results, 1):
-            text += f"`{count:<2} {'{:,}'.format(result.get('totalStars')):3} \u200e{result.get('name')}`\n"
+        for count, (stars, tag, name) in enumerate(war_star_results, 1):
+            text += f"`{count:<2} {'{:,}'.format(stars):3} \u200e{name}`\n"
 
     second_embed = disnake.Embed(description=text, color=embed_color)
     second_embed.timestamp = pend.now(tz=pend.UTC)
@@ -794,52 +679,28 @@ async def family_donations(
     season = bot.gen_season_date() if season is None else season
 
     family_clan_tags = await bot.clan_db.distinct('tag', filter={'server': server.id})
-    family_clan_donations = await bot.clan_stats.find({'tag': {'$in': family_clan_tags}}, projection={'_id': 0, f'{season}': 1}).to_list(length=None)
-
-    holder = namedtuple('holder', ['tag', 'donations', 'received'])
-    hold_items = {}
-    for clan_stats in family_clan_donations:
-        season_stats = clan_stats.get(season, {})
-        for tag, data in season_stats.items():
-            if hold_items.get(tag) is None:
-                hold_items[tag] = holder(
-                    tag=tag,
-                    donations=data.get('donated', 0),
-                    received=data.get('received', 0),
-                )
-            else:
-                curr_item = hold_items[tag]
-                curr_item = curr_item._replace(donations=(curr_item.donations + data.get('donated', 0)))
-                curr_item = curr_item._replace(received=(curr_item.received + data.get('received', 0)))
-                hold_items[tag] = curr_item
-
-    hold_items = list(hold_items.values())
-    hold_items.sort(
-        key=lambda x: x.__getattribute__(sort_by.lower()),
-        reverse=(sort_order.lower() == 'descending'),
-    )
-    if len(hold_items) == 0:
+    rollup = await bot.ck_client.get_clan_stats_rollup(server_id=server.id, clan_tags=family_clan_tags, season=season, size=max(limit, ROLLUP_SIZE))
+    if not rollup['count']:
         raise MessageException('No players, try a lighter search filter')
 
-    tags = [h.tag for h in hold_items[:limit]]
+    ranked_players = ranked(rollup, sort_by.lower(), limit, descending=(sort_order.lower() == 'descending'))
+    tags = [tag for _, tag, _ in ranked_players]
     players = await bot.get_players(tags=tags, custom=True, use_cache=True, fake_results=True)
     map_player = {p.tag: p for p in players}
 
     text = '` #  DON   REC  NAME        `\n'
-    total_donated = 0
-    total_received = 0
-    for count, member in enumerate(hold_items, 1):
-        if count <= limit:
-            player = map_player.get(member.tag)
-            if player is None:
-                continue
-            text += f'`{count:2} {member.donations:5} {member.received:5} {player.clear_name[:13]:13}`[{create_superscript(player.town_hall)}]({player.share_link})\n'
-        total_donated += member.donations
-        total_received += member.received
+    for count, (_, tag, _) in enumerate(ranked_players, 1):
+        player = map_player.get(tag)
+        if player is None:
+            continue
+        donations, received = rollup['players'][tag].get('donations', 0), rollup['players'][tag].get('received', 0)
+        text += f'`{count:2} {donations:5} {received:5} {player.clear_name[:13]:13}`[{create_superscript(player.town_hall)}]({player.share_link})\n'
+    total_donated = rollup['totals'].get('donations', 0)
+    total_received = rollup['totals'].get('received', 0)
 
     embed = disnake.Embed(description=f'{text}', color=embed_color)
     embed.set_author(
-        name=f'{server.name} Top {min(limit, len(hold_items))} Donators',
+        name=f'{server.name} Top {min(limit, rollup["count"])} Donators',
         icon_url=get_guild_icon(server),
     )
     embed.set_footer(
@@ -964,36 +825,33 @@ async def family_activity(
     season = season or bot.gen_season_date()
     show_last_online = bot.gen_season_date() == season
     family_clan_tags = await bot.clan_db.distinct('tag', filter={'server': server.id})
-    clan_stats = await bot.clan_stats.find(
-        {'tag': {'$in': family_clan_tags}},
-        projection={'tag': 1, f'{season}': 1, '_id': 0},
-    ).to_list(length=None)
-    all_member_tags = [tag for clan in clan_stats for tag in clan.get(season, {}).keys()]
-    players = await bot.get_players(tags=all_member_tags, custom=True, use_cache=True)
+    rollup = await bot.ck_client.get_clan_stats_rollup(server_id=server.id, clan_tags=family_clan_tags, season=season, size=max(limit, ROLLUP_SIZE))
+    if not rollup['count']:
+        raise MessageException('No players, try a lighter search filter')
+
+    if sort_by == 'activity':
+        activity = {tag: value for value, tag, _ in ranked(rollup, 'activity', limit, descending=(sort_order.lower() == 'descending'))}
+    else:
+        # last online lives on the players, so sorting by it still needs every member
+        clan_stats = await bot.clan_stats.find(
+            {'tag': {'$in': family_clan_tags}},
+            projection={'tag': 1, f'{season}': 1, '_id': 0},
+        ).to_list(length=None)
+        activity = defaultdict(int)
+        for clan_stat in clan_stats:
+            for tag, data in clan_stat.get(season, {}).items():
+                activity[tag] += data.get('activity', 0)
+    players = await bot.get_players(tags=list(activity), custom=True, use_cache=True)
     map_player = {p.tag: p for p in players}
 
     holder = namedtuple('holder', ['player', 'activity', 'lastonline'])
-    hold_items = []
-    for clan_stat in clan_stats:
-        season_stats = clan_stat.get(season, {})
-        for tag, data in season_stats.items():
-            player = map_player.get(tag)
-            if player is None:
-                continue
-            hold_items.append(
-                holder(
-                    player=player,
-                    activity=data.get('activity', 0),
-                    lastonline=player.last_online,
-                )
-            )
-
+    hold_items = [
+        holder(player=map_player[tag], activity=value, lastonline=map_player[tag].last_online) for tag, value in activity.items() if tag in map_player
+    ]
     hold_items.sort(
         key=lambda x: x.__getattribute__(sort_by),
         reverse=(sort_order.lower() == 'descending'),
     )
-    if len(hold_items) == 0:
-        raise MessageException('No players, try a lighter search filter')
 
     if show_last_online:
         text = '` # ACT   LO    NAME        `\n'
@@ -1001,7 +859,6 @@ async def family_activity(
         text = '` #  ACT    NAME        `\n'
 
     now = int((pend.now(tz=pend.UTC).timestamp()))
-    total_activity = 0
     for count, member in enumerate(hold_items, 1):
         if count <= limit:
             if show_last_online:
@@ -1009,11 +866,11 @@ async def family_activity(
                 text += f'`{count:2} {member.activity:3} {time_text:7} {member.player.clear_name[:13]:13}`[{create_superscript(member.player.town_hall)}]({member.player.share_link})\n'
             else:
                 text += f'`{count:2} {member.activity:4} {member.player.clear_name[:13]:13}`[{create_superscript(member.player.town_hall)}]({member.player.share_link})\n'
-        total_activity += member.activity
+    total_activity = rollup['totals'].get('activity', 0)
 
     embed = disnake.Embed(description=f'{text}', color=embed_color)
     embed.set_author(
-        name=f'{server.name} Top {min(limit, len(hold_items))} Activity',
+        name=f'{server.name} Top {min(limit, rollup["count"])} Activity',
         icon_url=get_guild_icon(server),
     )
     embed.set_footer(
@@ -0,0 +1,131 @@
+"""
+Graph data layer, the day/hour bucketing runs inside mongo and only `(tag, bucket, count)` rows come back.
+
+Rows are grouped per member server side and folded into their clans here, so a family-wide graph
+transfers one small row per member & bucket instead of every raw timestamp/history document.
+"""
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List
+
+
+if TYPE_CHECKING:
+    from classes.bot import CustomClient
+else:
+    from disnake import AutoShardedClient as CustomClient
+
+
+DATE_FORMATS = {
+    'day': '%Y-%m-%d',
+    'hour': '%Y-%m-%d %H:00:00',
+}
+
+
+def _is_whole_number(field: str) -> dict:
+    return {'$and': [{'$in': [{'$type': field}, ['int', 'long']]}, {'$gte': [field, 0]}]}
+
+
+def bucket_stages(time_field: str, granularity: str = 'day', weight=1) -> List[dict]:
+    """Stages that turn documents holding a unix `time_field` into `{tag, date, count}` rows"""
+    return [
+        {
+            '$project': {
+                '_id': 0,
+                'tag': 1,
+                'date': {
+                    '$dateTrunc': {
+                        'date': {'$toDate': {'$multiply': [{'$toLong': f'${time_field}'}, 1000]}},
+                        'unit': granularity,
+                    }
+                },
+                'weight': weight,
+            }
+        },
+        {'$match': {'weight': {'$gt': 0}}},
+        {'$group': {'_id': {'tag': '$tag', 'date': '$date'}, 'count': {'$sum': '$weight'}}},
+        {
+            '$project': {
+                '_id': 0,
+                'tag': '$_id.tag',
+                'date': {'$dateToString': {'date': '$_id.date', 'format': DATE_FORMATS[granularity]}},
+                'count': 1,
+            }
+        },
+    ]
+
+
+def fold_clans(rows: List[dict], member_clans: Dict[str, str]) -> List[dict]:
+    """Sum per-member `{tag, date, count}` rows into `{clan, date, count}` rows"""
+    counts = defaultdict(int)
+    for row in rows:
+        clan = member_clans.get(row.get('tag'))
+        if clan is not None:
+            counts[(clan, row.get('date'))] += row.get('count', 0)
+    return [{'clan': clan, 'date': date, 'count': count} for (clan, date), count in counts.items()]
+
+
+def activity_pipeline(member_clans: Dict[str, str], season: str, granularity: str = 'day') -> List[dict]:
+    field = f'last_online_times.{season}'
+    return [
+        {'$match': {'tag': {'$in': list(member_clans.keys())}, field: {'$exists': True}}},
+        {'$project': {'_id': 0, 'tag': 1, 'time': f'${field}'}},
+        {'$unwind': '$time'},
+    ] + bucket_stages(time_field='time', granularity=granularity)
+
+
+def history_pipeline(
+    member_clans: Dict[str, str],
+    types: List[str],
+    start_time: int,
+    end_time: int,
+    count_levels: bool = True,
+    granularity: str = 'day',
+) -> List[dict]:
+    """`player_history` events per clan & bucket, an upgrade spanning several levels counts once per level"""
+    weight = 1
+    if count_levels:
+        weight = {
+            '$cond': [
+                {'$and': [_is_whole_number('$value'), _is_whole_number('$p_value')]},
+                {'$subtract': ['$value', '$p_value']},
+                1,
+            ]
+        }
+    return [
+        {
+            '$match': {
+                'tag': {'$in': list(member_clans.keys())},
+                'type': {'$in': types},
+                'time': {'$gte': start_time, '$lte': end_time},
+            }
+        },
+        {'$project': {'_id': 0, 'tag': 1, 'time': 1, 'value': 1, 'p_value': 1}},
+    ] + bucket_stages(time_field='time', granularity=granularity, weight=weight)
+
+
+def label_rows(rows: List[dict], clan_names: Dict[str, str]) -> List[dict]:
+    return [{'Clan': f"{clan_names.get(row.get('clan'))}", 'Date': row.get('date'), 'Count': row.get('count', 0)} for row in rows]
+
+
+async def clan_activity_buckets(bot: CustomClient, member_clans: Dict[str, str], clan_names: Dict[str, str], season: str) -> List[dict]:
+    rows = await bot.player_stats.aggregate(activity_pipeline(member_clans=member_clans, season=season)).to_list(length=None)
+    return label_rows(fold_clans(rows, member_clans), clan_names)
+
+
+async def clan_history_buckets(
+    bot: CustomClient,
+    member_clans: Dict[str, str],
+    clan_names: Dict[str, str],
+    types: List[str],
+    start_time: int,
+    end_time: int,
+    count_levels: bool = True,
+) -> List[dict]:
+    pipeline = history_pipeline(
+        member_clans=member_clans,
+        types=types,
+        start_time=start_time,
+        end_time=end_time,
+        count_levels=count_levels,
+    )
+    rows = await bot.player_history.aggregate(pipeline=pipeline).to_list(length=None)
+    return label_rows(fold_clans(rows, member_clans), clan_names)
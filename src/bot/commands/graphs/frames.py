@@ -0,0 +1,51 @@
+"""
+Counting stage shared by the graph commands.
+
+Everything is kept in long `Clan | Date | Count` frames, bucketed rows come from
+`commands/graphs/data.py` and the top-N selection/ranking is a couple of vectorized group-bys.
+"""
+from typing import Dict, List
+
+import pandas as pd
+
+
+FRAME_COLUMNS = ['Clan', 'Date', 'Count']
+
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({'Clan': pd.Series(dtype=object), 'Date': pd.Series(dtype=object), 'Count': pd.Series(dtype='int64')})
+
+
+def frame_from_rows(rows: List[dict]) -> pd.DataFrame:
+    """`Clan | Date | Count` frame from already bucketed rows, duplicate buckets are summed"""
+    if not rows:
+        return empty_frame()
+    frame = pd.DataFrame(rows, columns=FRAME_COLUMNS)
+    return frame.groupby(['Clan', 'Date'], as_index=False, sort=False, dropna=False)['Count'].sum()
+
+
+def frame_from_nested(data: Dict[str, Dict[str, int]]) -> pd.DataFrame:
+    """`{clan: {date: count}}` -> `Clan | Date | Count` frame"""
+    return frame_from_rows([{'Clan': clan, 'Date': date, 'Count': count} for clan, dates in data.items() for date, count in dates.items()])
+
+
+def top_series(frame: pd.DataFrame, limit: int, rank: bool = True) -> pd.DataFrame:
+    """
+    Keep the `limit` clans with the highest total count (ordered highest first), dates ascending
+    `rank=False` keeps every clan, for values that can't be summed (league positions, trophies)
+    """
+    if frame.empty:
+        return frame
+    if rank:
+        totals = frame.groupby('Clan', sort=False, dropna=False)['Count'].sum().sort_values(ascending=False, kind='stable')
+        order = list(totals.index[:limit])
+    else:
+        order = list(dict.fromkeys(frame['Clan']))
+    frame = frame[frame['Clan'].isin(order)].copy()
+    frame['_order'] = frame['Clan'].map({clan: i for i, clan in enumerate(order)})
+    return frame.sort_values(['_order', 'Date'], kind='stable').drop(columns='_order').reset_index(drop=True)
+
+
+def ranked_totals(data: Dict[str, int], limit: int = 20) -> List[tuple[str, int]]:
+    """Per clan totals, highest first, capped at `limit`"""
+    return sorted(data.items(), key=lambda kv: kv[1], reverse=True)[:limit]
@@ -1,4 +1,3 @@
-import asyncio
 import io
 import statistics
 import uuid
@@ -7,17 +6,19 @@ from typing import List
 
 import coc
 import disnake
-import pandas as pd
 import pendulum as pend
 import plotly.express as px
 import plotly.io as pio
 
 from classes.bot import CustomClient
 from exceptions.CustomExceptions import MessageException
+from commands.graphs.data import clan_activity_buckets, clan_history_buckets
+from commands.graphs.frames import frame_from_nested, frame_from_rows, ranked_totals, top_series
 from utility.cdn import upload_html_to_cdn
 from utility.clash.capital import get_season_raid_weeks
 from utility.clash.other import gen_season_start_end_as_iso, gen_season_start_end_as_timestamp
 from utility.constants import leagues
+from utility.render import render_figure
 
 
 async def daily_graph(
@@ -30,45 +31,10 @@ async def daily_graph(
 ) -> (disnake.File, str):
     clan_name_map = await bot.get_clan_name_mapping(clans=clan_tags)
     clan_member_map = await bot.get_mapped_clan_member_tags(clan_tags=clan_tags)
-    member_map = {tag: f'{clan_name_map.get(clan_tag)}' for tag, clan_tag in clan_member_map.items()}
 
-    def bucket_timestamps(timestamps: List[int], granularity):
-        buckets = {}
-
-        for timestamp in timestamps:
-            dt_object = pend.from_timestamp(timestamp, tz=pend.UTC)
-            if granularity == 'day':
-                key = dt_object.strftime('%Y-%m-%d')
-            elif granularity == 'hour':
-                key = dt_object.strftime('%Y-%m-%d %H:00:00')
-            else:
-                continue
-            if key not in buckets:
-                buckets[key] = 0
-            buckets[key] += 1
-        return buckets
-
-    data = {}
     if attribute == 'activity':
         season = bot.gen_season_date(seasons_ago=24, as_text=False)[months - 1]
-        data = await bot.player_stats.find(
-            {'tag': {'$in': list(member_map.keys())}},
-            projection={'tag': 1, f'last_online_times.{season}': 1},
-        ).to_list(length=None)
-        reformated_data = [
-            {
-                'tag': d.get('tag'),
-                'times': d.get(f'last_online_times', {}).get(season, []),
-            }
-            for d in data
-        ]
-        holder = defaultdict(list)
-        for data in reformated_data:
-            holder[member_map.get(data.get('tag'))] += data.get('times')
-        data = {}
-        # data now looks like {clan : List[unix_timestamps]}
-        for clan_name, times in holder.items():
-            data[clan_name] = bucket_timestamps(timestamps=times, granularity='day')
+        rows = await clan_activity_buckets(bot=bot, member_clans=clan_member_map, clan_names=clan_name_map, season=season)
     else:
         do_count = True
         if attribute == 'troopupgrades':
@@ -83,47 +49,20 @@ async def daily_graph(
             lookup = [attribute]
         START_TIME = int(pend.now(tz=pend.UTC).subtract(months=months).timestamp())
         END_TIME = int(pend.now(tz=pend.UTC).timestamp())
-        pipeline = [
-            {
-                '$match': {
-                    '$and': [
-                        {'tag': {'$in': list(member_map.keys())}},
-                        {'type': {'$in': lookup}},
-                        {'time': {'$gte': START_TIME}},
-                        {'time': {'$lte': END_TIME}},
-                    ]
-                }
-            },
-            {'$group': {'_id': '$tag', 'items': {'$push': '$$ROOT'}}},
-        ]
-        result = await bot.player_history.aggregate(pipeline=pipeline).to_list(length=None)
-        holder = defaultdict(list)
-        for data in result:
-            for item in data.get('items', []):
-                times = 1
-                if do_count and str(item.get('p_value')).isdigit() and str(item.get('value')).isdigit():
-                    times = item.get('value') - item.get('p_value')
-                for x in range(0, times):
-                    holder[member_map.get(data.get('_id'))] += [item.get('time')] * times
-        data = {}
-        for clan_name, times in holder.items():
-            data[clan_name] = bucket_timestamps(timestamps=times, granularity='day')
+        rows = await clan_history_buckets(
+            bot=bot,
+            member_clans=clan_member_map,
+            clan_names=clan_name_map,
+            types=lookup,
+            start_time=START_TIME,
+            end_time=END_TIME,
+            count_levels=do_count,
+        )
+    frame = frame_from_rows(rows)
 
-    if not data:
+    if frame.empty:
         raise MessageException('No data found')
-    data_list = []
-    count_each_has = defaultdict(int)
-    for clan, datetime_count_dict in data.items():
-        for datetime, count in sorted(datetime_count_dict.items()):
-            count_each_has[clan] += count
-    top_20_clans = dict(sorted(count_each_has.items(), key=lambda x: x[1], reverse=True)[:limit])
-    for clan, datetime_count_dict in data.items():
-        if top_20_clans.get(clan) is None:
-            continue
-        for datetime, count in sorted(datetime_count_dict.items()):
-            data_list.append({'Clan': clan, 'Date': datetime, 'Count': count})
-
-    df = pd.DataFrame(data_list)
+    df = top_series(frame, limit=limit)
     # Create Plotly figure
     fig = px.line(df, x='Date', y='Count', color='Clan')
     fig.update_layout(
@@ -145,12 +84,7 @@ async def daily_graph(
         legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
         showlegend=(len(clan_tags) >= 2),  # You can set this to False if you want to hide the legend initially
     )
-    loop = asyncio.get_event_loop()
-
-    def get_img(fig):
-        return pio.to_image(fig, format='png', scale=1.0)
-
-    img = await loop.run_in_executor(None, get_img, fig)
+    img = await bot.render_pool.run(render_figure, fig.to_dict(), kind='graph')
     web_version = None
     html = False
     if html:
@@ -273,21 +207,7 @@ async def season_line_graph(
 
     if not data:
         raise MessageException('No data found')
-    data_list = []
-    if countable:
-        count_each_has = defaultdict(int)
-        for clan, season_data in data.items():
-            for season_id, season_count in sorted(season_data.items(), key=lambda x: x[0]):
-                count_each_has[clan] += season_count
-        top_20_clans = dict(sorted(count_each_has.items(), key=lambda x: x[1], reverse=True)[:limit])
-
-    for clan, season_data in data.items():
-        if countable and top_20_clans.get(clan) is None:
-            continue
-        for season_id, season_count in sorted(season_data.items(), key=lambda x: x[0]):
-            data_list.append({'Clan': clan, 'Date': season_id, 'Count': season_count})
-
-    df = pd.DataFrame(data_list)
+    df = top_series(frame_from_nested(data), limit=limit, rank=countable)
     # Create Plotly figure
     fig = px.line(df, x='Date', y='Count', color='Clan')
     fig.update_layout(
@@ -309,12 +229,7 @@ async def season_line_graph(
         legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
         showlegend=(len(clan_tags) >= 2),  # You can set this to False if you want to hide the legend initially
     )
-    loop = asyncio.get_event_loop()
-
-    def get_img(fig):
-        return pio.to_image(fig, format='png', scale=1.0)
-
-    img = await loop.run_in_executor(None, get_img, fig)
+    img = await bot.render_pool.run(render_figure, fig.to_dict(), kind='graph')
     web_version = None
     html = False
     if html:
@@ -497,7 +412,7 @@ async def monthly_bar_graph(
     clans = []
     bar_text = []
     attributes = []
-    sorted_data = sorted(data.items(), key=lambda x: x[1], reverse=True)[:20]
+    sorted_data = ranked_totals(data, limit=20)
     for clan, attribute_value in reversed(sorted_data):
         perc = int((attribute_value / total) * 100)
         clans.append(clan)
@@ -521,12 +436,7 @@ async def monthly_bar_graph(
         showlegend=False,  # You can set this to False if you want to hide the legend initially
     )
     # Customize the layout if needed
-    loop = asyncio.get_event_loop()
-
-    def get_img(fig):
-        return pio.to_image(fig, format='png', scale=1.0)
-
-    img = await loop.run_in_executor(None, get_img, fig)
+    img = await bot.render_pool.run(render_figure, fig.to_dict(), kind='graph')
     web_version = None
     html = False
     if html:
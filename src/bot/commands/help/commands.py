@@ -1,6 +1,5 @@
 from typing import Dict, List
 
-import aiohttp
 import disnake
 from disnake.ext import commands
 
@@ -140,9 +139,8 @@ class HelpCommands(commands.Cog, name='Help'):
 
         # Fetch the answer from GitBook API
         gitbook_url = 'https://api.gitbook.com/v1/spaces/iSJhS5UxZkjOhR5eSxhS/search/ask'
-        async with aiohttp.ClientSession() as session:
-            async with session.get(gitbook_url, params={'query': query}) as response:
-                answer = await response.json() if response.status == 200 else None
+        async with self.bot.http_client.get(gitbook_url, params={'query': query}) as response:
+            answer = await response.json() if response.status == 200 else None
 
         if not answer:
             raise MessageException('No answer found')
@@ -152,9 +150,8 @@ class HelpCommands(commands.Cog, name='Help'):
         # Fetch GitBook content
         content_url = 'https://api.gitbook.com/v1/spaces/iSJhS5UxZkjOhR5eSxhS/content'
         headers = {'Authorization': f'Bearer {self.bot._config.gitbook_token}'}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(content_url, headers=headers) as response:
-                content = await response.json() if response.status == 200 else None
+        async with self.bot.http_client.get(content_url, headers=headers) as response:
+            content = await response.json() if response.status == 200 else None
 
         if not content or 'pages' not in content:
             return
@@ -1,8 +1,16 @@
+import io
+import re
+from typing import List
+
 import coc
 import disnake
 
 from classes.bot import CustomClient
 from classes.DatabaseClient.Classes.player import LegendPlayer
+from classes.player.stats import StatsPlayer
+from exceptions.CustomExceptions import MessageException
+from utility.general import get_guild_icon
+from utility.imagegen.table import table_image
 
 
 async def hv_player_leaderboard(
@@ -203,7 +211,6 @@ async def bb_clan_leaderboard(
     return embeds
 
 
-'''
 async def image_board(
     bot: CustomClient,
     clan: coc.Clan,
@@ -211,7 +218,9 @@ async def image_board(
     type: str,
     limit: int,
     **kwargs,
-):
+) -> disnake.File:
+    if type != 'legend':
+        raise MessageException(f'No {type} image board yet')
     if clan is None:
         clan_tags = await bot.clan_db.distinct('tag', filter={'server': server.id})
     else:
@@ -221,7 +230,6 @@ async def image_board(
 
     start_number = kwargs.get('start_number', 0)
     data = []
-    t = time.time()
     if type == 'legend':
         pipeline = [
             {'$match': {'tag': {'$in': clan_tags}}},
@@ -233,16 +241,14 @@ async def image_board(
             {'$project': {'_id': 0, 'topPlayers': 1}},
         ]
         result = await bot.basic_clan.aggregate(pipeline=pipeline).to_list(length=None)
-        legend_tags = result[0].get('topPlayers', [])
+        legend_tags = result[0].get('topPlayers', []) if result else []
         if not legend_tags:
             raise MessageException('No Legend Players')
-        players: List[StatsPlayer] = await bot.get_players(tags=legend_tags, custom=True, use_cache=True)
-        players.sort(key=lambda x: x.trophies)
+        players: List[StatsPlayer] = await bot.get_players(tags=legend_tags, custom=True, use_cache=True, fields=['legends'])
+        players.sort(key=lambda x: x.trophies, reverse=True)
         columns = ['Name', 'Start', 'Atk', 'Def', 'Net', 'Current']
         badges = [player.clan_badge_link() for player in players]
-        count = len(players) + 1 + start_number
-        for player in players:
-            count -= 1
+        for count, player in enumerate(players, start=start_number + 1):
             c = f'{count}.'
             day = player.legend_day()
             if day.net_gain >= 0:
@@ -281,19 +287,16 @@ async def image_board(
             lo = convert_seconds(now_seconds - player.last_online) if player.last_online else "N/A"
             data.append([f"{c:3} {player.name.replace('$','')}", player.donos().donated, player.donos().received, lo, len(player.season_last_online())])"""
 
-    data = {
-        'columns': columns,
-        'data': data,
-        'logo': get_guild_icon(server) if clan is None else clan.badge.url,
-        'badge_columns': badges,
-        'title': re.sub('[*_`~/"#]', '', f'{(clan or server).name} Top {limit} {type.title()}'),
-    }
-    async with aiohttp.ClientSession(json_serialize=ujson.dumps) as session:
-        async with session.post('https://api.clashk.ing/table', json=data) as response:
-            link = await response.json()
-        await session.close()
-    return f'{link.get("link")}?t={int(pend.now(tz=pend.UTC).timestamp())}'
+    image = await table_image(
+        columns=columns,
+        rows=data,
+        title=re.sub('[*_`~/"#]', '', f'{(clan or server).name} Top {limit} {type.title()}'),
+        badges=badges,
+        logo=get_guild_icon(server) if clan is None else clan.badge.url,
+    )
+    return disnake.File(fp=io.BytesIO(image), filename=f'{type}-board.png')
 
 
+'''
 async def location_components(bot: CustomClient, loc_type: str, **kwargs):
     return None'''
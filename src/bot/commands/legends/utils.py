@@ -1,10 +1,7 @@
-import asyncio
 import calendar
-import concurrent.futures
 import io
 import random
 
-import aiohttp
 import coc
 import disnake
 import emoji
@@ -20,7 +17,7 @@ import pendulum as pend
 from babel import Locale
 from babel.dates import get_month_names
 from coc import Clan, enums, utils
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from pytz import utc
 
 from classes.bot import CustomClient
@@ -29,6 +26,8 @@ from utility.clash.other import gen_legend_date, gen_season_date
 from utility.constants import POSTER_LIST
 from utility.discord_utils import register_button
 from utility.general import create_superscript
+from utility.imagegen.assets import get_background, get_font, open_badge
+from utility.render import encode_image
 
 
 @register_button('legendday', parser='_:player')
@@ -54,8 +53,7 @@ async def legend_day_overview(
 
     global_ranking_text = player.ranking.global_ranking
     if isinstance(global_ranking_text, int):
-        lowest_rank = await bot.legend_rankings.find({}).sort([('rank', -1)]).limit(1).to_list(length=1)
-        lowest_rank = lowest_rank[0].get('rank')
+        lowest_rank = (await bot.legend_snapshot.get())['lowest_rank']
         curr_rank = player.ranking.global_ranking
         if player.ranking.global_ranking < 100:
             curr_rank = 100
@@ -230,33 +228,23 @@ async def legend_poster(bot: CustomClient, player: coc.Player | LegendPlayer, ba
 
     graph = Image.open('assets/poster_graph.png')
     if background is None:
-        poster = Image.open(f'assets/backgrounds/{random.choice(list(POSTER_LIST.values()))}.png')
+        poster = get_background(f'assets/backgrounds/{random.choice(list(POSTER_LIST.values()))}.png')
     else:
-        poster = Image.open(f'assets/backgrounds/{POSTER_LIST.get(background)}.png')
+        poster = get_background(f'assets/backgrounds/{POSTER_LIST.get(background)}.png')
 
     poster.paste(graph, (1175, 475), graph.convert('RGBA'))
 
-    font = ImageFont.truetype('assets/fonts/code.ttf', 80)
-    font2 = ImageFont.truetype('assets/fonts/blogger.ttf', 35)
-    font3 = ImageFont.truetype('assets/fonts/blogger.ttf', 60)
-    font4 = ImageFont.truetype('assets/fonts/blogger.ttf', 37)
-    font5 = ImageFont.truetype('assets/fonts/blogger.ttf', 20)
-    font6 = ImageFont.truetype('assets/fonts/blogger.ttf', 40)
+    font = get_font('assets/fonts/code.ttf', 80)
+    font2 = get_font('assets/fonts/blogger.ttf', 35)
+    font3 = get_font('assets/fonts/blogger.ttf', 60)
+    font4 = get_font('assets/fonts/blogger.ttf', 37)
+    font5 = get_font('assets/fonts/blogger.ttf', 20)
+    font6 = get_font('assets/fonts/blogger.ttf', 40)
 
     # add clan badge & text
     if player._.clan is not None:
         # clan = await player.get_detailed_clan()
-        async def fetch(url, session):
-            async with session.get(url) as response:
-                image_data = io.BytesIO(await response.read())
-                return image_data
-
-        tasks = []
-        async with aiohttp.ClientSession() as session:
-            tasks.append(fetch(player._.clan.badge.large, session))
-            responses = await asyncio.gather(*tasks)
-            await session.close()
-        badge = Image.open(responses[0])
+        badge = open_badge(await bot.badge_cache.fetch(player._.clan.badge.large))
         size = 275, 275
         badge.thumbnail(size, Image.LANCZOS)
         A = badge.getchannel('A')
@@ -406,19 +394,8 @@ async def legend_poster(bot: CustomClient, player: coc.Player | LegendPlayer, ba
                 font=font6,
             )
 
-    def save_im(poster):
-        temp = io.BytesIO()
-        poster = poster.resize((960, 540))
-        poster.save(temp, format='PNG', optimize=True)
-        temp.seek(0)
-        file = disnake.File(fp=temp, filename='legends_poster.png')
-        return file
-
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        loop = asyncio.get_event_loop()
-        file = await loop.run_in_executor(pool, save_im, poster)
-
-    return file
+    image = await bot.render_pool.run(encode_image, poster, size=(960, 540), format='PNG', optimize=True, kind='legends_poster')
+    return disnake.File(fp=io.BytesIO(image), filename='legends_poster.png')
 
 
 @register_button('legendhistory', parser='_:player')
@@ -516,32 +493,7 @@ async def legend_quicksearch(bot: CustomClient, ctx: disnake.MessageInteraction,
 
 @register_button('legendcutoff', parser='_:')
 async def legend_cutoff(bot: CustomClient, embed_color: disnake.Color):
-    results = (
-        await bot.legend_rankings.find(
-            {
-                '$or': [
-                    {'rank': 1},
-                    {'rank': 5},
-                    {'rank': 25},
-                    {'rank': 50},
-                    {'rank': 100},
-                    {'rank': 200},
-                    {'rank': 500},
-                    {'rank': 1000},
-                    {'rank': 2500},
-                    {'rank': 5000},
-                    {'rank': 10000},
-                    {'rank': 25000},
-                    {'rank': 50000},
-                    {'rank': 100000},
-                    {'rank': 250000},
-                ]
-            },
-            projection={'rank': 1, 'trophies': 1},
-        )
-        .sort('rank', 1)
-        .to_list(length=None)
-    )
+    results = (await bot.legend_snapshot.get())['cutoffs']
     text = ''
     for result in results:
         rank = f"#{result.get('rank')}"
@@ -572,47 +524,11 @@ async def legend_streaks(bot: CustomClient, limit: int, embed_color: disnake.Col
 
 @register_button('legendbuckets', parser='_:')
 async def legend_buckets(bot: CustomClient, embed_color: disnake.Color):
-    pipeline = [
-        {
-            '$bucket': {
-                'groupBy': '$trophies',
-                'boundaries': [
-                    4500,
-                    4600,
-                    4700,
-                    4800,
-                    4900,
-                    5000,
-                    5100,
-                    5200,
-                    5300,
-                    5400,
-                    5500,
-                    5600,
-                    5700,
-                    5800,
-                    5900,
-                    6000,
-                    6100,
-                    6200,
-                    6300,
-                    6400,
-                    6500,
-                    8500,
-                ],
-                'default': 'out_of_bounds',
-                'output': {'count': {'$sum': 1}},
-            }
-        }
-    ]
-    results = await bot.legend_rankings.aggregate(pipeline=pipeline).to_list(length=None)
+    snapshot = await bot.legend_snapshot.get()
+    lowest_rank = snapshot['lowest_rank']
     text = '`  Troph Count    Perc`\n'
-    lowest_rank = await bot.legend_rankings.find({}).sort([('rank', -1)]).limit(1).to_list(length=1)
-    lowest_rank = lowest_rank[0].get('rank')
-    for result in results:
-        trophy = result.get('_id')
-        if trophy == 'out_of_bounds':
-            continue
+    for result in snapshot['buckets']:
+        trophy = result.get('trophies')
         if trophy == 6500:
             trophy = '6500+'
         mid_calc = (result.get('count') / lowest_rank) * 100
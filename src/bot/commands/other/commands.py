@@ -4,7 +4,6 @@ import sys
 import time
 from urllib.parse import urlencode
 
-import aiohttp
 import disnake
 from disnake import ButtonStyle, MessageInteraction
 from disnake.ext import commands
@@ -102,16 +101,15 @@ class misc(commands.Cog, name='Other'):
     async def stat(self, ctx: disnake.ApplicationCommandInteraction):
         await ctx.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get('https://api.clashk.ing/global/counts') as response:
-                    if response.status == 200:
-                        api_data = await response.json()
-                    else:
-                        api_data = None
-            except Exception as e:
-                print(f'API request failed: {e}')
-                api_data = None
+        try:
+            async with self.bot.http_client.get('https://api.clashk.ing/global/counts') as response:
+                if response.status == 200:
+                    api_data = await response.json()
+                else:
+                    api_data = None
+        except Exception as e:
+            print(f'API request failed: {e}')
+            api_data = None
 
         cluster_id = self.bot._config.cluster_id
 
@@ -293,11 +291,10 @@ class misc(commands.Cog, name='Other'):
 
         embed_color = await self.bot.ck_client.get_server_embed_color(server_id=ctx.guild.id)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                'https://fankit.supercell.com/api/assets/search/338?q={query}&limit=25&page=1&requestnewflag=true&order=RELEVANCE'.format(query=query)
-            ) as response:
-                data = await response.json()
+        async with self.bot.http_client.get(
+            'https://fankit.supercell.com/api/assets/search/338?q={query}&limit=25&page=1&requestnewflag=true&order=RELEVANCE'.format(query=query)
+        ) as response:
+            data = await response.json()
 
         data = data.get('data', [])
         if not data:
@@ -351,9 +348,8 @@ class misc(commands.Cog, name='Other'):
                     url = data[index]['generic_url'].replace('{width}', '250')
                     title = data[index]['title'][:32]
 
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url) as response:
-                            image_data = await response.read()
+                    async with self.bot.http_client.get(url) as response:
+                        image_data = await response.read()
 
                     guild = ctx.guild
                     emoji = await guild.create_custom_emoji(name=title, image=image_data)
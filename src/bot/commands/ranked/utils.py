@@ -22,7 +22,7 @@ async def best_eos(
     }
 
     if not country:
-        db_server = await bot.ck_client.get_server_settings(server_id=server_id)
+        db_server = await bot.ck_client.get_server_settings(server_id=server_id, cached=True)
         clans = await bot.get_clans(tags=[c.tag for c in db_server.clans])
 
         if not clans:
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List
+
+import disnake
+
+from background.metrics_server import observe_reminder_send
+from classes.bot import CustomClient
+from utility.concurrency import bounded_gather
+
+
+# channels (and reminders being prepared) handled at once, messages within a channel stay in order
+REMINDER_SEND_CONCURRENCY = 20
+
+
+class ReminderBatch:
+    """
+    One tick of due reminders.
+    Channel/guild/clan/link lookups are shared by every reminder in the batch (each key is fetched once,
+    concurrent callers await the same fetch), messages are queued per channel and sent by `send()`.
+    """
+
+    def __init__(self, bot: CustomClient, type: str):
+        self.bot = bot
+        self.type = type
+        self.started = time.perf_counter()
+        self._fetches: Dict[tuple, asyncio.Future] = {}
+        self._messages: Dict[int, List[tuple]] = defaultdict(list)
+
+    async def fetch(self, key: tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._fetches.get(key)
+        if future is None:
+            future = self._fetches[key] = asyncio.ensure_future(factory())
+        return await future
+
+    async def channel(self, channel_id: int):
+        return await self.fetch(('channel', channel_id), lambda: self.bot.getch_channel(channel_id))
+
+    async def guild(self, guild_id: int):
+        return await self.fetch(('guild', guild_id), lambda: self.bot.getch_guild(guild_id))
+
+    async def clan(self, clan_tag: str):
+        return await self.fetch(('clan', clan_tag), lambda: self.bot.getClan(clan_tag=clan_tag))
+
+    async def links(self, tags: List[str]) -> Dict[str, int]:
+        async def get_links():
+            return dict(await self.bot.link_client.get_links(*tags))
+
+        return await self.fetch(('links', frozenset(tags)), get_links)
+
+    async def badge(self, url: str):
+        return await self.fetch(('badge', url), lambda: self.bot.create_new_badge_emoji(url=url))
+
+    async def prepare(self, items: list, func: Callable[[Any], Awaitable[Any]]):
+        """Run `func` (which queues messages) over every item, bounded like the sends"""
+        return await bounded_gather(items, func, limit=REMINDER_SEND_CONCURRENCY)
+
+    def queue(self, channel: disnake.abc.Messageable, **kwargs):
+        self._messages[channel.id].append((channel, kwargs))
+
+    async def send(self):
+        async def send_channel(messages: List[tuple]):
+            for channel, kwargs in messages:
+                status = 'ok'
+                try:
+                    await channel.send(**kwargs)
+                except Exception:
+                    status = 'error'
+                observe_reminder_send(type=self.type, status=status, seconds=time.perf_counter() - self.started)
+
+        messages = list(self._messages.values())
+        self._messages.clear()
+        await bounded_gather(messages, send_channel, limit=REMINDER_SEND_CONCURRENCY)
@@ -1,12 +1,11 @@
-import datetime
-
 import coc
 import disnake
 import pendulum as pend
-from pytz import utc
 
 from classes.bot import CustomClient
-from classes.reminders import Reminder
+from classes.player.projection import find_player_stats
+from classes.reminders import Reminder, reminder_hours
+from commands.reminders.delivery import ReminderBatch
 
 
 async def war_reminder(
@@ -14,7 +13,12 @@ async def war_reminder(
     event: dict,
     manual_send: bool = False,
     channel: disnake.TextChannel = None,
+    batch: ReminderBatch = None,
 ):
+    """
+    Send a war's reminders, a `batch` shared by every war event due in the same tick also shares
+    channel/guild lookups & sends, the caller then sends it
+    """
     reminder_time = event.get('time')
     clan_tag = event.get('clan_tag')
     war: coc.ClanWar = coc.ClanWar(data=event.get('data'), client=None, clan_tag=clan_tag)
@@ -36,7 +40,10 @@ async def war_reminder(
     players.sort(key=lambda x: x.town_hall, reverse=True)
 
     if not manual_send:
-        all_reminders = bot.reminders.find(
+        own_batch = batch is None
+        batch = batch or ReminderBatch(bot=bot, type='war')
+        war_type = war.type.capitalize() if war.type != 'cwl' else war.type.upper()
+        all_reminders = await bot.reminders.find(
             {
                 '$and': [
                     {'clan': clan_tag},
@@ -44,25 +51,20 @@ async def war_reminder(
                     {'time': f'{reminder_time}'},
                 ]
             }
-        )
-        for reminder in await all_reminders.to_list(length=None):
-            reminder = Reminder(bot=bot, data=reminder)
-            if reminder.server_id not in bot.OUR_GUILDS:
-                continue
-
-            war_type = war.type.capitalize() if war.type != 'cwl' else war.type.upper()
-            if war_type not in reminder.war_types:
-                continue
-            try:
-                channel = await bot.getch_channel(reminder.channel_id)
+        ).to_list(length=None)
+        all_reminders = [Reminder(bot=bot, data=reminder) for reminder in all_reminders]
+        all_reminders = [reminder for reminder in all_reminders if reminder.server_id in bot.OUR_GUILDS and war_type in reminder.war_types]
 
+        async def prepare(reminder: Reminder):
+            try:
+                channel = await batch.channel(reminder.channel_id)
             except (disnake.NotFound, disnake.Forbidden):
                 await reminder.delete()
-                continue
+                return
 
-            server = await bot.getch_guild(reminder.server_id)
+            server = await batch.guild(reminder.server_id)
             if server is None:
-                continue
+                return
 
             missing_text_list = []
             missing_text = ''
@@ -104,11 +106,11 @@ async def war_reminder(
                     )
                 if last_text and reminder.custom_text:
                     text += f'\n{reminder.custom_text}'
+                batch.queue(channel, content=text)
 
-                try:
-                    await channel.send(content=text)
-                except Exception:
-                    pass
+        await batch.prepare(all_reminders, prepare)
+        if own_batch:
+            await batch.send()
     else:
         missing_text_list = []
         missing_text = ''
@@ -161,8 +163,9 @@ async def clan_capital_reminder(
     attack_threshold: int = 5,
     manual_send: bool = False,
     channel: disnake.TextChannel = None,
+    batch: ReminderBatch = None,
 ):
-
+    """Send a raid weekend reminder, queued on `batch` (sent by the caller) when one is given"""
     missing = {}
     clan_members = {member.tag: member for member in clan.members}
     for member in raid_log_entry.members:  # type: coc.RaidMember
@@ -176,18 +179,21 @@ async def clan_capital_reminder(
     if not missing:
         return None
 
-    links = await bot.link_client.get_links(*list(missing.keys()))
-    links = dict(links)
+    own_batch = batch is None
+    batch = batch or ReminderBatch(bot=bot, type='capital')
+    links = await batch.links(list(missing.keys()))
 
     players = await bot.get_players(tags=list(missing.keys()), use_cache=True)
+    players = [player for player in sorted(players, key=lambda x: (-x.town_hall, x.name)) if player.town_hall > 5]
+
+    async def get_member(discord_id: int):
+        return await server.getch_member(discord_id) if discord_id else None
+
+    discord_users = await batch.prepare([links.get(player.tag, 0) for player in players], get_member)
 
     missing_text_list = []
     missing_text = ''
-    for full_player in sorted(players, key=lambda x: (-x.town_hall, x.name)):
-        if full_player.town_hall <= 5:
-            continue
-
-        discord_id = links.get(full_player.tag, 0)
+    for full_player, discord_user in zip(players, discord_users):
         player = missing.get(full_player.tag)
         if isinstance(player, coc.ClanMember):
             num_missing = f'(0/6)'
@@ -195,7 +201,8 @@ async def clan_capital_reminder(
             num_missing = (
                 f'({(player.attack_limit + player.bonus_attack_limit) - player.attack_count}/{(player.attack_limit + player.bonus_attack_limit)})'
             )
-        discord_user = await server.getch_member(discord_id)
+        if isinstance(discord_user, Exception):
+            discord_user = None
         if len(missing_text) + len(custom_text) + 150 >= 2000:
             missing_text_list.append(missing_text)
             missing_text = ''
@@ -217,50 +224,56 @@ async def clan_capital_reminder(
             f'**{clan.name} Raid Weekend\n'
             f'{bot.emoji.clock}{time} Remaining\n'
             f'{bot.emoji.wood_swords}Min {attack_threshold} Attacks Required**\n'
-            f'{missing_text}'
+            f'{text}'
         )
         if text == missing_text_list[-1]:
             reminder_text += f'\n{custom_text}'
-        try:
-            await channel.send(content=reminder_text)
-        except Exception:
-            pass
+        batch.queue(channel, content=reminder_text)
+    if own_batch:
+        await batch.send()
 
 
 async def clan_games_reminder(bot: CustomClient, reminder_time):
-    for reminder in await bot.reminders.find({'$and': [{'type': 'Clan Games'}, {'time': reminder_time}]}).to_list(length=None):
-        reminder = Reminder(bot=bot, data=reminder)
-        if reminder.server_id not in bot.OUR_GUILDS:
-            continue
+    batch = ReminderBatch(bot=bot, type='clan_games')
+    games_season = bot.gen_games_season()
+    reminders = await bot.reminders.find({'$and': [{'type': 'Clan Games'}, {'time': reminder_time}]}).to_list(length=None)
+    reminders = [Reminder(bot=bot, data=reminder) for reminder in reminders]
+    reminders = [reminder for reminder in reminders if reminder.server_id in bot.OUR_GUILDS]
 
+    async def clan_points(clan: coc.Clan) -> dict:
+        stats = await find_player_stats(bot=bot, tags=[member.tag for member in clan.members], fields=['clan_games'], season=games_season)
+        return {stat.get('tag'): stat.get('clan_games', {}).get(f'{games_season}', {}).get('points', 0) for stat in stats}
+
+    async def prepare(reminder: Reminder):
         try:
-            channel = await bot.getch_channel(reminder.channel_id)
+            channel = await batch.channel(reminder.channel_id)
         except (disnake.NotFound, disnake.Forbidden):
             await reminder.delete()
-            continue
+            return
 
-        server = await bot.getch_guild(reminder.server_id)
+        server = await batch.guild(reminder.server_id)
         if server is None:
-            continue
+            return
 
-        clan = await bot.getClan(clan_tag=reminder.clan_tag)
+        clan = await batch.clan(reminder.clan_tag)
         if clan is None:
-            continue
+            return
 
+        # several reminders (thresholds, channels, servers) usually point at the same clan
+        points = await batch.fetch(('clan_games_points', clan.tag), lambda: clan_points(clan))
         missing = {}
         member_points = {}
-        for stat in await bot.player_stats.find({f'tag': {'$in': [member.tag for member in clan.members]}}).to_list(length=None):
-            points = stat.get('clan_games', {}).get(f'{bot.gen_games_season()}', {}).get('points', 0)
-            if points < reminder.point_threshold:
-                missing[stat.get('tag')] = coc.utils.get(clan.members, tag=stat.get('tag'))
-                member_points[stat.get('tag')] = points
+        for tag, player_points in points.items():
+            if player_points < reminder.point_threshold:
+                missing[tag] = coc.utils.get(clan.members, tag=tag)
+                member_points[tag] = player_points
 
         if not missing:
-            continue
-        links = await bot.link_client.get_links(*list(missing.keys()))
+            return
+        links = await batch.links(list(missing.keys()))
 
         missing_text = ''
-        for player_tag, discord_id in links:
+        for player_tag, discord_id in links.items():
             player = missing.get(player_tag)
             member = disnake.utils.get(server.members, id=discord_id)
             if member is None:
@@ -268,169 +281,137 @@ async def clan_games_reminder(bot: CustomClient, reminder_time):
             else:
                 missing_text += f'({member_points.get(player_tag)}/4000) {player.name} | {member.mention}\n'
         time = str(reminder_time).replace('hr', '')
-        badge = await bot.create_new_badge_emoji(url=clan.badge.url)
+        badge = await batch.badge(clan.badge.url)
         reminder_text = (
             f'**{badge}{clan.name} (Clan Games)\n{time} Hours Left, Min {reminder.point_threshold} Points**\n'
             f'{missing_text}'
             f'\n{reminder.custom_text}'
         )
+        batch.queue(channel, content=reminder_text)
+
+    await batch.prepare(reminders, prepare)
+    await batch.send()
+
+
+async def inactivity_reminder(bot: CustomClient, reminder: Reminder, window_start: int, window_end: int, batch: ReminderBatch = None):
+    """
+    Ping the members whose inactivity crossed the reminder's threshold within `(window_start, window_end]`
+    queued on `batch` (sent by the caller) when one is given
+    """
+    own_batch = batch is None
+    batch = batch or ReminderBatch(bot=bot, type='inactivity')
+    try:
+        channel = await batch.channel(reminder.channel_id)
+    except (disnake.NotFound, disnake.Forbidden):
+        await reminder.delete()
+        return
+    server = await batch.guild(reminder.server_id)
+    if server is None:
+        return
 
-        try:
-            await channel.send(content=reminder_text)
-        except:
-            pass
-
-
-async def inactivity_reminder(bot: CustomClient):
-    for reminder in await bot.reminders.find({'type': 'inactivity'}).to_list(length=None):
-        reminder = Reminder(bot=bot, data=reminder)
-        if reminder.server_id not in bot.OUR_GUILDS:
-            continue
+    clan = await batch.clan(reminder.clan_tag)
+    if clan is None:
+        return
 
-        try:
-            channel = await bot.getch_channel(reminder.channel_id)
-        except (disnake.NotFound, disnake.Forbidden):
-            await reminder.delete()
-            continue
-        server = await bot.getch_guild(reminder.server_id)
-        if server is None:
-            continue
+    seconds_inactive = int(reminder_hours(reminder.time) * 60 * 60)
+    clan_members = [member.tag for member in clan.members]
+    clan_members_stats = await find_player_stats(
+        bot=bot,
+        tags=clan_members,
+        fields=[],
+        filter={'last_online': {'$gt': window_start - seconds_inactive, '$lte': window_end - seconds_inactive}},
+    )
+    inactive_tags = []
+    names = {}
+    for stat in clan_members_stats:
+        inactive_tags.append(stat.get('tag'))
+        names[stat.get('tag')] = stat.get('name') or coc.utils.get(clan.members, tag=stat.get('tag')).name
 
-        clan = await bot.getClan(clan_tag=reminder.clan_tag)
-        if clan is None:
-            continue
+    if not inactive_tags:
+        return
+    links = await batch.links(inactive_tags)
+    inactive_text = ''
+    for player_tag, discord_id in links.items():
+        name = names.get(player_tag)
+        member = await server.getch_member(discord_id)
+        if member is None:
+            inactive_text += f'{name} | {player_tag}\n'
+        else:
+            inactive_text += f'{name} | {member.mention}\n'
+    time = str(reminder.time).replace('hr', '')
+    badge = await batch.badge(clan.badge.url)
+    reminder_text = f'**{badge}{clan.name}\nPlayers Inactive for {time}Hours**\n' f'{inactive_text}' f'\n{reminder.custom_text}'
+    batch.queue(channel, content=reminder_text)
+    if own_batch:
+        await batch.send()
+
+
+async def roster_reminder(bot: CustomClient, reminder: Reminder, batch: ReminderBatch = None):
+    """
+    Ping a roster ahead of its time, `reminder` needs its roster document joined in (see `ReminderScheduler`)
+    queued on `batch` (sent by the caller) when one is given
+    """
+    if not reminder.roster.is_valid or reminder.time is None or len(reminder.roster.players) == 0:
+        return
 
-        seconds_inactive = int(str(reminder.time).replace('hr', '')) * 60 * 60
-        max_diff = 30 * 60  # time in seconds between runs
-        now = datetime.datetime.now(tz=utc)
-        clan_members = [member.tag for member in clan.members]
-        clan_members_stats = await bot.player_stats.find({f'tag': {'$in': clan_members}}).to_list(length=None)
-        inactive_tags = []
-        names = {}
-        for stat in clan_members_stats:
-            last_online = stat.get('last_online')
-            if last_online is None:
-                continue
-            lo_time = datetime.datetime.fromtimestamp(float(last_online), tz=utc)
-            passed_time = (now - lo_time).total_seconds()
-            if passed_time - seconds_inactive >= 0 and passed_time - seconds_inactive <= max_diff:
-                inactive_tags.append(stat.get('tag'))
-                try:
-                    names[stat.get('tag')] = stat.get('name')
-                except:
-                    names[stat.get('tag')] = coc.utils.get(clan.members, tag=stat.get('tag')).name
-
-        if not inactive_tags:
-            continue
-        links = await bot.link_client.get_links(*inactive_tags)
-        inactive_text = ''
-        for player_tag, discord_id in links:
-            name = names.get(player_tag)
-            member = await server.getch_member(discord_id)
-            if member is None:
-                inactive_text += f'{name} | {player_tag}\n'
-            else:
-                inactive_text += f'{name} | {member.mention}\n'
-        time = str(reminder.time).replace('hr', '')
-        badge = await bot.create_new_badge_emoji(url=clan.badge.url)
-        reminder_text = f'**{badge}{clan.name}\nPlayers Inactive for {time}Hours**\n' f'{inactive_text}' f'\n{reminder.custom_text}'
-        try:
-            await channel.send(content=reminder_text)
-        except:
-            pass
-
-
-async def roster_reminder(bot: CustomClient):
-    pipeline = [
-        {'$match': {'type': 'roster'}},
-        {
-            '$lookup': {
-                'from': 'rosters',
-                'localField': 'roster',
-                'foreignField': '_id',
-                'as': 'roster',
-            }
-        },
-        {'$set': {'roster': {'$first': '$roster'}}},
-    ]
-    for reminder in await bot.reminders.aggregate(pipeline=pipeline).to_list(length=None):
-        reminder = Reminder(bot=bot, data=reminder)
-        if reminder.server_id not in bot.OUR_GUILDS:
-            continue
-        if not reminder.roster.is_valid or reminder.time is None or len(reminder.roster.players) == 0:
-            continue
+    own_batch = batch is None
+    batch = batch or ReminderBatch(bot=bot, type='roster')
+    try:
+        channel = await batch.channel(reminder.channel_id)
+    except (disnake.NotFound, disnake.Forbidden):
+        await reminder.delete()
+        return
 
-        try:
-            channel = await bot.getch_channel(reminder.channel_id)
-        except (disnake.NotFound, disnake.Forbidden):
-            await reminder.delete()
-            continue
+    server = await batch.guild(reminder.server_id)
+    if server is None:
+        return
 
-        server = await bot.getch_guild(reminder.server_id)
-        if server is None:
-            continue
+    members = []
+    if reminder.ping_type == 'All Roster Members':
+        members = reminder.roster.players
+    elif reminder.ping_type == 'Not in Clan':
+        members = await reminder.roster.missing_list(reverse=False)
+    elif reminder.ping_type == 'Subs Only':
+        members = [p for p in reminder.roster.players if p.get('sub', False)]
 
-        time = reminder.time.replace('hr', '')
-        seconds_before_to_ping = int(float(time) * 3600)
-
-        max_diff = 2 * 60  # time in seconds between runs
-        now = datetime.datetime.now(tz=utc)
-        roster_time = datetime.datetime.fromtimestamp(float(reminder.roster.time), tz=utc)
-        time_until_time = (roster_time - now).total_seconds()
-        # goes negative if now >= time
-        # gets smaller as we get closer
-
-        # we want to ping when we are closer to the time than further, so when seconds_before
-        # larger - smaller >= 0
-        # smaller - larger <= 0
-        if seconds_before_to_ping - time_until_time >= 0 and seconds_before_to_ping - time_until_time <= max_diff:
-            members = []
-            if reminder.ping_type == 'All Roster Members':
-                members = reminder.roster.players
-            elif reminder.ping_type == 'Not in Clan':
-                members = await reminder.roster.missing_list(reverse=False)
-            elif reminder.ping_type == 'Subs Only':
-                members = [p for p in reminder.roster.players if p.get('sub', False)]
-
-            if not members:
-                continue
-            links = await bot.link_client.get_links(*[p.get('tag') for p in members])
-            missing_text_list = []
+    if not members:
+        return
+    links = await batch.links([p.get('tag') for p in members])
+    missing_text_list = []
+    text = ''
+    for player_tag, discord_id in links.items():
+        name = next(
+            (player for player in members if player.get('tag') == player_tag),
+            {},
+        )
+        name = name.get('name')
+        member = await server.getch_member(discord_id)
+        if len(text) + len(reminder.custom_text) + 150 >= 2000:
+            missing_text_list.append(text)
             text = ''
-            for player_tag, discord_id in links:
-                name = next(
-                    (player for player in members if player.get('tag') == player_tag),
-                    {},
-                )
-                name = name.get('name')
-                member = await server.getch_member(discord_id)
-                if len(text) + len(reminder.custom_text) + 150 >= 2000:
-                    missing_text_list.append(text)
-                    text = ''
-                if member is None:
-                    text += f'{name} | {player_tag}\n'
-                else:
-                    text += f'{name} | {member.mention}\n'
+        if member is None:
+            text += f'{name} | {player_tag}\n'
+        else:
+            text += f'{name} | {member.mention}\n'
 
-            if text != '':
-                missing_text_list.append(text)
-            badge = await bot.create_new_badge_emoji(url=reminder.roster.clan_badge)
-            for text in missing_text_list:
-                reminder_text = (
-                    f'**{badge}{reminder.roster.clan_name} | {reminder.roster.alias} | {bot.timestamper(reminder.roster.time).relative}**\n\n'
-                    f'{text}'
-                )
-                buttons = []
-                if text == missing_text_list[-1]:
-                    reminder_text += f'\n{reminder.custom_text}'
-                    button = disnake.ui.Button(
-                        label='Clan Link',
-                        emoji='🔗',
-                        style=disnake.ButtonStyle.url,
-                        url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{reminder.roster.roster_result.get('clan_tag').strip('#')}",
-                    )
-                    buttons = [disnake.ui.ActionRow(button)]
-                try:
-                    await channel.send(content=reminder_text, components=buttons)
-                except:
-                    pass
+    if text != '':
+        missing_text_list.append(text)
+    badge = await batch.badge(reminder.roster.clan_badge)
+    for text in missing_text_list:
+        reminder_text = (
+            f'**{badge}{reminder.roster.clan_name} | {reminder.roster.alias} | {bot.timestamper(reminder.roster.time).relative}**\n\n'
+            f'{text}'
+        )
+        buttons = []
+        if text == missing_text_list[-1]:
+            reminder_text += f'\n{reminder.custom_text}'
+            button = disnake.ui.Button(
+                label='Clan Link',
+                emoji='🔗',
+                style=disnake.ButtonStyle.url,
+                url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{reminder.roster.roster_result.get('clan_tag').strip('#')}",
+            )
+            buttons = [disnake.ui.ActionRow(button)]
+        batch.queue(channel, content=reminder_text, components=buttons)
+    if own_batch:
+        await batch.send()
@@ -6,7 +6,7 @@ import disnake
 from pytz import utc
 
 from classes.bot import CustomClient
-from classes.reminders import Reminder
+from classes.reminders import Reminder, schedule_fields, wake_reminder_scheduler
 from classes.roster import Roster
 from exceptions.CustomExceptions import ExpiredComponents, ThingNotFound
 from utility.components import clan_component
@@ -800,8 +800,10 @@ async def create_inactivity_reminder(
                     'roles': roles_chosen,
                     'townhall_filter': ths,
                     'custom_text': custom_text,
+                    **schedule_fields(type='inactivity', time=time),
                 }
             )
+    wake_reminder_scheduler()
 
 
 async def create_roster_reminder(
@@ -889,8 +891,10 @@ async def create_roster_reminder(
                     'ping_type': ping_type,
                     'time': time,
                     'custom_text': custom_text,
+                    **schedule_fields(type='roster', time=time, roster_time=roster.time),
                 }
             )
+    wake_reminder_scheduler()
 
 
 async def get_custom_text(bot: CustomClient, res: disnake.MessageInteraction):
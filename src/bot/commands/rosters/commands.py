@@ -408,11 +408,13 @@ class RosterCommands(commands.Cog, name='Rosters'):
                 text += f'**{add}** cannot be added as a player group, must be under 50 characters\n'
             elif add not in groups:
                 await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$push': {'player_groups': add}})
+                await self.bot.settings_cache.invalidate(ctx.guild.id)
                 text += f'**{add}** added as a player group.\n'
 
         if remove is not None:
             if remove in groups:
                 await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$pull': {'player_groups': remove}})
+                await self.bot.settings_cache.invalidate(ctx.guild.id)
                 text += f'**{remove}** removed as a player group.'
             else:
                 text += f'**{remove}** not an existing player group.'
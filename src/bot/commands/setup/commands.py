@@ -94,6 +94,7 @@ class SetupCommands(commands.Cog, name='Setup'):
                 {'server': ctx.guild.id},
                 {'$set': {'reddit_accounts': reddit_accounts}},
             )
+            await self.bot.settings_cache.invalidate(ctx.guild.id)
             changed_text += f'- **Followed Reddit Accounts:** `{followed_reddit_accounts}`\n'
 
         if changed_text == '':
@@ -457,6 +458,7 @@ class SetupCommands(commands.Cog, name='Setup'):
             return await msg.edit(components=[])
         await res.response.defer()
         await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$set': {'category_order': res.values}})
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
         new_order = ', '.join(res.values)
         embed = disnake.Embed(
             description=f'New Category Order: `{new_order}`',
@@ -630,6 +632,7 @@ class SetupCommands(commands.Cog, name='Setup'):
                 {'server': ctx.guild.id},
                 {'$set': {'reddit_feed': channel.id, 'reddit_role': role_id}},
             )
+            await self.bot.settings_cache.invalidate(ctx.guild.id)
 
             embed = disnake.Embed(
                 description=f'**Reddit Recruit feed set to {channel.mention}**',
@@ -641,6 +644,7 @@ class SetupCommands(commands.Cog, name='Setup'):
                 {'server': ctx.guild.id},
                 {'$set': {'reddit_feed': None, 'reddit_role': None}},
             )
+            await self.bot.settings_cache.invalidate(ctx.guild.id)
 
             embed = disnake.Embed(
                 description='**Reddit Recruit feed removed**',
@@ -781,6 +785,7 @@ class SetupCommands(commands.Cog, name='Setup'):
 
             else:
                 await self.bot.server_db.update_one({'server': ctx.guild.id}, {'$set': {'eosCountdown': channel.id}})
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
 
         embed = disnake.Embed(
             description=f"`{', '.join(res.values)}` Stat Bars Created",
@@ -981,6 +986,9 @@ class SetupCommands(commands.Cog, name='Setup'):
                 'clanChannel': None if clan_channel is None else clan_channel.id,
             }
         )
+        await self.bot.button_cache.invalidate(guilds=[ctx.guild.id])
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
+        self.bot.name_index.update_clan({'server': ctx.guild.id, 'tag': clan.tag, 'name': clan.name})
 
         embed = disnake.Embed(
             title=f'{clan.name} successfully added.',
@@ -1066,6 +1074,9 @@ class SetupCommands(commands.Cog, name='Setup'):
                 return await res.response.edit_message(embed=embed, components=[])
 
         await self.bot.clan_db.find_one_and_delete({'$and': [{'tag': clan.tag}, {'server': ctx.guild.id}]})
+        await self.bot.button_cache.invalidate(guilds=[ctx.guild.id])
+        await self.bot.settings_cache.invalidate(ctx.guild.id)
+        self.bot.name_index.remove_clan(server=ctx.guild.id, tag=clan.tag)
 
         await self.bot.reminders.delete_many({'$and': [{'clan': clan.tag}, {'server': ctx.guild.id}]})
         embed = disnake.Embed(
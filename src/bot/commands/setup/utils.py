@@ -43,6 +43,9 @@ async def add_clan(bot: CustomClient, clan: coc.Clan, ctx: ApplicationCommandInt
                 'clanChannel': None,
             }
         )
+        await bot.button_cache.invalidate(guilds=[ctx.guild.id])
+        await bot.settings_cache.invalidate(ctx.guild.id)
+        bot.name_index.update_clan({'server': ctx.guild.id, 'tag': clan.tag, 'name': clan.name})
         embed = disnake.Embed(
             title=f'{clan.name} successfully added.',
             description=f'Run `/setup clan` again to edit settings for this clan.',
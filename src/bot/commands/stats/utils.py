@@ -1,4 +1,4 @@
-from collections import defaultdict, namedtuple
+from collections import namedtuple
 from typing import List
 
 import coc
@@ -8,6 +8,7 @@ import pendulum as pend
 from classes.bot import CustomClient
 from exceptions.CustomExceptions import MessageException
 from utility.clash.other import gen_season_start_end_as_iso
+from utility.clash.war_attacks import STAR_FIELDS, WAR_KEY_PROJECTION
 from utility.general import get_guild_icon
 
 
@@ -29,7 +30,9 @@ async def get_wars(
     season: str | None,
     num_wars: int | None,
     num_days: int | None,
+    projection: dict | None = None,
 ):
+    projection = projection or {'data': 1, '_id': 0}
     clan_wars = []
     if num_wars is None and num_days is None:
         season = season or bot.gen_season_date()
@@ -47,7 +50,7 @@ async def get_wars(
                     {'data.preparationStartTime': {'$lte': SEASON_END}},
                 ]
             },
-            projection={'data': 1, '_id': 0},
+            projection=projection,
         ).to_list(length=None)
     elif num_wars is not None:
         clan_wars = (
@@ -62,7 +65,7 @@ async def get_wars(
                         }
                     ]
                 },
-                projection={'data': 1, '_id': 0},
+                projection=projection,
             )
             .sort('data.preparationStartTime', -1)
             .limit(num_wars)
@@ -83,7 +86,7 @@ async def get_wars(
                     {'data.preparationStartTime': {'$gte': days_ago.strftime('%Y%m%dT%H%M%S.000Z')}},
                 ]
             },
-            projection={'data': 1, '_id': 0},
+            projection=projection,
         ).to_list(length=None)
     return clan_wars
 
@@ -123,49 +126,21 @@ async def war_hitrate(
         season=season,
         num_wars=num_wars,
         num_days=num_days,
+        projection=WAR_KEY_PROJECTION,
     )
-    hit_rate_dict = defaultdict(lambda: defaultdict(int))
-    tag_to_name_map = {}
-    tag_to_th_map = {}
-    for war in clan_wars:
-        main_clan = war.get('data').get('clan').get('tag')
-        if war.get('data').get('opponent').get('tag') in clan_tags:
-            main_clan = war.get('data').get('opponent').get('tag')
-        coc_war = coc.ClanWar(data=war.get('data'), client=None, clan_tag=main_clan)
-        if coc_war.type.lower() not in war_types:
-            continue
-        for attack in coc_war.clan.attacks:
-            tag_to_name_map[attack.attacker_tag] = attack.attacker.name
-            tag_to_th_map[attack.attacker_tag] = attack.attacker.town_hall
-            if th_filter == 'all':
-                hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                hit_rate_dict[attack.attacker_tag]['total'] += 1
-            elif th_filter == 'equalthonly':
-                if attack.attacker.town_hall == attack.defender.town_hall:
-                    hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                    hit_rate_dict[attack.attacker_tag]['total'] += 1
-            elif 'v' in th_filter:
-                th, def_th = th_filter.split('v')
-                if attack.attacker.town_hall == int(th) and attack.defender.town_hall == int(def_th):
-                    hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                    hit_rate_dict[attack.attacker_tag]['total'] += 1
-            else:
-                if attack.attacker.town_hall == int(th_filter):
-                    hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                    hit_rate_dict[attack.attacker_tag]['total'] += 1
+    war_ids = await bot.ck_client.sync_war_attacks(wars=clan_wars)
+    attackers = await bot.ck_client.get_war_attack_stats(war_ids=war_ids, clan_tags=clan_tags, war_types=war_types, th_filter=th_filter)
 
     holder_list = []
     holder = namedtuple('holder', ['name', 'tag', 'townhall', 'hitrate', 'attacks', 'total'])
-    for tag, data in hit_rate_dict.items():
-        total_attacks = data.get('total', 0)
-        if total_attacks == 0:
-            continue
-        hr_attack_total = sum([data.get(star, 0) for star in star_filter])
+    for attacker in attackers:
+        total_attacks = attacker['num_hits']
+        hr_attack_total = sum([attacker.get(STAR_FIELDS[star], 0) for star in star_filter if star in STAR_FIELDS])
         holder_list.append(
             holder(
-                name=tag_to_name_map.get(tag),
-                tag=tag,
-                townhall=tag_to_th_map.get(tag),
+                name=attacker['name'],
+                tag=attacker['_id'],
+                townhall=attacker['townhall'],
                 hitrate=round((hr_attack_total / total_attacks) * 100),
                 attacks=hr_attack_total,
                 total=total_attacks,
@@ -206,75 +181,27 @@ async def war_hitcount(
     embed_color: disnake.Color,
 ):
     season = season or bot.gen_season_date()
+    war_types = war_type_convert(war_types)
 
-    if war_types == 'all':
-        war_types = ['random', 'friendly', 'cwl']
-    elif war_types == 'war&cwl':
-        war_types = ['random', 'cwl']
-    else:
-        if war_types == 'war':
-            war_types = 'random'
-        war_types = [war_types]
-    SEASON_START, SEASON_END = gen_season_start_end_as_iso(season=season)
-    clan_wars = await bot.clan_wars.find(
-        {
-            '$and': [
-                {
-                    '$or': [
-                        {'data.clan.tag': {'$in': clan_tags}},
-                        {'data.opponent.tag': {'$in': clan_tags}},
-                    ]
-                },
-                {'data.preparationStartTime': {'$gte': SEASON_START}},
-                {'data.preparationStartTime': {'$lte': SEASON_END}},
-            ]
-        },
-        projection={'data': 1, '_id': 0},
-    ).to_list(length=None)
-    hit_rate_dict = defaultdict(lambda: defaultdict(int))
-    tag_to_name_map = {}
-    tag_to_th_map = {}
-    for war in clan_wars:
-        main_clan = war.get('data').get('clan').get('tag')
-        if war.get('data').get('opponent').get('tag') in clan_tags:
-            main_clan = war.get('data').get('opponent').get('tag')
-        coc_war = coc.ClanWar(data=war.get('data'), client=None, clan_tag=main_clan)
-        if coc_war.type.lower() not in war_types:
-            continue
-        for attack in coc_war.clan.attacks:
-            tag_to_name_map[attack.attacker_tag] = attack.attacker.name
-            tag_to_th_map[attack.attacker_tag] = attack.attacker.town_hall
-            if th_filter == 'all':
-                hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                hit_rate_dict[attack.attacker_tag]['total'] += 1
-            elif th_filter == 'equalthonly':
-                if attack.attacker.town_hall == attack.defender.town_hall:
-                    hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                    hit_rate_dict[attack.attacker_tag]['total'] += 1
-            else:
-                th, def_th = th_filter.split('v')
-                if attack.attacker.town_hall == int(th) and attack.defender.town_hall == int(def_th):
-                    hit_rate_dict[attack.attacker_tag][attack.stars] += 1
-                    hit_rate_dict[attack.attacker_tag]['total'] += 1
+    clan_wars = await get_wars(bot=bot, clan_tags=clan_tags, season=season, num_wars=None, num_days=None, projection=WAR_KEY_PROJECTION)
+    war_ids = await bot.ck_client.sync_war_attacks(wars=clan_wars)
+    attackers = await bot.ck_client.get_war_attack_stats(war_ids=war_ids, clan_tags=clan_tags, war_types=war_types, th_filter=th_filter)
 
     holder_list = []
     holder = namedtuple(
         'holder',
         ['name', 'tag', 'townhall', 'hitrate_0', 'hitrate_1', 'hitrate_2', 'hitrate_3'],
     )
-    for tag, data in hit_rate_dict.items():
-        total_attacks = data.get('total', 0)
-        if total_attacks == 0:
-            continue
+    for attacker in attackers:
         holder_list.append(
             holder(
-                name=tag_to_name_map.get(tag),
-                tag=tag,
-                townhall=tag_to_th_map.get(tag),
-                hitrate_0=data.get(0, 0),
-                hitrate_1=data.get(1, 0),
-                hitrate_2=data.get(2, 0),
-                hitrate_3=data.get(3, 0),
+                name=attacker['name'],
+                tag=attacker['_id'],
+                townhall=attacker['townhall'],
+                hitrate_0=attacker[STAR_FIELDS[0]],
+                hitrate_1=attacker[STAR_FIELDS[1]],
+                hitrate_2=attacker[STAR_FIELDS[2]],
+                hitrate_3=attacker[STAR_FIELDS[3]],
             )
         )
     holder_list.sort(key=lambda x: (x.hitrate_3, x.hitrate_2, x.hitrate_1), reverse=True)
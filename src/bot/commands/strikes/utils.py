@@ -99,7 +99,7 @@ async def add_strike(
 
 
 async def send_strike_log(bot: CustomClient, guild: disnake.Guild, reason: disnake.Embed):
-    server_db = await bot.ck_client.get_server_settings(server_id=guild.id)
+    server_db = await bot.ck_client.get_server_settings(server_id=guild.id, cached=True)
     if server_db.strike_log_channel is not None:
         strike_log_channel = await bot.getch_channel(channel_id=server_db.strike_log_channel)
         if strike_log_channel is not None:
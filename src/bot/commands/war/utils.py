@@ -1,3 +1,4 @@
+import asyncio
 import operator
 import re
 from collections import defaultdict
@@ -561,11 +562,10 @@ async def get_cwl_wars(bot: CustomClient, clan: coc.Clan, season: str, group=Non
 	clan_tag = clan.tag
 	try:
 		if group is None:
-			group = await bot.coc_client.get_league_group(clan.tag)
+			group = await bot.cwl_cache.get_group(clan.tag, season=season)
 		if group.season != season:
 			raise Exception
-		async for w in group.get_wars_for_clan(clan.tag):
-			clan_league_wars.append(w)
+		clan_league_wars = await cwl_clan_wars(bot=bot, group=group, clan_tag=clan.tag)
 		if clan_league_wars:
 			return (group, clan_league_wars, None, clan.war_league)
 	except Exception:
@@ -584,9 +584,7 @@ async def get_cwl_wars(bot: CustomClient, clan: coc.Clan, season: str, group=Non
 			clan_league_wars = await bot.clan_wars.find({"$and": [{"data.tag": {"$in": war_tags}}, {"data.season": season}]}).to_list(length=None)
 			clan_league_wars = wars_from_group(bot=bot, data=clan_league_wars, clan_tag=clan.tag, group=group)
 			if not clan_league_wars:
-				clan_league_wars = []
-				async for war in bot.coc_client.get_league_wars(war_tags=war_tags, clan_tag=clan_tag):
-					clan_league_wars.append(war)
+				clan_league_wars = await cwl_clan_wars(bot=bot, group=group, clan_tag=clan_tag)
 
 			basic_clan: dict = await bot.basic_clan.find_one({"tag": clan_tag}, projection={"changes.clanWarLeague": 1})
 
@@ -733,14 +731,18 @@ async def ranking_lb(bot: CustomClient, group: coc.ClanWarLeagueGroup, fetched_c
 		clan_league_wars = await bot.clan_wars.find({"$and": [{"data.tag": {"$in": war_tags}}, {"data.season": group.season}]}).to_list(length=None)
 		league_wars = wars_from_group(bot=bot, data=clan_league_wars, group=group)
 
+	if not league_wars:
+		wars = await bot.cwl_cache.get_group_wars(group)
+	else:
+		wars = {war.war_tag: war for war in league_wars}
+
 	war_stars = []
 	avg_to_win = []
 	for round in group.rounds:
 		for war_tag in round:
-			if not league_wars:
-				war = await bot.coc_client.get_league_war(war_tag)
-			else:
-				war = get_league_war_by_tag(league_wars=league_wars, war_tag=war_tag)
+			war = wars.get(war_tag)
+			if war is None:
+				continue
 			if str(war.status) == "won":
 				star_dict[war.clan.tag] += 10
 			elif str(war.status) == "lost":
@@ -1065,10 +1067,21 @@ def wars_from_group(bot: CustomClient, group: coc.ClanWarLeagueGroup, data: list
 	return list_wars
 
 
-def get_league_war_by_tag(league_wars: List[coc.ClanWar], war_tag: str):
-	for war in league_wars:
-		if war.war_tag == war_tag:
-			return war
+async def cwl_clan_wars(bot: CustomClient, group: coc.ClanWarLeagueGroup, clan_tag: str):
+	"""The clan's league wars in round order, from the shared cwl cache & with the clan as `war.clan`"""
+	wars = await bot.cwl_cache.get_group_wars(group)
+	clan_wars = []
+	for round in group.rounds:
+		for war_tag in round:
+			war = wars.get(war_tag)
+			if war is not None and clan_tag in (war.clan.tag, war.opponent.tag):
+				clan_wars.append(coc.ClanWar(
+				    data=war._raw_data,
+				    clan_tag=clan_tag,
+				    client=bot.coc_client,
+				    league_group=group,
+				))
+	return clan_wars
 
 
 async def create_cwl_status(bot: CustomClient, guild: disnake.Guild):
@@ -1079,31 +1092,32 @@ async def create_cwl_status(bot: CustomClient, guild: disnake.Guild):
 		embed = disnake.Embed(description="No clans linked to this server.", color=disnake.Color.red())
 		return embed
 
-	clans = await bot.get_clans(tags=clan_tags)
+	clans = [clan for clan in await bot.get_clans(tags=clan_tags) if clan is not None]
 
-	spin_list = []
-	for clan in clans:
-		if clan is None:
-			continue
-		c = [clan.name, clan.war_league.name, clan.tag]
+	async def league_state(clan: coc.Clan):
 		try:
-			league = await bot.coc_client.get_league_group(clan.tag)
-			state = league.state
-			if str(state) == "preparation":
-				c.append(bot.emoji.green_check.emoji_string)
-				c.append(1)
-			elif str(state) == "ended":
-				c.append(bot.emoji.square_x_deny.emoji_string)
-				c.append(3)
-			elif str(state) == "inWar":
-				c.append(bot.emoji.wood_swords.emoji_string)
-				c.append(0)
-			elif str(state) == "notInWar":
-				c.append(bot.emoji.animated_clash_swords.emoji_string)
-				c.append(2)
+			league = await bot.cwl_cache.get_group(clan.tag, season=season)
 		except coc.NotFound:
+			return None
+		return str(league.state)
+
+	states = await asyncio.gather(*[league_state(clan) for clan in clans])
+
+	spin_list = []
+	for clan, state in zip(clans, states):
+		c = [clan.name, clan.war_league.name, clan.tag]
+		if state == "preparation":
+			c.append(bot.emoji.green_check.emoji_string)
+			c.append(1)
+		elif state == "ended" or state is None:
 			c.append(bot.emoji.square_x_deny.emoji_string)
 			c.append(3)
+		elif state == "inWar":
+			c.append(bot.emoji.wood_swords.emoji_string)
+			c.append(0)
+		elif state == "notInWar":
+			c.append(bot.emoji.animated_clash_swords.emoji_string)
+			c.append(2)
 		spin_list.append(c)
 
 	clans_list = sorted(spin_list, key=lambda x: (x[1], x[4]), reverse=False)
@@ -1130,7 +1144,7 @@ async def create_cwl_status(bot: CustomClient, guild: disnake.Guild):
 
 async def cwl_ranking_create(bot: CustomClient, clan: coc.Clan):
 	try:
-		group = await bot.coc_client.get_league_group(clan.tag)
+		group = await bot.cwl_cache.get_group(clan.tag, season=bot.gen_season_date())
 		state = group.state
 		if str(state) == "preparation" and len(group.rounds) == 1:
 			return {clan.tag: None}
@@ -1143,21 +1157,19 @@ async def cwl_ranking_create(bot: CustomClient, clan: coc.Clan):
 	dest_dict = defaultdict(int)
 	tag_to_name = defaultdict(str)
 
-	rounds = group.rounds
-	for round in rounds:
-		for war_tag in round:
-			war = await bot.coc_client.get_league_war(war_tag)
-			if str(war.status) == "won":
-				star_dict[war.clan.tag] += 10
-			elif str(war.status) == "lost":
-				star_dict[war.opponent.tag] += 10
-			tag_to_name[war.clan.tag] = war.clan.name
-			tag_to_name[war.opponent.tag] = war.opponent.name
-			for player in war.members:
-				attacks = player.attacks
-				for attack in attacks:
-					star_dict[player.clan.tag] += attack.stars
-					dest_dict[player.clan.tag] += attack.destruction
+	wars = await bot.cwl_cache.get_group_wars(group)
+	for war in wars.values():
+		if str(war.status) == "won":
+			star_dict[war.clan.tag] += 10
+		elif str(war.status) == "lost":
+			star_dict[war.opponent.tag] += 10
+		tag_to_name[war.clan.tag] = war.clan.name
+		tag_to_name[war.opponent.tag] = war.opponent.name
+		for player in war.members:
+			attacks = player.attacks
+			for attack in attacks:
+				star_dict[player.clan.tag] += attack.stars
+				dest_dict[player.clan.tag] += attack.destruction
 
 	star_list = []
 	for tag, stars in star_dict.items():
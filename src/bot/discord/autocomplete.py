@@ -15,10 +15,19 @@ from commands.reminders.utils import gen_capital_times, gen_clan_games_times, ge
 from utility.clash.capital import gen_raid_weekend_datestrings
 from utility.constants import TH_FILTER_OPTIONS, TOWNHALL_LEVELS
 from utility.general import create_superscript
+from utility.autocomplete_cache import AutocompleteCache
+from utility.name_index import matches
 from utility.search import all_names, family_names, search_name_with_tag
 
 
-USER_ACCOUNT_CACHE = ExpiringDict()
+AUTOCOMPLETE_CACHE = AutocompleteCache(ttl=60, max_entries=10_000)
+
+# guild used for autocomplete in DMs (the user's last command in a server)
+DM_GUILD_CACHE = ExpiringDict()
+
+
+def clan_choice_matches(choice: str, query: str) -> bool:
+    return matches(choice.rsplit(' | ', 1)[0], query)
 
 
 class Autocomplete(commands.Cog, name='Autocomplete'):
@@ -30,28 +39,36 @@ class Autocomplete(commands.Cog, name='Autocomplete'):
         return [season for season in seasons if query.lower() in season.lower()]
 
     async def category(self, ctx: disnake.ApplicationCommandInteraction, query: str):
-        tracked = self.bot.clan_db.find({'server': ctx.guild.id})
-        limit = await self.bot.clan_db.count_documents(filter={'server': ctx.guild.id})
-        categories = []
-        for tClan in await tracked.to_list(length=limit):
-            category = tClan.get('category')
-            if query.lower() in category.lower() and category not in categories:
-                categories.append(category)
+        key = (ctx.user.id, 'category', ctx.guild.id)
+        categories = AUTOCOMPLETE_CACHE.get(key, query)
+        if categories is None:
+            tracked = self.bot.clan_db.find({'server': ctx.guild.id}, {'category': 1})
+            categories = []
+            for tClan in await tracked.to_list(length=None):
+                category = tClan.get('category')
+                if category and category not in categories:
+                    categories.append(category)
+            AUTOCOMPLETE_CACHE.set(key, '', categories)
+            categories = [category for category in categories if query.lower() in category.lower()]
         return categories[:25]
 
-    async def clan(self, ctx: disnake.ApplicationCommandInteraction, query: str):
-        if ctx.guild is None:
-            last_record = await self.bot.command_stats.find_one({'$and': [{'user': ctx.user.id}, {'server': {'$ne': None}}]}, sort=[('time', -1)])
-            guild_id = 0
-            if last_record:
-                guild_id = last_record.get('server')
+    async def family_clans(self, user_id: int, guild_id: int, query: str) -> list[str]:
+        """`name | tag` of the guild's clans matching `query`"""
+        key = (user_id, 'family_clans', guild_id)
+        choices = AUTOCOMPLETE_CACHE.get(key, query, match=clan_choice_matches)
+        if choices is not None:
+            return choices
+
+        if self.bot.name_index.ready:
+            results = self.bot.name_index.search_clans(server=guild_id, query=query, limit=None)
         else:
-            guild_id = ctx.guild.id
-        if ctx.filled_options.get('family') is not None:
-            if len(ctx.filled_options.get('family').split('|')) == 2:
-                guild_id = int(ctx.filled_options.get('family').split('|')[-1])
+            results = await self.family_clan_search(guild_id=guild_id, query=query)
+        choices = [f'{document.get("name")} | {document.get("tag")}' for document in results]
+        # the atlas fallback is cut to a page, only reused for the same query
+        AUTOCOMPLETE_CACHE.set(key, query, choices, complete=self.bot.name_index.ready)
+        return choices
 
-        clan_list = []
+    async def family_clan_search(self, guild_id: int, query: str) -> list[dict]:
         if query == '':
             pipeline = [
                 {'$match': {'server': guild_id}},
@@ -71,9 +88,28 @@ class Autocomplete(commands.Cog, name='Autocomplete'):
                 },
                 {'$match': {'server': guild_id}},
             ]
-        results = await self.bot.clan_db.aggregate(pipeline=pipeline).to_list(length=None)
-        for document in results:
-            clan_list.append(f'{document.get("name")} | {document.get("tag")}')
+        return await self.bot.clan_db.aggregate(pipeline=pipeline).to_list(length=None)
+
+    async def dm_guild(self, user_id: int) -> int:
+        guild_id = DM_GUILD_CACHE.get(user_id)
+        if guild_id is None:
+            last_record = await self.bot.command_stats.find_one({'$and': [{'user': user_id}, {'server': {'$ne': None}}]}, sort=[('time', -1)])
+            guild_id = 0
+            if last_record:
+                guild_id = last_record.get('server')
+            DM_GUILD_CACHE.ttl(user_id, guild_id, 300)
+        return guild_id
+
+    async def clan(self, ctx: disnake.ApplicationCommandInteraction, query: str):
+        if ctx.guild is None:
+            guild_id = await self.dm_guild(user_id=ctx.user.id)
+        else:
+            guild_id = ctx.guild.id
+        if ctx.filled_options.get('family') is not None:
+            if len(ctx.filled_options.get('family').split('|')) == 2:
+                guild_id = int(ctx.filled_options.get('family').split('|')[-1])
+
+        clan_list = list(await self.family_clans(user_id=ctx.user.id, guild_id=guild_id, query=query))
 
         if clan_list == [] and len(query) >= 3:
             if coc.utils.is_valid_tag(query):
@@ -104,32 +140,11 @@ class Autocomplete(commands.Cog, name='Autocomplete'):
             if query == ' ':
                 query = ''
         clan_list = []
-        if query == '':
-            pipeline = [
-                {'$match': {'server': guild_id}},
-                {'$sort': {'name': 1}},
-                {'$limit': 25},
-            ]
-        else:
-            pipeline = [
-                {
-                    '$search': {
-                        'index': 'clan_name',
-                        'autocomplete': {
-                            'query': query,
-                            'path': 'name',
-                        },
-                    }
-                },
-                {'$match': {'server': guild_id}},
-            ]
-        results = await self.bot.clan_db.aggregate(pipeline=pipeline).to_list(length=None)
-        for document in results:
-            previous_split = old_query.split(',')[:-1]
-            previous_split = [item.strip() for item in previous_split]
-            if f'{document.get("name")} | {document.get("tag")}' in previous_split:
+        previous_split = [item.strip() for item in old_query.split(',')[:-1]]
+        for choice in await self.family_clans(user_id=ctx.user.id, guild_id=guild_id, query=query):
+            if choice in previous_split:
                 continue
-            clan_list.append(f'{previous_query}{document.get("name")} | {document.get("tag")}')
+            clan_list.append(f'{previous_query}{choice}')
         return clan_list[:25]
 
     async def family_players(self, ctx: disnake.ApplicationCommandInteraction, query: str):
@@ -243,17 +258,18 @@ class Autocomplete(commands.Cog, name='Autocomplete'):
 
     async def user_accounts(self, ctx: disnake.ApplicationCommandInteraction, query: str):
         user_option = ctx.filled_options.get('user', ctx.user.id)
-        cached_accounts = USER_ACCOUNT_CACHE.get(user_option)
-        if cached_accounts is None:
+        key = (ctx.user.id, 'user_accounts', user_option)
+        accounts = AUTOCOMPLETE_CACHE.get(key, query)
+        if accounts is None:
             accounts = await self.bot.link_client.get_linked_players(user_option)
             if accounts:
                 accounts = await self.bot.get_players(tags=accounts, custom=False, use_cache=True)
                 accounts.sort(key=lambda x: (x.town_hall, x.trophies), reverse=True)
                 accounts = [f'{a.name} | {a.tag}' for a in accounts]
-                USER_ACCOUNT_CACHE.ttl(ctx.user.id, accounts, ttl=120)
-        else:
-            accounts = cached_accounts
-        return [a for a in accounts if query.lower() in a.lower()][:25]
+            accounts = accounts or []
+            AUTOCOMPLETE_CACHE.set(key, '', accounts, ttl=120)
+            accounts = [a for a in accounts if query.lower() in a.lower()]
+        return accounts[:25]
 
     async def embeds(self, ctx: disnake.ApplicationCommandInteraction, query: str):
         server_embeds = await self.bot.custom_embeds.find({'server': ctx.guild_id}, {'name': 1}).to_list(length=None)
@@ -283,7 +283,7 @@ class DiscordEvents(commands.Cog):
         if member.guild.id not in self.bot.OUR_GUILDS:
             return
 
-        server_db = await self.bot.ck_client.get_server_settings(server_id=member.guild.id)
+        server_db = await self.bot.ck_client.get_server_settings(server_id=member.guild.id, cached=True)
 
         if not server_db.welcome_link_log.webhook or not server_db.welcome_link_log.embeds:
             return
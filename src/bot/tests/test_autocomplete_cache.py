@@ -0,0 +1,38 @@
+from utility.autocomplete_cache import AutocompleteCache
+
+
+def test_longer_query_filters_complete_results():
+    cache = AutocompleteCache()
+    cache.set('key', 'ma', ['Magic | #A', 'Mango | #B', 'Dark Magic | #C'])
+    assert cache.get('key', 'ma') == ['Magic | #A', 'Mango | #B', 'Dark Magic | #C']
+    assert cache.get('key', 'mag') == ['Magic | #A', 'Dark Magic | #C']
+    # not an extension of the cached query, and no matches left, both recompute
+    assert cache.get('key', 'm') is None
+    assert cache.get('key', 'maz') is None
+
+
+def test_incomplete_results_only_reused_for_same_query():
+    cache = AutocompleteCache()
+    cache.set('key', 'ma', ['Magic | #A'], complete=False)
+    assert cache.get('key', 'MA') == ['Magic | #A']
+    assert cache.get('key', 'mag') is None
+
+
+def test_expiry_and_size_bound():
+    cache = AutocompleteCache(ttl=60, max_entries=2)
+    cache.set('a', '', ['x'])
+    cache.set('b', '', ['x'])
+    cache.get('a', '')
+    cache.set('c', '', ['x'])
+    assert cache.get('b', '') is None
+    assert cache.get('a', '') == ['x']
+    cache.set('d', '', ['x'], ttl=-1)
+    assert cache.get('d', '') is None
+
+
+def test_zero_ttl_is_not_the_default():
+    cache = AutocompleteCache(ttl=60)
+    cache.set('a', '', ['x'], ttl=0)
+    assert cache.get('a', '') is None
+    cache.set('b', '', ['x'])
+    assert cache.get('b', '') == ['x']
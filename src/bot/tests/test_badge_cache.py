@@ -0,0 +1,56 @@
+import asyncio
+
+from utility.imagegen import assets
+from utility.imagegen.assets import BadgeCache
+
+
+class FakeResponse:
+    def __init__(self, data: bytes, status: int = 200):
+        self.data = data
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def read(self):
+        return self.data
+
+
+class FakeHTTPClient:
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url):
+        self.requested.append(url)
+        return FakeResponse(*self.responses[url])
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = BadgeCache(max_bytes=10, spill_dir=str(tmp_path))
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    assert cache.get('a') == b'aaaa'
+    cache.put('c', b'cccc')
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (b'aaaa', b'cccc')
+    assert cache.size == 8
+
+
+def test_fetch_spills_and_reloads_from_disk(tmp_path, monkeypatch):
+    http = FakeHTTPClient({'https://badge/1.png': (b'png', 200), 'https://badge/missing.png': (b'', 404)})
+    monkeypatch.setattr(assets, 'get_http_client', lambda: http)
+
+    first = BadgeCache(spill_dir=str(tmp_path))
+    assert asyncio.run(first.fetch('https://badge/1.png')) == b'png'
+    assert asyncio.run(first.fetch('https://badge/missing.png')) == b''
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # a new process (or an evicted entry) reads the spilled copy instead of going over HTTP
+    second = BadgeCache(spill_dir=str(tmp_path))
+    assert asyncio.run(second.fetch('https://badge/1.png')) == b'png'
+    assert (second.disk_hits, second.misses) == (1, 0)
+    assert http.requested == ['https://badge/1.png', 'https://badge/missing.png']
@@ -0,0 +1,39 @@
+import asyncio
+
+from classes.DatabaseClient.Classes.settings import DatabaseClan
+
+
+class FakeCollection:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, filter, update):
+        self.updates.append((filter, update))
+
+
+class FakeSettingsCache:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate(self, server_id):
+        self.invalidated.append(server_id)
+
+
+class FakeBot:
+    def __init__(self):
+        self.clan_db = FakeCollection()
+        self.settings_cache = FakeSettingsCache()
+
+
+def test_clan_setters_invalidate_the_server():
+    bot = FakeBot()
+    clan = DatabaseClan(bot=bot, data={'tag': '#CLAN', 'server': 1234})
+
+    async def run():
+        await clan.set_member_role(id=5)
+        await clan.war_log.set_webhook(id=6)
+        await clan.war_panel.set_webhook(id=7)
+
+    asyncio.run(run())
+    assert bot.clan_db.updates[0] == ({'$and': [{'tag': '#CLAN'}, {'server': 1234}]}, {'$set': {'generalRole': 5}})
+    assert bot.settings_cache.invalidated == [1234, 1234, 1234]
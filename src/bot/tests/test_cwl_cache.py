@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utility.cwl_cache import CWLCache
+
+
+class NotFound(Exception):
+    pass
+
+
+class FakeClient:
+    def __init__(self, groups: dict, wars: dict):
+        self.groups = groups
+        self.wars = wars
+        self.group_calls = 0
+        self.war_calls: list[str] = []
+
+    async def get_league_group(self, clan_tag):
+        self.group_calls += 1
+        await asyncio.sleep(0)
+        if clan_tag not in self.groups:
+            raise NotFound
+        return self.groups[clan_tag]
+
+    async def get_league_war(self, war_tag):
+        self.war_calls.append(war_tag)
+        await asyncio.sleep(0)
+        return self.wars[war_tag]
+
+
+def _client():
+    group = SimpleNamespace(
+        season='2026-10',
+        clans=[SimpleNamespace(tag='#A'), SimpleNamespace(tag='#B')],
+        rounds=[['#W1', '#W2'], ['#0', '#0']],
+    )
+    wars = {'#W1': SimpleNamespace(state='warEnded'), '#W2': SimpleNamespace(state='inWar')}
+    return FakeClient(groups={'#A': group, '#B': group}, wars=wars)
+
+
+def test_group_shared_by_its_clans_and_concurrent_callers():
+    client = _client()
+    cache = CWLCache(coc_client=client, not_found=(NotFound,))
+
+    async def run():
+        first = await asyncio.gather(*[cache.get_group('#A', season='2026-10') for _ in range(5)])
+        second = await cache.get_group('#B', season='2026-10')
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert client.group_calls == 1
+    assert all(group is second for group in first)
+
+
+def test_not_in_cwl_is_cached():
+    client = _client()
+    cache = CWLCache(coc_client=client, not_found=(NotFound,))
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(NotFound):
+                await cache.get_group('#C', season='2026-10')
+
+    asyncio.run(run())
+    assert client.group_calls == 1
+
+
+def test_ended_wars_kept_and_live_wars_refetched():
+    client = _client()
+    cache = CWLCache(coc_client=client, war_ttl=0)
+
+    async def run():
+        group = await cache.get_group('#A', season='2026-10')
+        first = await cache.get_group_wars(group)
+        await asyncio.sleep(0.01)
+        second = await cache.get_group_wars(group)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert set(first) == set(second) == {'#W1', '#W2'}
+    assert sorted(client.war_calls) == ['#W1', '#W2', '#W2']
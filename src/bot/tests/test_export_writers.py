@@ -0,0 +1,50 @@
+import asyncio
+import csv
+import io
+import zipfile
+
+import pytest
+
+from commands.exports.engine import CsvExportWriter, ExportWriter, create_writer
+
+
+async def _rows(rows):
+    for row in rows:
+        yield row
+
+
+def _export(writer, sheets: dict):
+    async def run():
+        for name, (columns, rows) in sheets.items():
+            await writer.add_sheet(name=name, columns=columns, rows=_rows(rows))
+        return await writer.finish()
+
+    return asyncio.run(run())
+
+
+def test_writer_base_is_abstract():
+    with pytest.raises(TypeError):
+        ExportWriter()
+
+
+def test_csv_single_sheet():
+    writer = create_writer(format='csv')
+    data = _export(writer, {'war_hits': (['Name', 'Stars'], [['Bob', 3], ['Ann', '-']])})
+    assert writer.extension == 'csv'
+    assert list(csv.reader(io.StringIO(data.getvalue().decode('utf-8')))) == [['Name', 'Stars'], ['Bob', '3'], ['Ann', '-']]
+
+
+def test_csv_several_sheets_are_zipped():
+    writer = CsvExportWriter()
+    data = _export(writer, {'war_hits': (['Name'], [['Bob']]), 'legend_stats': (['Name'], [['Ann']])})
+    assert writer.extension == 'zip'
+    with zipfile.ZipFile(data) as archive:
+        assert sorted(archive.namelist()) == ['legend_stats.csv', 'war_hits.csv']
+
+
+def test_parquet_sheet():
+    pq = pytest.importorskip('pyarrow.parquet')
+    writer = create_writer(format='parquet')
+    data = _export(writer, {'war_hits': (['Name', 'Stars'], [['Bob', 3], ['Ann', None]])})
+    assert writer.extension == 'parquet'
+    assert pq.read_table(data).to_pylist() == [{'Name': 'Bob', 'Stars': '3'}, {'Name': 'Ann', 'Stars': None}]
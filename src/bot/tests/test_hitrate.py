@@ -0,0 +1,55 @@
+from utility.clash.hitrate import build_hitrate_match, build_townhall_hitrate_match, fold_hitrate_rows
+
+
+def _row(player, matchup, num_hits, stars, triples):
+    return {
+        '_id': {'player': player, 'matchup': matchup},
+        'num_hits': num_hits,
+        'total_stars': stars,
+        'total_destruction': num_hits * 90,
+        'total_triples': triples,
+        'two_stars': num_hits - triples,
+        'one_stars': 0,
+        'zero_stars': 0,
+    }
+
+
+def test_fold_hitrate_rows_totals_and_order():
+    folded = fold_hitrate_rows([_row('#A', '15v16', 1, 2, 0), _row('#A', '16v16', 2, 6, 2)])
+    assert list(folded['#A']) == ['All', '16v16', '15v16']
+    assert folded['#A']['All']['num_hits'] == 3
+    assert folded['#A']['All']['total_stars'] == 8
+    assert folded['#A']['All']['total_triples'] == 2
+
+
+def test_fold_hitrate_rows_keyed_by_player():
+    folded = fold_hitrate_rows([_row('#A', '16v16', 2, 6, 2), _row('#B', '14v14', 1, 2, 0)])
+    assert set(folded) == {'#A', '#B'}
+    assert folded['#B']['All']['num_hits'] == 1
+    assert fold_hitrate_rows([]) == {}
+
+
+def test_build_hitrate_match_defense_and_size():
+    match = build_hitrate_match(tags='#A', defense=True, townhall_level=[16], war_sizes=[15])
+    assert match['defender_tag'] == '#A'
+    assert match['defender_townhall'] == {'$in': [16]}
+    assert match['war_size'] == 15
+
+    bulk = build_hitrate_match(tags=['#A', '#B'], war_sizes=[5, 10])
+    assert bulk['tag'] == {'$in': ['#A', '#B']}
+    assert 'war_size' not in bulk
+    assert 'townhall' not in bulk
+
+
+def test_townhall_match_groups_players_by_their_townhall():
+    match = build_townhall_hitrate_match(townhalls={'#A': 16, '#B': 15, '#C': 16}, war_types=['cwl'])
+    branches = {tuple(sorted(branch['tag']['$in'])): branch for branch in match['$or']}
+    assert branches[('#A', '#C')]['townhall'] == {'$in': [16]}
+    assert branches[('#B',)]['townhall'] == {'$in': [15]}
+    assert branches[('#B',)]['war_type'] == {'$in': ['cwl']}
+
+
+def test_townhall_match_single_group_and_unknown_townhall():
+    match = build_townhall_hitrate_match(townhalls={'#A': None}, defense=True)
+    assert match['defender_tag'] == {'$in': ['#A']}
+    assert 'defender_townhall' not in match
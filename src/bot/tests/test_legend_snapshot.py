@@ -0,0 +1,25 @@
+from utility.legend_snapshot import CUTOFF_RANKS, snapshot_from_facets, snapshot_pipeline
+
+
+def test_snapshot_from_facets():
+    snapshot = snapshot_from_facets(
+        {
+            'buckets': [{'_id': 5000, 'count': 10}, {'_id': 'out_of_bounds', 'count': 3}, {'_id': 6500, 'count': 1}],
+            'cutoffs': [{'rank': 1, 'trophies': 6700}, {'rank': 5, 'trophies': 6600}],
+            'totals': [{'_id': None, 'lowest_rank': 14, 'total': 14}],
+        }
+    )
+    assert snapshot['buckets'] == [{'trophies': 5000, 'count': 10}, {'trophies': 6500, 'count': 1}]
+    assert [cutoff['rank'] for cutoff in snapshot['cutoffs']] == [1, 5]
+    assert (snapshot['lowest_rank'], snapshot['total']) == (14, 14)
+
+
+def test_empty_rankings():
+    snapshot = snapshot_from_facets({'buckets': [], 'cutoffs': [], 'totals': []})
+    assert snapshot == {'buckets': [], 'cutoffs': [], 'lowest_rank': None, 'total': 0}
+
+
+def test_pipeline_is_one_facet_pass():
+    pipeline = snapshot_pipeline()
+    assert len(pipeline) == 1
+    assert pipeline[0]['$facet']['cutoffs'][0] == {'$match': {'rank': {'$in': CUTOFF_RANKS}}}
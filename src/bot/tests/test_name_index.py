@@ -0,0 +1,53 @@
+from utility.name_index import NameIndex, PrefixIndex, words
+
+
+def _player(tag, name, clan=None, league='Gold League I'):
+    return {'tag': tag, 'name': name, 'th': 16, 'clan': clan, 'clan_name': None, 'league': league}
+
+
+def test_words_normalized_and_symbol_names():
+    assert words('Jöhn_Smith') == ['john', 'smith']
+    assert words('★ ☆') == ['★☆']
+    assert words('  ') == []
+
+
+def test_prefix_search_ranks_exact_words_first():
+    index = PrefixIndex()
+    index.add('#A', 'Magicians', {'tag': '#A'})
+    index.add('#B', 'Magic', {'tag': '#B'})
+    index.add('#C', 'Dark Magic', {'tag': '#C'})
+    index.add('#D', 'Tragic', {'tag': '#D'})
+    tags = [entry['tag'] for entry in index.search('mag')]
+    assert set(tags[:2]) == {'#B', '#C'} and tags[2:] == ['#A']
+    assert [entry['tag'] for entry in index.search('dark mag')] == ['#C']
+    assert index.search('xyz') == []
+
+
+def test_prefix_index_update_and_remove():
+    index = PrefixIndex()
+    index.add('#A', 'Old Name', {'tag': '#A'})
+    index.add('#A', 'New Name', {'tag': '#A'})
+    assert index.search('old') == []
+    assert len(index.search('new')) == 1
+    index.remove('#A')
+    assert index.search('name') == []
+    assert len(index) == 0
+
+
+def test_family_and_legend_shards_follow_updates():
+    index = NameIndex()
+    index.update_clan({'server': 1, 'tag': '#CLAN', 'name': 'Family'})
+    index.update_player(_player('#A', 'Alpha', clan='#CLAN', league='Legend League'))
+    index.update_player(_player('#B', 'Alpine', clan='#OTHER'))
+
+    assert [entry['tag'] for entry in index.family(1).search('alp')] == ['#A']
+    assert [entry['tag'] for entry in index.legends.search('alp')] == ['#A']
+
+    index.update_player(_player('#B', 'Alpine', clan='#CLAN'))
+    index.update_player(_player('#A', 'Alpha', clan='#OTHER'))
+    assert [entry['tag'] for entry in index.family(1).search('alp')] == ['#B']
+    assert index.legends.search('alp') == []
+
+    index.remove_clan(server=1, tag='#CLAN')
+    assert index.family(1).search('') == []
+    assert index.search_clans(server=1, query='') == []
@@ -0,0 +1,32 @@
+from classes.player.projection import covers, merge_sections, projection_keys, stats_projection
+
+
+def test_seasonal_sections_are_narrowed_to_the_season():
+    keys = projection_keys(['donations', 'legends'], season='2026-10')
+    assert keys == {'tag', 'name', 'donations.2026-10', 'legends'}
+    assert projection_keys(['donations']) == {'tag', 'name', 'donations'}
+
+
+def test_child_paths_collapse_into_their_parent():
+    keys = projection_keys(['capital_gold', 'capital_gold.2026-10-03', 'gold.2026-10'])
+    assert keys == {'tag', 'name', 'capital_gold', 'gold.2026-10'}
+    assert stats_projection(None) is None
+    assert stats_projection(['gold'], season='2026-10') == {'_id': 0, 'tag': 1, 'name': 1, 'gold.2026-10': 1}
+
+
+def test_covers():
+    assert covers(None, 'donations.2026-10')
+    assert covers({'donations'}, 'donations.2026-10')
+    assert covers({'donations.2026-10'}, 'donations.2026-10')
+    assert not covers({'donations.2026-09'}, 'donations.2026-10')
+    assert not covers({'tag', 'name'}, 'legends')
+
+
+def test_merge_sections_keeps_already_loaded_seasons():
+    results = {'tag': '#A', 'donations': {'2026-09': {'donated': 10}}}
+    merge_sections(results, {'donations': {'2026-10': {'donated': 5}}, 'legends': {'streak': 3}})
+    assert results == {
+        'tag': '#A',
+        'donations': {'2026-09': {'donated': 10}, '2026-10': {'donated': 5}},
+        'legends': {'streak': 3},
+    }
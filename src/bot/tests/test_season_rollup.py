@@ -0,0 +1,37 @@
+from utility.season_rollup import SeasonRollup, ranked, rollup_id, summary_metrics
+
+
+def test_rollup_top_bottom_totals_and_summing():
+    rollup = SeasonRollup()
+    rollup.add('#A', 'Alpha', {'donations': 100, 'received': 5})
+    rollup.add('#B', 'Beta', {'donations': 50, 'received': 70})
+    rollup.add('#C', 'Gamma', {'donations': 10, 'received': 1})
+    # same player in a second clan
+    rollup.add('#C', None, {'donations': 200, 'received': 0})
+
+    document = rollup.document(size=2, ascending=('received',), details=True)
+    assert document['count'] == 3
+    assert document['totals'] == {'donations': 360, 'received': 76}
+    assert ranked(document, 'donations', 5) == [(210, '#C', 'Gamma'), (100, '#A', 'Alpha')]
+    assert ranked(document, 'received', 1, descending=False) == [(1, '#C', 'Gamma')]
+    assert ranked(document, 'donations', 5, descending=False) == []
+    assert document['players']['#B'] == {'donations': 50, 'received': 70}
+
+
+def test_summary_metrics_from_projected_stats():
+    stats = {
+        'gold': {'2026-10': 1_000},
+        'donations': {'2026-10': {'donated': 30}},
+        'capital_gold': {'2026-10-03': {'donate': [100, 50], 'raid': [2_000]}, '2026-10-10': None},
+    }
+    metrics = summary_metrics(stats, season='2026-10', raid_weeks=['2026-10-03', '2026-10-10'])
+    assert metrics['gold'] == 1_000 and metrics['elixir'] == 0
+    assert (metrics['donated'], metrics['received']) == (30, 0)
+    assert (metrics['capital_donated'], metrics['capital_raided']) == (150, 2_000)
+
+
+def test_rollup_id_follows_the_member_set():
+    first = rollup_id(kind='summary', owner=1, season='2026-09', members=['#A', '#B'])
+    assert first == rollup_id(kind='summary', owner=1, season='2026-09', members=['#B', '#A'])
+    assert first != rollup_id(kind='summary', owner=1, season='2026-09', members=['#A', '#B', '#C'])
+    assert first.startswith('summary:1:2026-09:')
@@ -0,0 +1,32 @@
+import os
+
+from utility.table_cache import TableCache, table_key
+
+
+def test_key_follows_content():
+    table = {'columns': ['Name', 'Current'], 'rows': [['1. Bob', '5200']], 'badges': [None], 'logo': None, 'title': 'Top 1 Legend'}
+    assert table_key(table) == table_key(dict(reversed(list(table.items()))))
+    assert table_key(table) != table_key(table | {'rows': [['1. Bob', '5201']]})
+    assert table_key(table) != table_key(table | {'badges': ['https://example.com/badge.png']})
+
+
+def test_cache_round_trip(tmp_path):
+    cache = TableCache(cache_dir=str(tmp_path))
+    assert cache.get('abc') is None
+    cache.put('abc', b'png')
+    assert cache.get('abc') == b'png'
+    assert cache.stats() == {'hits': 1, 'misses': 1}
+    assert [path.name for path in tmp_path.iterdir()] == ['abc.png']
+
+
+def test_prune_removes_least_recently_read(tmp_path):
+    cache = TableCache(cache_dir=str(tmp_path), max_bytes=11)
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    os.utime(tmp_path / 'a.png', (1, 1))
+    os.utime(tmp_path / 'b.png', (2, 2))
+    assert cache.get('a') == b'aaaa'
+    cache.put('c', b'cccc')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['a.png', 'c.png']
+    assert cache.size == 8
+    assert TableCache(cache_dir=str(tmp_path)).size == 8
@@ -0,0 +1,31 @@
+import io
+
+from PIL import Image
+
+from utility.imagegen.table import HEADER_HEIGHT, PADDING, ROW_HEIGHT, TITLE_HEIGHT, draw_table
+
+
+def _png(color) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGBA', (64, 64), color).save(output, format='png')
+    return output.getvalue()
+
+
+def test_draw_table_smoke():
+    rows = [['1.  Bob', '5000', '160³', '80²', '+80', '5080'], ['2.  Ann', '5100', '0', '0', '+0', '5050']]
+    png = draw_table(
+        columns=['Name', 'Start', 'Atk', 'Def', 'Net', 'Current'],
+        rows=rows,
+        title='Family Top 2 Legend',
+        badges=[_png((255, 0, 0, 255)), None],
+        logo=_png((0, 0, 255, 255)),
+    )
+    image = Image.open(io.BytesIO(png))
+    assert image.format == 'PNG'
+    assert image.height == TITLE_HEIGHT + HEADER_HEIGHT + ROW_HEIGHT * len(rows) + PADDING
+    assert image.width > 0
+
+
+def test_draw_table_without_rows_or_badges():
+    png = draw_table(columns=['Name', 'Current'], rows=[], title='Empty', badges=[], logo=None)
+    assert Image.open(io.BytesIO(png)).format == 'PNG'
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from utility.tenure import month_start, next_change, tenure_months, tenure_role_changes
+
+
+ROLES = [{'months': 0, 'id': 1}, {'months': 3, 'id': 2}, {'months': 12, 'id': 3}]
+
+
+def _date(year, month, day):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def test_tenure_counts_calendar_months():
+    assert tenure_months(_date(2024, 1, 31), _date(2024, 2, 1)) == 1
+    assert tenure_months(_date(2023, 11, 5), _date(2024, 2, 1)) == 3
+    assert month_start(_date(2023, 11, 5), 3) == _date(2024, 2, 1)
+    assert month_start(_date(2023, 11, 5), 14) == _date(2025, 1, 1)
+
+
+def test_next_change_is_next_threshold():
+    joined = _date(2024, 1, 15)
+    assert next_change(ROLES, joined, _date(2024, 2, 10)) == _date(2024, 4, 1)
+    assert next_change(ROLES, joined, _date(2024, 4, 1)) == _date(2025, 1, 1)
+    assert next_change(ROLES, joined, _date(2025, 6, 1)) is None
+
+
+def test_only_highest_earned_role_kept():
+    assert tenure_role_changes(ROLES, months=4, current_role_ids={1, 99}) == (2, {1})
+    assert tenure_role_changes(ROLES, months=4, current_role_ids={2}) == (None, set())
+    assert tenure_role_changes(ROLES, months=13, current_role_ids={1, 2}) == (3, {1, 2})
+    assert tenure_role_changes([{'months': 3, 'id': 2}], months=1, current_role_ids={2}) == (None, {2})
@@ -0,0 +1,60 @@
+from utility.clash.war_attacks import attack_rows, build_war_attack_match, war_key, war_type
+
+
+def _member(tag, townhall, attacks=()):
+    return {'tag': tag, 'name': tag.strip('#'), 'townhallLevel': townhall, 'attacks': list(attacks)}
+
+
+def _attack(defender, stars, order):
+    return {'defenderTag': defender, 'stars': stars, 'destructionPercentage': 100 if stars == 3 else 60, 'order': order}
+
+
+def _war(prep_start='20261001T000000.000Z', start='20261001T230000.000Z', state='warEnded', **extra):
+    return {
+        'state': state,
+        'preparationStartTime': prep_start,
+        'startTime': start,
+        'clan': {'tag': '#B', 'members': [_member('#B1', 16, [_attack('#A1', 3, 1)])]},
+        'opponent': {'tag': '#A', 'members': [_member('#A1', 15, [_attack('#B1', 2, 2)])]},
+        **extra,
+    }
+
+
+def test_war_type_from_raw_data():
+    assert war_type(_war()) == 'random'
+    assert war_type(_war(start='20261001T010000.000Z')) == 'friendly'
+    # a 24h friendly prep wraps to 0 seconds, coc calls it a random war too
+    assert war_type(_war(start='20261002T000000.000Z')) == 'random'
+    assert war_type(_war(tag='#WAR')) == 'cwl'
+
+
+def test_attack_rows_both_sides_and_key_is_side_independent():
+    rows = attack_rows(_war())
+    assert [(row['clan'], row['tag'], row['townhall'], row['defender_townhall'], row['stars']) for row in rows] == [
+        ('#B', '#B1', 16, 15, 3),
+        ('#A', '#A1', 15, 16, 2),
+    ]
+    assert all(row['ended'] and row['war_type'] == 'random' and row['prep_time'] == 23 * 60 * 60 for row in rows)
+
+    flipped = _war()
+    flipped['clan'], flipped['opponent'] = flipped['opponent'], flipped['clan']
+    assert war_key(flipped) == war_key(_war())
+    assert {row['_id'] for row in attack_rows(flipped)} == {row['_id'] for row in rows}
+
+
+def test_build_war_attack_match_th_filters():
+    base = {'war_ids': ['w'], 'clan_tags': ['#A'], 'war_types': ['random']}
+    assert 'townhall' not in build_war_attack_match(**base)
+    assert build_war_attack_match(**base, th_filter='equalthonly')['$expr'] == {'$eq': ['$townhall', '$defender_townhall']}
+    matchup = build_war_attack_match(**base, th_filter='16v15')
+    assert (matchup['townhall'], matchup['defender_townhall']) == (16, 15)
+    assert build_war_attack_match(**base, th_filter='14')['townhall'] == 14
+
+
+def test_ended_war_without_attacks_gets_a_marker_row():
+    war = _war()
+    for side in ('clan', 'opponent'):
+        for member in war[side]['members']:
+            member['attacks'] = []
+    assert attack_rows(war) == [{'_id': f'{war_key(war)}|none', 'war_id': war_key(war), 'ended': True}]
+    assert attack_rows(_war(state='inWar')) != [] and attack_rows({**war, 'state': 'inWar'}) == []
@@ -0,0 +1,54 @@
+"""Last autocomplete result set per (user, option).
+
+Discord sends a request per keystroke and the query mostly grows by one character, so the previous
+result set is usually a superset of the next one. An entry stores the query it was computed for and
+whether its results are complete (not cut to a limit), a longer query that extends it is answered by
+filtering the stored results. Empty filtered results count as a miss, handlers with a fallback
+(i.e the clan search on the API) still run it.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from background.metrics_server import observe_autocomplete_lookup
+
+
+def contains(choice: str, query: str) -> bool:
+    return query.lower() in choice.lower()
+
+
+class AutocompleteCache:
+    def __init__(self, ttl: int = 60, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, str, list[str], bool]] = OrderedDict()
+
+    def get(self, key: Hashable, query: str, match: Callable[[str, str], bool] = contains) -> list[str] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            observe_autocomplete_lookup(result='miss')
+            return None
+        expires, cached_query, results, complete = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            observe_autocomplete_lookup(result='miss')
+            return None
+        self._entries.move_to_end(key)
+
+        if query.casefold() == cached_query:
+            observe_autocomplete_lookup(result='hit')
+            return results
+        if complete and query.casefold().startswith(cached_query):
+            filtered = [choice for choice in results if match(choice, query)]
+            if filtered:
+                observe_autocomplete_lookup(result='hit')
+                return filtered
+        observe_autocomplete_lookup(result='miss')
+        return None
+
+    def set(self, key: Hashable, query: str, results: list[str], complete: bool = True, ttl: int | None = None):
+        """`complete` means `results` holds every match for `query`, not a limited page of them"""
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), query.casefold(), results, complete)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,101 @@
+"""Shared cache of `button_logic` renders, for button presses, refresh boards and autoboards.
+
+An entry holds the embeds a registered button function returned, keyed by the button id (page
+stripped, so every page of a paginated button shares one entry), guild, locale and the settings
+version of the guilds the render depends on. Versions are redis counters per guild: `invalidate`
+bumps them when a guild's settings change and orphans every render built from them. Clan & player
+data is read live from the API and only bounded by the TTL, a button press is served a render no
+older than `fresh` seconds (see `button_logic`). Everything lives in redis so clusters share renders
+and invalidations.
+"""
+import hashlib
+import time
+from typing import Iterable
+
+import disnake
+import ujson
+
+
+# version counters outlive any render keyed on them
+VERSION_TTL = 7 * 24 * 60 * 60
+
+# parser args that make a render specific to the user pressing the button
+UNCACHEABLE_ARGS = {'ctx', 'discord_user'}
+
+
+class ButtonCache:
+    def __init__(self, redis, ttl: int = 300, fresh: int = 30):
+        self.redis = redis
+        self.ttl = ttl
+        self.fresh = fresh
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config, redis) -> 'ButtonCache':
+        return cls(redis=redis, ttl=config.button_cache_ttl, fresh=config.button_cache_fresh)
+
+    @staticmethod
+    def version_key(kind: str, id) -> str:
+        return f'render-version:{kind}:{id}'
+
+    @staticmethod
+    def dependencies(guild_id: int | None, split_data: list[str], parser_split: list[str]) -> list[int | str | None] | None:
+        """Guilds whose settings a render depends on, from its button id. `None` when the render can't be shared"""
+        if UNCACHEABLE_ARGS.intersection(parser_split):
+            return None
+        dependencies = [guild_id]
+        for data, name in zip(split_data[1:], parser_split[1:]):
+            if name == 'server':
+                dependencies.append(data)
+        return dependencies
+
+    async def key(self, button_id: str, guild_id: int | None, locale, dependencies: list[int | str | None]) -> str:
+        versions = await self.redis.mget([self.version_key('guild', id) for id in dependencies])
+        version = ','.join(v.decode() if isinstance(v, bytes) else str(v or 0) for v in versions)
+        raw = f'{button_id}|{guild_id}|{locale}|{version}'
+        return f'button-render:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    async def get(self, key: str, max_age: int | None = None) -> disnake.Embed | list[disnake.Embed] | None:
+        """`max_age` (seconds) skips renders older than that, `None` takes anything still within the TTL"""
+        try:
+            data = await self.redis.get(key)
+        except Exception:
+            return None
+        if data is None:
+            self.misses += 1
+            return None
+        payload = ujson.loads(data)
+        if max_age is not None and time.time() - payload.get('rendered_at', 0) > max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        embeds = [disnake.Embed.from_dict(embed) for embed in payload['embeds']]
+        return embeds if payload['list'] else embeds[0]
+
+    async def set(self, key: str, embed: disnake.Embed | list[disnake.Embed]):
+        embeds = embed if isinstance(embed, list) else [embed]
+        if not embeds or not all(isinstance(item, disnake.Embed) for item in embeds):
+            return
+        payload = ujson.dumps({'list': isinstance(embed, list), 'embeds': [item.to_dict() for item in embeds], 'rendered_at': time.time()})
+        # local files (generated images) aren't part of the embed payload
+        if 'attachment://' in payload:
+            return
+        try:
+            await self.redis.set(key, payload, ex=self.ttl)
+        except Exception:
+            pass
+
+    async def invalidate(self, guilds: Iterable[int] = ()):
+        """Drop every render built from these guilds, call when their settings change"""
+        keys = [self.version_key('guild', id) for id in guilds]
+        if not keys:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, VERSION_TTL)
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'ttl': self.ttl}
@@ -1,9 +1,9 @@
 from datetime import datetime
 
-import aiohttp
 import disnake
 
 from classes.config import Config
+from utility.http import get_http_client
 
 
 async def upload_to_cdn(api_token: str, picture: disnake.Attachment, reason: str):
@@ -12,13 +12,12 @@ async def upload_to_cdn(api_token: str, picture: disnake.Attachment, reason: str
         'AccessKey': api_token,
     }
     payload = await picture.read()
-    async with aiohttp.ClientSession() as session:
-        async with session.put(
-            url=f'https://storage.bunnycdn.com/clashking/{reason}/{picture.id}/{picture.filename}',
-            headers=headers,
-            data=payload,
-        ) as response:
-            await session.close()
+    async with get_http_client().put(
+        url=f'https://storage.bunnycdn.com/clashking/{reason}/{picture.id}/{picture.filename}',
+        headers=headers,
+        data=payload,
+    ):
+        pass
     return f'https://cdn.feast.xyz/{reason}/{picture.id}/{picture.filename}'
 
 
@@ -28,13 +27,12 @@ async def general_upload_to_cdn(config: Config, bytes_, id):
         'AccessKey': config.bunny_api_token,
     }
     payload = bytes_
-    async with aiohttp.ClientSession() as session:
-        async with session.put(
-            url=f'https://storage.bunnycdn.com/clashking/{id}.png',
-            headers=headers,
-            data=payload,
-        ) as response:
-            await session.close()
+    async with get_http_client().put(
+        url=f'https://storage.bunnycdn.com/clashking/{id}.png',
+        headers=headers,
+        data=payload,
+    ):
+        pass
     return f'https://cdn.feast.xyz/{id}.png?{int(datetime.now().timestamp())}'
 
 
@@ -45,11 +43,10 @@ async def upload_html_to_cdn(config: Config, bytes_, id):
     }
 
     payload = bytes_
-    async with aiohttp.ClientSession() as session:
-        async with session.put(
-            url=f'https://storage.bunnycdn.com/clashking/{id}.html',
-            headers=headers,
-            data=payload,
-        ) as response:
-            await session.close()
+    async with get_http_client().put(
+        url=f'https://storage.bunnycdn.com/clashking/{id}.html',
+        headers=headers,
+        data=payload,
+    ):
+        pass
     return f'https://cdn.feast.xyz/{id}.html'
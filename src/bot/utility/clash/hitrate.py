@@ -0,0 +1,126 @@
+"""Server-side aggregation of war hit/defense rates from the `warhits` collection.
+
+Index plan for `looper.warhits` (created by the tracking service, not by the bot):
+    {'tag': 1, '_time': -1}              -> offensive rates, matched on tag + time range
+    {'defender_tag': 1, '_time': -1}     -> defensive rates, matched on defender_tag + time range
+The remaining filters (townhall, fresh, war type/status/size) are low cardinality and are
+applied as residual predicates on the documents the index range returns.
+"""
+from collections import defaultdict
+
+
+WARHITS_INDEXES = [
+    [('tag', 1), ('_time', -1)],
+    [('defender_tag', 1), ('_time', -1)],
+]
+
+HIT_RATE_DEFAULT = {
+    'num_hits': 0,
+    'total_stars': 0,
+    'total_destruction': 0,
+    'total_triples': 0,
+    'two_stars': 0,
+    'one_stars': 0,
+    'zero_stars': 0,
+}
+
+
+def build_hitrate_match(
+    tags: str | list[str],
+    defense: bool = False,
+    townhall_level: list = [],
+    fresh_type: list = [False, True],
+    start_timestamp: int = 0,
+    end_timestamp: int = 9999999999,
+    war_types: list = ['random', 'cwl', 'friendly'],
+    war_statuses: list = ['lost', 'losing', 'winning', 'won'],
+    war_sizes: list = [],
+):
+    player_field, townhall_field = ('defender_tag', 'defender_townhall') if defense else ('tag', 'townhall')
+    match = {
+        player_field: tags if isinstance(tags, str) else {'$in': list(tags)},
+        'fresh': {'$in': list(fresh_type)},
+        '_time': {'$gte': start_timestamp, '$lte': end_timestamp},
+        'war_type': {'$in': list(war_types)},
+        'war_status': {'$in': list(war_statuses)},
+    }
+    # an empty townhall list means every townhall the player has attacked from
+    if townhall_level:
+        match[townhall_field] = {'$in': list(townhall_level)}
+    # a size filter only applies when a single size was asked for
+    if len(war_sizes) == 1:
+        match['war_size'] = war_sizes[0]
+    return match
+
+
+def build_townhall_hitrate_match(townhalls: dict[str, int | None], defense: bool = False, **filters) -> dict:
+    """Match for many players, each at their own townhall (`None` for every townhall), other filters as `build_hitrate_match`"""
+    by_townhall = defaultdict(list)
+    for tag, townhall in townhalls.items():
+        by_townhall[townhall].append(tag)
+    matches = [
+        build_hitrate_match(tags=tags, defense=defense, townhall_level=[] if townhall is None else [townhall], **filters)
+        for townhall, tags in by_townhall.items()
+    ]
+    return matches[0] if len(matches) == 1 else {'$or': matches}
+
+
+def _star_bucket(stars: int):
+    return {'$sum': {'$cond': [{'$eq': ['$stars', stars]}, 1, 0]}}
+
+
+def build_hitrate_pipeline(match: dict, defense: bool = False):
+    # the same attack can be stored more than once, so collapse on player + war + defender before counting
+    player_field, attacker_th = ('$defender_tag', '$defender_townhall') if defense else ('$tag', '$townhall')
+    return [
+        {'$match': match},
+        {
+            '$group': {
+                '_id': {'player': player_field, 'war_start': '$war_start', 'defender_tag': '$defender_tag'},
+                'townhall': {'$first': attacker_th},
+                'defender_townhall': {'$first': '$defender_townhall'},
+                'stars': {'$first': '$stars'},
+                'destruction': {'$first': '$destruction'},
+            }
+        },
+        {
+            '$group': {
+                '_id': {
+                    'player': '$_id.player',
+                    'matchup': {'$concat': [{'$toString': '$townhall'}, 'v', {'$toString': '$defender_townhall'}]},
+                },
+                'num_hits': {'$sum': 1},
+                'total_stars': {'$sum': '$stars'},
+                'total_destruction': {'$sum': '$destruction'},
+                'total_triples': _star_bucket(3),
+                'two_stars': _star_bucket(2),
+                'one_stars': _star_bucket(1),
+                'zero_stars': _star_bucket(0),
+            }
+        },
+    ]
+
+
+def _matchup_sort_key(matchup: str):
+    attacker, _, defender = matchup.partition('v')
+    return (-int(attacker), -int(defender)) if attacker.isdigit() and defender.isdigit() else (0, 0)
+
+
+def fold_hitrate_rows(rows: list[dict]) -> dict[str, dict[str, dict]]:
+    """Turn per-player, per-matchup aggregation rows into {tag: {type: hitrate_dict}}, 'All' first, highest TH matchups next."""
+    by_player = {}
+    for row in rows:
+        by_player.setdefault(row['_id']['player'], {})[row['_id']['matchup']] = {key: row.get(key, 0) for key in HIT_RATE_DEFAULT}
+
+    folded = {}
+    for tag, matchups in by_player.items():
+        total = HIT_RATE_DEFAULT.copy()
+        for hitrate in matchups.values():
+            for key, value in hitrate.items():
+                total[key] += value
+        folded[tag] = {'All': total} | {matchup: matchups[matchup] for matchup in sorted(matchups, key=_matchup_sort_key)}
+    return folded
+
+
+def empty_hitrate() -> dict[str, dict]:
+    return {'All': HIT_RATE_DEFAULT.copy()}
@@ -0,0 +1,136 @@
+"""Flat per-attack store of the wars in `clan_wars`, for family war stats.
+
+Family stats used to load whole war documents and decode a `coc.ClanWar` per war to walk its attacks.
+Each attack is instead stored once as a small row (attacker, townhalls, stars, destruction, order, war
+type, prep time) and hit rates and hit counts are grouped per attacker inside mongo.
+
+A war's rows are written when the war is first asked for (or by the background sync once it ends)
+and rewritten until it has ended, after that the war is never decoded again. An ended war without
+attacks gets a single marker row, so it counts as stored too.
+
+Index plan for `new_looper.war_attacks` (created by the war attack sync in background/features):
+    {'war_id': 1, 'clan': 1}    -> rows of the selected wars, narrowed to the family's side
+"""
+from datetime import datetime
+
+
+WAR_ATTACK_INDEXES = [
+    [('war_id', 1), ('clan', 1)],
+]
+
+# enough of a `clan_wars` document to select wars and tell which ones still need their rows written
+WAR_KEY_PROJECTION = {
+    '_id': 0,
+    'data.clan.tag': 1,
+    'data.opponent.tag': 1,
+    'data.preparationStartTime': 1,
+    'data.state': 1,
+}
+
+# prep durations only a friendly war can have (matches `coc.ClanWar.type`)
+FRIENDLY_PREP_SECONDS = {5 * 60, 15 * 60, 30 * 60, 60 * 60, 2 * 60 * 60, 4 * 60 * 60, 6 * 60 * 60, 8 * 60 * 60, 12 * 60 * 60, 16 * 60 * 60, 20 * 60 * 60}
+
+STAR_FIELDS = {0: 'zero_stars', 1: 'one_stars', 2: 'two_stars', 3: 'total_triples'}
+
+
+def parse_time(value: str) -> datetime:
+    return datetime.strptime(value, '%Y%m%dT%H%M%S.%fZ')
+
+
+def war_key(data: dict) -> str:
+    """Same war from either side's document gets the same key"""
+    clan_tag, opponent_tag = sorted([data['clan']['tag'], data['opponent']['tag']])
+    return f"{clan_tag}v{opponent_tag}-{data['preparationStartTime']}"
+
+
+def prep_seconds(data: dict) -> int | None:
+    if not data.get('startTime') or not data.get('preparationStartTime'):
+        return None
+    return int((parse_time(data['startTime']) - parse_time(data['preparationStartTime'])).total_seconds())
+
+
+def war_type(data: dict) -> str | None:
+    if data.get('tag'):
+        return 'cwl'
+    prep = prep_seconds(data)
+    if prep is None:
+        return None
+    # a timedelta's `.seconds` (what coc compares) wraps at a day
+    return 'friendly' if prep % (24 * 60 * 60) in FRIENDLY_PREP_SECONDS else 'random'
+
+
+def attack_rows(data: dict) -> list[dict]:
+    """One row per attack, from both sides of a raw war (a marker row, with no clan, for an ended war without attacks)"""
+    key = war_key(data)
+    type = war_type(data)
+    prep = prep_seconds(data)
+    ended = data.get('state') == 'warEnded'
+    rows = []
+    for side, other in (('clan', 'opponent'), ('opponent', 'clan')):
+        clan = data.get(side) or {}
+        defender_th = {member['tag']: member.get('townhallLevel') for member in (data.get(other) or {}).get('members', [])}
+        for member in clan.get('members', []):
+            for attack in member.get('attacks', []):
+                rows.append(
+                    {
+                        '_id': f"{key}|{attack.get('order')}",
+                        'war_id': key,
+                        'clan': clan.get('tag'),
+                        'tag': member['tag'],
+                        'name': member.get('name'),
+                        'townhall': member.get('townhallLevel'),
+                        'defender_tag': attack.get('defenderTag'),
+                        'defender_townhall': defender_th.get(attack.get('defenderTag')),
+                        'stars': attack.get('stars', 0),
+                        'destruction': attack.get('destructionPercentage', 0),
+                        'attack_order': attack.get('order'),
+                        'war_type': type,
+                        'prep_time': prep,
+                        'preparation_start': data.get('preparationStartTime'),
+                        'ended': ended,
+                    }
+                )
+    if ended and not rows:
+        rows.append({'_id': f'{key}|none', 'war_id': key, 'ended': True})
+    return rows
+
+
+def build_war_attack_match(war_ids: list[str], clan_tags: list[str], war_types: list[str], th_filter: str = 'all'):
+    """`th_filter` is 'all', 'equalthonly', an attacker townhall ('16') or a matchup ('16v15')"""
+    match = {
+        'war_id': {'$in': list(war_ids)},
+        'clan': {'$in': list(clan_tags)},
+        'war_type': {'$in': list(war_types)},
+    }
+    if th_filter == 'equalthonly':
+        match['$expr'] = {'$eq': ['$townhall', '$defender_townhall']}
+    elif 'v' in th_filter:
+        townhall, defender_townhall = th_filter.split('v')
+        match['townhall'] = int(townhall)
+        match['defender_townhall'] = int(defender_townhall)
+    elif th_filter != 'all':
+        match['townhall'] = int(th_filter)
+    return match
+
+
+def _star_bucket(stars: int):
+    return {'$sum': {'$cond': [{'$eq': ['$stars', stars]}, 1, 0]}}
+
+
+def build_war_attack_pipeline(match: dict):
+    """Per attacker counts, name and townhall are the attacker's latest"""
+    return [
+        {'$match': match},
+        {'$sort': {'preparation_start': 1}},
+        {
+            '$group': {
+                '_id': '$tag',
+                'name': {'$last': '$name'},
+                'townhall': {'$last': '$townhall'},
+                'num_hits': {'$sum': 1},
+                'total_stars': {'$sum': '$stars'},
+                'total_destruction': {'$sum': '$destruction'},
+                **{field: _star_bucket(stars) for stars, field in STAR_FIELDS.items()},
+            }
+        },
+    ]
@@ -31,7 +31,7 @@ def button_generator(bot: CustomClient, button_id: str, current_page: int = 0, m
         disnake.ui.Button(
             label=f'{current_page + 1}/{max_page}',
             style=disnake.ButtonStyle.grey,
-            custom_id=f'{button_id}:page={current_page if current_page != 0 else -2}',
+            custom_id=f'{button_id}:page={-current_page - 2}',
             disabled=False,
         ),
         disnake.ui.Button(
@@ -0,0 +1,17 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def bounded_gather(items: Iterable[T], func: Callable[[T], Awaitable[R]], limit: int = 10, return_exceptions: bool = True) -> list[R]:
+    """Run `func` over `items` with at most `limit` calls in flight, results in input order"""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions)
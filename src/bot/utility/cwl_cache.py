@@ -0,0 +1,115 @@
+"""CWL league groups and league wars shared by every command in the process.
+
+A group is stored per (season, clan tag) for every clan in it, so the clans of one group share a
+single fetch, and a clan that isn't in CWL is remembered as such for the same TTL. Wars are stored by
+war tag: an ended war never changes and is kept until the season is long over, a war in preparation or
+in progress expires after `war_ttl`. Missing wars are fetched concurrently, and concurrent requests for
+the same group or war wait on one fetch.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable, Iterable
+
+from utility.concurrency import bounded_gather
+
+
+# a CWL season lasts ~10 days, ended wars are kept past it so late lookups of the season still hit
+ENDED_WAR_TTL = 14 * 24 * 60 * 60
+
+# tag the API gives rounds that aren't drawn yet
+UNDRAWN_WAR_TAG = '#0'
+
+
+class CWLCache:
+    def __init__(
+        self,
+        coc_client,
+        group_ttl: int = 300,
+        war_ttl: int = 60,
+        concurrency: int = 8,
+        not_found: tuple[type[BaseException], ...] = (),
+    ):
+        self.coc_client = coc_client
+        self.group_ttl = group_ttl
+        self.war_ttl = war_ttl
+        self.concurrency = concurrency
+        # errors that mean "not in CWL", cached like a group instead of refetched on every call
+        self.not_found = not_found
+        self._groups: dict[tuple[str, str], tuple[float, object]] = {}
+        self._wars: dict[str, tuple[float, object]] = {}
+        self._pending: dict[Hashable, asyncio.Future] = {}
+
+    @classmethod
+    def from_config(cls, config, coc_client, not_found: tuple[type[BaseException], ...] = ()) -> 'CWLCache':
+        return cls(
+            coc_client=coc_client,
+            group_ttl=config.cwl_group_ttl,
+            war_ttl=config.cwl_war_ttl,
+            not_found=not_found,
+        )
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # one caller giving up doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _fresh(entry: tuple[float, object] | None):
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry
+
+    async def get_group(self, clan_tag: str, season: str):
+        """The league group `clan_tag` is in, raises (one of `not_found`) if it isn't in one"""
+        entry = self._fresh(self._groups.get((season, clan_tag)))
+        if entry is None:
+            entry = await self._single_flight(('group', season, clan_tag), lambda: self._fetch_group(clan_tag, season))
+        group = entry[1]
+        if isinstance(group, BaseException):
+            raise group
+        return group
+
+    async def _fetch_group(self, clan_tag: str, season: str):
+        try:
+            group = await self.coc_client.get_league_group(clan_tag)
+        except self.not_found as e:
+            group = e
+        self.prune()
+        entry = (time.monotonic() + self.group_ttl, group)
+        # stored under the season asked for, a group from last season still answers for this one until the spin
+        clan_tags = {clan.tag for clan in getattr(group, 'clans', [])} | {clan_tag}
+        for tag in clan_tags:
+            self._groups[(season, tag)] = entry
+        return entry
+
+    async def get_war(self, war_tag: str):
+        entry = self._fresh(self._wars.get(war_tag))
+        if entry is None:
+            entry = await self._single_flight(('war', war_tag), lambda: self._fetch_war(war_tag))
+        return entry[1]
+
+    async def _fetch_war(self, war_tag: str):
+        war = await self.coc_client.get_league_war(war_tag)
+        ttl = ENDED_WAR_TTL if str(war.state) == 'warEnded' else self.war_ttl
+        entry = (time.monotonic() + ttl, war)
+        self._wars[war_tag] = entry
+        return entry
+
+    async def get_wars(self, war_tags: Iterable[str]) -> dict[str, object]:
+        """war tag -> war for every drawn war in `war_tags`, wars that failed to fetch are left out"""
+        war_tags = list(dict.fromkeys(tag for tag in war_tags if tag != UNDRAWN_WAR_TAG))
+        wars = await bounded_gather(war_tags, self.get_war, limit=self.concurrency)
+        return {tag: war for tag, war in zip(war_tags, wars) if not isinstance(war, BaseException)}
+
+    async def get_group_wars(self, group) -> dict[str, object]:
+        return await self.get_wars(tag for round in group.rounds for tag in round)
+
+    def prune(self):
+        now = time.monotonic()
+        for cache in (self._groups, self._wars):
+            for key in [key for key, (expires, _) in cache.items() if expires < now]:
+                del cache[key]
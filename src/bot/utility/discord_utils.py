@@ -7,10 +7,9 @@ import disnake
 import motor.motor_asyncio
 from disnake.ext import commands
 from expiring_dict import ExpiringDict
-from aiocache import SimpleMemoryCache, cached
 
 from exceptions.CustomExceptions import *
-from main import config
+from app import config
 
 
 db_client = motor.motor_asyncio.AsyncIOMotorClient(config.static_mongodb)
@@ -235,8 +234,7 @@ cache_store = ExpiringDict(ttl=300)
 
 def register_button(command_name: str, parser: str, ephemeral: bool = False, no_embed: bool = False, pagination: bool = False):
     def decorator(func: Callable[..., None]) -> Callable[..., None]:
-        if pagination:
-            func = cached(ttl=300, cache=SimpleMemoryCache)(func)
+        # renders (every page of a paginated one included) are cached by button_logic, see utility/button_cache.py
         registered_functions[command_name] = (func, parser, ephemeral, no_embed, pagination)
         return func
 
@@ -5,7 +5,6 @@ import random
 from datetime import datetime
 from typing import Callable, List
 
-import aiohttp
 import coc
 import disnake
 import pendulum as pend
@@ -15,6 +14,7 @@ from pytz import utc
 
 from utility.clash.other import league_to_emoji
 from utility.constants import SUPER_SCRIPTS, placeholders, war_leagues
+from utility.http import get_http_client
 
 
 IMAGE_CACHE = ExpiringDict()
@@ -380,10 +380,8 @@ def smart_convert_seconds(seconds, granularity=2):
 async def download_image(url: str):
     cached = IMAGE_CACHE.get(url)
     if cached is None:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                image_data = await response.read()
-            await session.close()
+        async with get_http_client().get(url) as response:
+            image_data = await response.read()
         image_bytes: bytes = image_data
         IMAGE_CACHE.ttl(url, image_bytes, 3600 * 4)
     else:
@@ -425,10 +423,9 @@ async def safe_run(func: Callable, **kwargs):
 async def shorten_link(url: str):
     api_url = 'https://api.clashk.ing/shortner'
     params = {'url': url}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(api_url, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get('url')
-            else:
-                return None
+    async with get_http_client().get(api_url, params=params) as response:
+        if response.status == 200:
+            data = await response.json()
+            return data.get('url')
+        else:
+            return None
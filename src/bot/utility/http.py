@@ -0,0 +1,144 @@
+"""Shared, pooled HTTP client for every outbound call the bot makes.
+
+One aiohttp session (and one TCP connector) lives for the whole process so keep-alive
+connections, TLS sessions and DNS lookups are reused instead of being set up per call.
+The instance is created on CustomClient at startup; helpers without a bot handle use
+`get_http_client()`.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import aiohttp
+
+from background.metrics_server import observe_http_request
+
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+_http_client: 'HTTPClient | None' = None
+
+
+class HTTPClient:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: int = 30,
+        total_timeout: float = 30,
+        connect_timeout: float = 10,
+        retries: int = 2,
+        retry_backoff: float = 0.5,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self._session: aiohttp.ClientSession | None = None
+        self.requests = 0
+        self.retried = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'HTTPClient':
+        return cls(
+            limit=config.http_pool_limit,
+            limit_per_host=config.http_pool_limit_per_host,
+            total_timeout=config.http_total_timeout,
+            connect_timeout=config.http_connect_timeout,
+            retries=config.http_retries,
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # created lazily so it binds to the running loop, and recreated if something closed it
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def stats(self) -> dict:
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        in_use = len(getattr(connector, '_acquired', ())) if connector else 0
+        idle = sum(len(conns) for conns in getattr(connector, '_conns', {}).values()) if connector else 0
+        return {
+            'in_use': in_use,
+            'idle': idle,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'requests': self.requests,
+            'retried': self.retried,
+            'errors': self.errors,
+        }
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, retries: int | None = None, **kwargs):
+        """`async with client.request(...) as response:`, retrying idempotent calls on connection errors and 5xx"""
+        method = method.upper()
+        retries = self.retries if retries is None else retries
+        if method not in IDEMPOTENT_METHODS:
+            retries = 0
+        host = urlparse(url).hostname or 'unknown'
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            self.requests += 1
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.errors += 1
+                observe_http_request(host=host, status='error', seconds=time.perf_counter() - start, pool_stats=self.stats())
+                if attempt >= retries:
+                    raise
+            else:
+                observe_http_request(host=host, status=str(response.status), seconds=time.perf_counter() - start, pool_stats=self.stats())
+                if response.status < 500 or attempt >= retries:
+                    break
+                response.release()
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def create_http_client(config) -> HTTPClient:
+    global _http_client
+    _http_client = HTTPClient.from_config(config)
+    return _http_client
+
+
+def get_http_client() -> HTTPClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = HTTPClient()
+    return _http_client
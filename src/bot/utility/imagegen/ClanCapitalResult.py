@@ -3,64 +3,78 @@ import io
 import coc
 import disnake
 import pytz
-from PIL import Image, ImageDraw, ImageFont
-
-
-utc = pytz.utc
-import asyncio
-import concurrent.futures
-from io import BytesIO
-
-import aiohttp
 from coc.raid import RaidLogEntry
+from PIL import ImageDraw
 
 from utility.clash.capital import calc_raid_medals
+from utility.imagegen.assets import get_background, get_badge_cache, get_font, open_badge
+from utility.render import encode_image, get_render_pool
 
 
-async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
-
-    background = Image.open('utility/imagegen/raidweek.png')
-    clan_name = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 30)
-    total_medal_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 60)
-    boxes_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 30)
-
-    split_medal_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 25)
-
-    draw = ImageDraw.Draw(background)
-
-    async def fetch(url, session):
-        async with session.get(url) as response:
-            image_data = BytesIO(await response.read())
-            return image_data
+utc = pytz.utc
 
-    tasks = []
-    async with aiohttp.ClientSession() as session:
-        tasks.append(fetch(clan.badge.medium, session))
-        responses = await asyncio.gather(*tasks)
-        await session.close()
 
-    for count, image_data in enumerate(responses):
-        badge = Image.open(image_data)
-        background.paste(badge, (1125, 135), badge.convert('RGBA'))
+async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
+    badge = await get_badge_cache().fetch(clan.badge.medium)
 
     if raid_entry.offensive_reward == 0:
         off_medal_reward = calc_raid_medals(raid_entry.attack_log)
     else:
         off_medal_reward = raid_entry.offensive_reward * 6
 
+    image = await get_render_pool().run(
+        draw_raid_result,
+        kind='raid_result',
+        clan_name=clan.name,
+        off_medal_reward=off_medal_reward,
+        defensive_reward=raid_entry.defensive_reward,
+        total_loot=raid_entry.total_loot,
+        raids_completed=len([log for log in raid_entry.attack_log if log.destroyed_district_count == log.district_count]),
+        attack_count=raid_entry.attack_count,
+        destroyed_district_count=raid_entry.destroyed_district_count,
+        start_date=str(raid_entry.start_time.time.date()),
+        badge=badge,
+    )
+    return disnake.File(fp=io.BytesIO(image), filename='filename.png')
+
+
+def draw_raid_result(
+    clan_name: str,
+    off_medal_reward: int,
+    defensive_reward: int,
+    total_loot: int,
+    raids_completed: int,
+    attack_count: int,
+    destroyed_district_count: int,
+    start_date: str,
+    badge: bytes,
+) -> bytes:
+    """Runs in a render worker, returns the finished png"""
+    background = get_background('utility/imagegen/raidweek.png')
+    clan_name_font = get_font('utility/imagegen/SCmagic.ttf', 30)
+    total_medal_font = get_font('utility/imagegen/SCmagic.ttf', 60)
+    boxes_font = get_font('utility/imagegen/SCmagic.ttf', 30)
+
+    split_medal_font = get_font('utility/imagegen/SCmagic.ttf', 25)
+
+    draw = ImageDraw.Draw(background)
+
+    badge = open_badge(badge)
+    background.paste(badge, (1125, 135), badge.convert('RGBA'))
+
     stroke = 2
     draw.text(
         (1225, 117),
-        f'{clan.name}',
+        f'{clan_name}',
         anchor='mm',
         fill=(255, 255, 255),
         stroke_width=stroke,
         stroke_fill=(0, 0, 0),
-        font=clan_name,
+        font=clan_name_font,
     )
     draw.text(
         (750, 250),
-        f'{off_medal_reward + raid_entry.defensive_reward}',
+        f'{off_medal_reward + defensive_reward}',
         anchor='mm',
         fill=(255, 255, 255),
         stroke_width=4,
@@ -70,7 +84,7 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
 
     draw.text(
         (155, 585),
-        f'{raid_entry.total_loot}',
+        f'{total_loot}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
@@ -79,7 +93,7 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
     )
     draw.text(
         (870, 585),
-        f'{len([log for log in raid_entry.attack_log if log.destroyed_district_count == log.district_count])}',
+        f'{raids_completed}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
@@ -89,7 +103,7 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
 
     draw.text(
         (155, 817),
-        f'{raid_entry.attack_count}',
+        f'{attack_count}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
@@ -98,7 +112,7 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
     )
     draw.text(
         (870, 817),
-        f'{raid_entry.destroyed_district_count}',
+        f'{destroyed_district_count}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
@@ -117,7 +131,7 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
     )
     draw.text(
         (1245, 370),
-        f'{raid_entry.defensive_reward}',
+        f'{defensive_reward}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
@@ -127,27 +141,12 @@ async def generate_raid_result_image(raid_entry: RaidLogEntry, clan: coc.Clan):
 
     draw.text(
         (25, 35),
-        f'{raid_entry.start_time.time.date()}',
+        f'{start_date}',
         anchor='lm',
         fill=(255, 255, 255),
         stroke_width=stroke,
         stroke_fill=(0, 0, 0),
-        font=clan_name,
+        font=clan_name_font,
     )
 
-    def save_im(background):
-        # background.show()
-        temp = io.BytesIO()
-        # background = background.resize((869, 637))
-        # background = background.resize((1036, 673))
-        background.save(temp, format='png', compress_level=1)
-        temp.seek(0)
-        file = disnake.File(fp=temp, filename='filename.png')
-        temp.close()
-        return file
-
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        loop = asyncio.get_event_loop()
-        file = await loop.run_in_executor(pool, save_im, background)
-
-    return file
+    return encode_image(background, format='png', compress_level=1)
@@ -1,18 +1,16 @@
+import asyncio
 import io
 
 import coc
 import disnake
 import pytz
-from PIL import Image, ImageDraw, ImageFont
-
+from PIL import ImageDraw
 
-utc = pytz.utc
-import asyncio
-import concurrent.futures
-from io import BytesIO
+from utility.imagegen.assets import get_background, get_badge_cache, get_font, open_badge
+from utility.render import encode_image, get_render_pool
 
-import aiohttp
 
+utc = pytz.utc
 
 th_to_xp = {1: 1, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 3, 8: 4, 9: 5, 10: 7, 11: 7, 12: 10, 13: 11, 14: 11, 15: 12, 16: 13, 17: 14}
 
@@ -55,30 +53,65 @@ async def generate_war_result_image(war: coc.ClanWar):
         sixty_xp = 25
         won_xp += 25
 
-    background = Image.open('utility/imagegen/warbkpng.png')
-    clan_name = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 45)
-    result_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 65)
-    score_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 70)
-    total_xp_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 35)
-    box_xp_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 25)
-    destruction_font = ImageFont.truetype('utility/imagegen/SCmagic.ttf', 25)
+    badge_cache = get_badge_cache()
+    badges = await asyncio.gather(badge_cache.fetch(war.clan.badge.medium), badge_cache.fetch(war.opponent.badge.medium))
+
+    image = await get_render_pool().run(
+        draw_war_result,
+        kind='war_result',
+        clan_name=war.clan.name,
+        opponent_name=war.opponent.name,
+        clan_stars=war.clan.stars,
+        opponent_stars=war.opponent.stars,
+        clan_destruction=war.clan.destruction,
+        opponent_destruction=war.opponent.destruction,
+        result_text=result_text,
+        won_xp=won_xp,
+        possible_xp=possible_xp,
+        win_xp=win_xp,
+        actual_war_xp=actual_war_xp,
+        possible_war_xp=possible_war_xp,
+        forty_xp=forty_xp,
+        sixty_xp=sixty_xp,
+        forty_percent=forty_percent,
+        sixty_percent=sixty_percent,
+        badges=list(badges),
+    )
+    return disnake.File(fp=io.BytesIO(image), filename='filename.png')
+
+
+def draw_war_result(
+    clan_name: str,
+    opponent_name: str,
+    clan_stars: int,
+    opponent_stars: int,
+    clan_destruction: float,
+    opponent_destruction: float,
+    result_text: str,
+    won_xp: int,
+    possible_xp: int,
+    win_xp: int,
+    actual_war_xp: int,
+    possible_war_xp: int,
+    forty_xp: int,
+    sixty_xp: int,
+    forty_percent: int,
+    sixty_percent: int,
+    badges: list[bytes],
+) -> bytes:
+    """Runs in a render worker, returns the finished png"""
+    background = get_background('utility/imagegen/warbkpng.png')
+    clan_name_font = get_font('utility/imagegen/SCmagic.ttf', 45)
+    result_font = get_font('utility/imagegen/SCmagic.ttf', 65)
+    score_font = get_font('utility/imagegen/SCmagic.ttf', 70)
+    total_xp_font = get_font('utility/imagegen/SCmagic.ttf', 35)
+    box_xp_font = get_font('utility/imagegen/SCmagic.ttf', 25)
+    destruction_font = get_font('utility/imagegen/SCmagic.ttf', 25)
 
     draw = ImageDraw.Draw(background)
 
-    async def fetch(url, session):
-        async with session.get(url) as response:
-            image_data = BytesIO(await response.read())
-            return image_data
-
-    tasks = []
-    async with aiohttp.ClientSession() as session:
-        tasks.append(fetch(war.clan.badge.medium, session))
-        tasks.append(fetch(war.opponent.badge.medium, session))
-        responses = await asyncio.gather(*tasks)
-        await session.close()
-
-    for count, image_data in enumerate(responses):
-        badge = Image.open(image_data)
+    for count, image_data in enumerate(badges):
+        badge = open_badge(image_data)
         if count == 0:
             background.paste(badge, (850, 50), badge.convert('RGBA'))
         else:
@@ -87,21 +120,21 @@ async def generate_war_result_image(war: coc.ClanWar):
     stroke = 4
     draw.text(
         (800, 130),
-        f'{war.clan.name}',
+        f'{clan_name}',
         anchor='rm',
         fill=(255, 255, 204),
         stroke_width=stroke,
         stroke_fill=(0, 0, 0),
-        font=clan_name,
+        font=clan_name_font,
     )
     draw.text(
         (1250, 130),
-        f'{war.opponent.name}',
+        f'{opponent_name}',
         anchor='lm',
         fill=(255, 255, 204),
         stroke_width=stroke,
         stroke_fill=(0, 0, 0),
-        font=clan_name,
+        font=clan_name_font,
     )
 
     draw.text(
@@ -115,7 +148,7 @@ async def generate_war_result_image(war: coc.ClanWar):
     )
     draw.text(
         (1040, 380),
-        f'{war.clan.stars} - {war.opponent.stars}',
+        f'{clan_stars} - {opponent_stars}',
         anchor='mm',
         stroke_width=stroke,
         stroke_fill=(0, 0, 0),
@@ -181,7 +214,7 @@ async def generate_war_result_image(war: coc.ClanWar):
 
     draw.text(
         (850, 452),
-        f"{format(round(war.clan.destruction, 2), '.2f')}%",
+        f"{format(round(clan_destruction, 2), '.2f')}%",
         anchor='rm',
         fill=(255, 255, 204),
         stroke_width=3,
@@ -190,7 +223,7 @@ async def generate_war_result_image(war: coc.ClanWar):
     )
     draw.text(
         (1250, 452),
-        f"{format(round(war.opponent.destruction, 2), '.2f')}%",
+        f"{format(round(opponent_destruction, 2), '.2f')}%",
         anchor='lm',
         fill=(255, 255, 204),
         stroke_width=3,
@@ -208,19 +241,4 @@ async def generate_war_result_image(war: coc.ClanWar):
         font=total_xp_font,
     )
 
-    def save_im(background):
-        # background.show()
-        temp = io.BytesIO()
-        background = background.resize((725, 471))
-        # background = background.resize((1036, 673))
-        background.save(temp, format='png', compress_level=1)
-        temp.seek(0)
-        file = disnake.File(fp=temp, filename='filename.png')
-        temp.close()
-        return file
-
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        loop = asyncio.get_event_loop()
-        file = await loop.run_in_executor(pool, save_im, background)
-
-    return file
+    return encode_image(background, size=(725, 471), format='png', compress_level=1)
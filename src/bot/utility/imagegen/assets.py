@@ -0,0 +1,147 @@
+"""Shared asset cache for the image generators.
+
+Backgrounds and fonts are loaded once per process (render workers included) instead of on every
+image. Clan badges are downloaded once and kept in a byte-bounded LRU keyed by URL, backed by a
+disk spill directory, so a badge is only fetched over HTTP the first time it's seen.
+"""
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import tempfile
+from collections import OrderedDict
+
+from PIL import Image, ImageFont
+
+from utility.http import get_http_client
+
+
+_badge_cache: 'BadgeCache | None' = None
+
+
+@functools.lru_cache(maxsize=32)
+def _load_background(path: str) -> Image.Image:
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def get_background(path: str) -> Image.Image:
+    """A private copy of a cached background, safe to draw on"""
+    return _load_background(path).copy()
+
+
+@functools.lru_cache(maxsize=128)
+def get_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+@functools.lru_cache(maxsize=256)
+def _decode_badge(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def open_badge(data: bytes) -> Image.Image:
+    """Decoded badge, cached per process by content, returned as a copy so callers can modify it"""
+    return _decode_badge(data).copy()
+
+
+class BadgeCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, spill_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), 'badge-cache')
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'BadgeCache':
+        return cls(max_bytes=config.badge_cache_bytes, spill_dir=config.badge_cache_dir)
+
+    def _spill_path(self, url: str) -> str:
+        return os.path.join(self.spill_dir, hashlib.sha1(url.encode()).hexdigest())
+
+    def get(self, url: str) -> bytes | None:
+        """From memory only, `fetch` falls back to the spill directory and then HTTP"""
+        data = self._entries.get(url)
+        if data is not None:
+            self._entries.move_to_end(url)
+            self.hits += 1
+        return data
+
+    def put(self, url: str, data: bytes):
+        if url in self._entries:
+            self.size -= len(self._entries.pop(url))
+        self._entries[url] = data
+        self.size += len(data)
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, old_data = self._entries.popitem(last=False)
+            self.size -= len(old_data)
+
+    def _read_spill(self, url: str) -> bytes | None:
+        try:
+            with open(self._spill_path(url), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _spill(self, url: str, data: bytes):
+        path = self._spill_path(url)
+        if os.path.exists(path):
+            return
+        try:
+            temp = f'{path}.tmp'
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            pass
+
+    async def fetch(self, url: str) -> bytes:
+        data = self.get(url)
+        if data is not None:
+            return data
+        # disk reads & writes run off the event loop
+        data = await asyncio.to_thread(self._read_spill, url)
+        if data is not None:
+            self.disk_hits += 1
+            self.put(url, data)
+            return data
+        self.misses += 1
+        async with get_http_client().get(url) as response:
+            data = await response.read()
+        if response.status == 200:
+            self.put(url, data)
+            # write-through, so an evicted badge (or one from before a restart) comes back from disk
+            await asyncio.to_thread(self._spill, url, data)
+        return data
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
+
+
+def create_badge_cache(config) -> BadgeCache:
+    global _badge_cache
+    _badge_cache = BadgeCache.from_config(config)
+    return _badge_cache
+
+
+def get_badge_cache() -> BadgeCache:
+    global _badge_cache
+    if _badge_cache is None:
+        _badge_cache = BadgeCache()
+    return _badge_cache
@@ -63,7 +63,7 @@ async def testthis(self, ctx: disnake.ApplicationCommandInteraction, clan: str):
     tag = clan
     try:
         base_clan = await self.bot.getClan(clan_tag=tag)
-        cwl: coc.ClanWarLeagueGroup = await self.bot.coc_client.get_league_group(clan_tag=base_clan.tag)
+        cwl: coc.ClanWarLeagueGroup = await self.bot.cwl_cache.get_group(base_clan.tag, season=self.bot.gen_season_date())
     except:
         return await ctx.send(content='Clan not in cwl')
 
@@ -81,10 +81,12 @@ async def testthis(self, ctx: disnake.ApplicationCommandInteraction, clan: str):
     dest_dict = defaultdict(int)
     tag_to_obj = defaultdict(str)
 
+    wars = await self.bot.cwl_cache.get_group_wars(cwl)
     for round in cwl.rounds:
         for war_tag in round:
-            war = await self.bot.coc_client.get_league_war(war_tag)
-            war: coc.ClanWar
+            war: coc.ClanWar = wars.get(war_tag)
+            if war is None:
+                continue
             if str(war.status) == 'won':
                 star_dict[war.clan.tag] += 10
             elif str(war.status) == 'lost':
@@ -118,10 +120,9 @@ async def testthis(self, ctx: disnake.ApplicationCommandInteraction, clan: str):
                 return image_data
 
         tasks = []
-        async with aiohttp.ClientSession() as session:
-            tasks.append(fetch(clan.badge.medium, session))
-            responses = await asyncio.gather(*tasks)
-            await session.close()
+        session = get_http_client()
+        tasks.append(fetch(clan.badge.medium, session))
+        responses = await asyncio.gather(*tasks)
 
         for image_data in responses:
             badge = Image.open(image_data)
@@ -0,0 +1,117 @@
+import asyncio
+
+from PIL import Image, ImageDraw
+
+from utility.imagegen.assets import get_badge_cache, get_font, open_badge
+from utility.render import encode_image, get_render_pool
+from utility.table_cache import get_table_cache, table_key
+
+
+FONT_PATH = 'utility/imagegen/SCmagic.ttf'
+
+PADDING = 20
+TITLE_HEIGHT = 90
+LOGO_SIZE = 70
+HEADER_HEIGHT = 50
+ROW_HEIGHT = 44
+BADGE_SIZE = 34
+COLUMN_GAP = 30
+
+BACKGROUND = (30, 33, 40)
+TITLE_BACKGROUND = (20, 22, 27)
+HEADER_BACKGROUND = (52, 56, 66)
+ROW_BACKGROUNDS = [(40, 43, 52), (46, 50, 60)]
+TEXT_COLOR = (255, 255, 255)
+HEADER_COLOR = (255, 255, 204)
+
+
+async def table_image(columns: list[str], rows: list[list], title: str, badges: list[str | None] = None, logo: str | None = None) -> bytes:
+    """png of a leaderboard table, `badges` is one image url (or None) per row, shown in front of the first column"""
+    badges = badges or []
+    table = {'columns': columns, 'rows': [[str(value) for value in row] for row in rows], 'badges': badges, 'logo': logo, 'title': title}
+    key = table_key(table)
+    table_cache = get_table_cache()
+    # disk reads & writes run off the event loop
+    image = await asyncio.to_thread(table_cache.get, key)
+    if image is not None:
+        return image
+
+    badge_cache = get_badge_cache()
+    urls = list({url for url in badges + [logo] if url})
+    fetched = await asyncio.gather(*(badge_cache.fetch(url) for url in urls), return_exceptions=True)
+    images = {url: data for url, data in zip(urls, fetched) if isinstance(data, bytes)}
+
+    image = await get_render_pool().run(
+        draw_table,
+        kind='table',
+        columns=columns,
+        rows=table['rows'],
+        title=title,
+        badges=[images.get(url) for url in badges],
+        logo=images.get(logo),
+    )
+    await asyncio.to_thread(table_cache.put, key, image)
+    return image
+
+
+def draw_table(columns: list[str], rows: list[list[str]], title: str, badges: list[bytes | None], logo: bytes | None) -> bytes:
+    """Runs in a render worker, returns the finished png"""
+    title_font = get_font(FONT_PATH, 40)
+    header_font = get_font(FONT_PATH, 24)
+    row_font = get_font(FONT_PATH, 22)
+
+    has_badges = any(badges)
+    badge_width = BADGE_SIZE + 10 if has_badges else 0
+    widths = []
+    for count, column in enumerate(columns):
+        cells = [row[count] for row in rows if count < len(row)]
+        width = max([header_font.getlength(column)] + [row_font.getlength(cell) for cell in cells])
+        widths.append(int(width) + (badge_width if count == 0 else 0))
+
+    table_width = sum(widths) + COLUMN_GAP * (len(columns) - 1) + PADDING * 2
+    title_width = int(title_font.getlength(title)) + PADDING * 2 + (LOGO_SIZE + PADDING if logo else 0)
+    width = max(table_width, title_width)
+    height = TITLE_HEIGHT + HEADER_HEIGHT + ROW_HEIGHT * len(rows) + PADDING
+
+    image = Image.new('RGBA', (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle((0, 0, width, TITLE_HEIGHT), fill=TITLE_BACKGROUND)
+    title_x = PADDING
+    if logo:
+        badge = open_badge(logo).convert('RGBA').resize((LOGO_SIZE, LOGO_SIZE))
+        image.paste(badge, (PADDING, (TITLE_HEIGHT - LOGO_SIZE) // 2), badge)
+        title_x += LOGO_SIZE + PADDING
+    draw.text((title_x, TITLE_HEIGHT // 2), title, anchor='lm', fill=TEXT_COLOR, stroke_width=2, stroke_fill=(0, 0, 0), font=title_font)
+
+    # first column is left aligned (names), the rest are centered numbers
+    lefts = []
+    x = PADDING
+    for column_width in widths:
+        lefts.append(x)
+        x += column_width + COLUMN_GAP
+
+    top = TITLE_HEIGHT
+    draw.rectangle((0, top, width, top + HEADER_HEIGHT), fill=HEADER_BACKGROUND)
+    for count, column in enumerate(columns):
+        _draw_cell(draw, column, count, lefts[count], widths[count], top + HEADER_HEIGHT // 2, badge_width, header_font, HEADER_COLOR)
+
+    top += HEADER_HEIGHT
+    for row_number, row in enumerate(rows):
+        draw.rectangle((0, top, width, top + ROW_HEIGHT), fill=ROW_BACKGROUNDS[row_number % 2])
+        badge_data = badges[row_number] if row_number < len(badges) else None
+        if badge_data:
+            badge = open_badge(badge_data).convert('RGBA').resize((BADGE_SIZE, BADGE_SIZE))
+            image.paste(badge, (lefts[0], top + (ROW_HEIGHT - BADGE_SIZE) // 2), badge)
+        for count, cell in enumerate(row[: len(columns)]):
+            _draw_cell(draw, cell, count, lefts[count], widths[count], top + ROW_HEIGHT // 2, badge_width, row_font, TEXT_COLOR)
+        top += ROW_HEIGHT
+
+    return encode_image(image)
+
+
+def _draw_cell(draw: ImageDraw.ImageDraw, text: str, column: int, left: int, width: int, middle: int, badge_width: int, font, fill):
+    if column == 0:
+        draw.text((left + badge_width, middle), text, anchor='lm', fill=fill, font=font)
+    else:
+        draw.text((left + width // 2, middle), text, anchor='mm', fill=fill, font=font)
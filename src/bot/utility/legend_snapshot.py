@@ -0,0 +1,94 @@
+"""Global legend league numbers: trophy histogram, rank cutoffs and the lowest rank.
+
+They are the same for every guild, so they are computed once from `legend_rankings` (one `$facet`
+pass instead of a bucket aggregation, a cutoff query and a "lowest rank" sort per click) and stored
+as a single document. One cluster rebuilds it (under a redis lock) once it is `ttl` old, every
+process keeps the document in memory and re-reads it every `RELOAD_INTERVAL` seconds.
+"""
+import time
+
+
+SNAPSHOT_ID = 'legend-snapshot'
+
+LOCK_KEY = 'legend-snapshot-lock'
+
+RELOAD_INTERVAL = 60
+
+BUCKET_BOUNDARIES = [4500, 4600, 4700, 4800, 4900, 5000, 5100, 5200, 5300, 5400, 5500, 5600, 5700, 5800, 5900, 6000, 6100, 6200, 6300, 6400, 6500, 8500]
+
+CUTOFF_RANKS = [1, 5, 25, 50, 100, 200, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000]
+
+
+def snapshot_pipeline() -> list[dict]:
+    return [
+        {
+            '$facet': {
+                'buckets': [
+                    {
+                        '$bucket': {
+                            'groupBy': '$trophies',
+                            'boundaries': BUCKET_BOUNDARIES,
+                            'default': 'out_of_bounds',
+                            'output': {'count': {'$sum': 1}},
+                        }
+                    }
+                ],
+                'cutoffs': [
+                    {'$match': {'rank': {'$in': CUTOFF_RANKS}}},
+                    {'$project': {'_id': 0, 'rank': 1, 'trophies': 1}},
+                    {'$sort': {'rank': 1}},
+                ],
+                'totals': [{'$group': {'_id': None, 'lowest_rank': {'$max': '$rank'}, 'total': {'$sum': 1}}}],
+            }
+        }
+    ]
+
+
+def snapshot_from_facets(facets: dict) -> dict:
+    totals = (facets.get('totals') or [{}])[0]
+    return {
+        'buckets': [{'trophies': bucket['_id'], 'count': bucket['count']} for bucket in facets.get('buckets', []) if bucket['_id'] != 'out_of_bounds'],
+        'cutoffs': [{'rank': cutoff['rank'], 'trophies': cutoff.get('trophies')} for cutoff in facets.get('cutoffs', [])],
+        'lowest_rank': totals.get('lowest_rank'),
+        'total': totals.get('total', 0),
+    }
+
+
+class LegendSnapshot:
+    def __init__(self, rankings, snapshots, redis, ttl: int = 600):
+        self.rankings = rankings
+        self.snapshots = snapshots
+        self.redis = redis
+        self.ttl = ttl
+        self._snapshot: dict | None = None
+        self._loaded_at = 0.0
+
+    @classmethod
+    def from_config(cls, config, rankings, snapshots, redis) -> 'LegendSnapshot':
+        return cls(rankings=rankings, snapshots=snapshots, redis=redis, ttl=config.legend_snapshot_ttl)
+
+    async def get(self) -> dict:
+        if self._snapshot is None or time.monotonic() - self._loaded_at > RELOAD_INTERVAL:
+            snapshot = await self.snapshots.find_one({'_id': SNAPSHOT_ID})
+            if snapshot is None:
+                snapshot = await self.build()
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+        return self._snapshot
+
+    async def build(self) -> dict:
+        facets = await self.rankings.aggregate(snapshot_pipeline()).to_list(length=1)
+        snapshot = snapshot_from_facets(facets[0] if facets else {}) | {'_id': SNAPSHOT_ID, 'built_at': int(time.time())}
+        await self.snapshots.replace_one({'_id': SNAPSHOT_ID}, snapshot, upsert=True)
+        self._snapshot = snapshot
+        self._loaded_at = time.monotonic()
+        return snapshot
+
+    async def refresh(self):
+        """Rebuild the stored snapshot once it is `ttl` old, only the cluster that takes the lock does"""
+        stored = await self.snapshots.find_one({'_id': SNAPSHOT_ID}, {'built_at': 1})
+        if stored is not None and stored.get('built_at', 0) > time.time() - self.ttl:
+            return
+        if not await self.redis.set(LOCK_KEY, 1, nx=True, ex=self.ttl):
+            return
+        await self.build()
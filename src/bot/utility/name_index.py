@@ -0,0 +1,217 @@
+"""In-process autocomplete over player & clan names.
+
+Names are split into normalized words (casefolded, accents stripped) and every word maps to the keys
+whose name holds it. Words are kept sorted, so a query word matches by bisecting to its prefix range,
+a multi-word query needs every word to prefix some word of the name. Shorter words sort first, so
+exact words rank ahead of longer ones, like Atlas `autocomplete` scored them.
+
+`NameIndex` holds the shards autocomplete reads: all players, legend players, clans per guild and
+family players per guild (built on first use from the guild's clans).
+"""
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Iterator
+
+
+WORD_SPLIT = re.compile(r'[\W_]+')
+
+# new words are insorted until this many are pending, past that the word list is rebuilt once
+MAX_PENDING_WORDS = 1000
+
+AUTOCOMPLETE_LIMIT = 25
+
+PLAYER_FIELDS = ('tag', 'name', 'th', 'clan', 'clan_name', 'league')
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize('NFKD', str(text or '')).casefold()
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def words(text: str) -> list[str]:
+    """Words of a name or query, names made only of symbols are one word"""
+    text = normalize(text)
+    split = [word for word in WORD_SPLIT.split(text) if word]
+    if not split:
+        stripped = ''.join(text.split())
+        return [stripped] if stripped else []
+    return split
+
+
+def matches(name: str, query: str) -> bool:
+    """Whether every word of `query` prefixes a word of `name`, the index's match rule"""
+    name_words = words(name)
+    return all(any(word.startswith(query_word) for word in name_words) for query_word in words(query))
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.entries: dict[str, dict] = {}
+        self._words: dict[str, list[str]] = {}
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._sorted: list[str] = []
+        self._pending: list[str] = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key: str):
+        return key in self.entries
+
+    def add(self, key: str, name: str, entry: dict):
+        if key in self.entries:
+            self.remove(key)
+        name_words = words(name)
+        self.entries[key] = entry
+        self._words[key] = name_words
+        for word in name_words:
+            postings = self._postings[word]
+            if not postings:
+                self._pending.append(word)
+            postings.add(key)
+
+    def remove(self, key: str):
+        self.entries.pop(key, None)
+        for word in self._words.pop(key, []):
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            postings.discard(key)
+            if not postings:
+                # stays in the sorted list until the next rebuild, lookups skip it
+                del self._postings[word]
+
+    def _sorted_words(self) -> list[str]:
+        if self._pending:
+            if len(self._pending) > MAX_PENDING_WORDS:
+                self._sorted = sorted(self._postings)
+            else:
+                for word in self._pending:
+                    index = bisect.bisect_left(self._sorted, word)
+                    if index == len(self._sorted) or self._sorted[index] != word:
+                        self._sorted.insert(index, word)
+            self._pending = []
+        return self._sorted
+
+    def _prefixed(self, prefix: str) -> Iterator[str]:
+        sorted_words = self._sorted_words()
+        for index in range(bisect.bisect_left(sorted_words, prefix), len(sorted_words)):
+            word = sorted_words[index]
+            if not word.startswith(prefix):
+                return
+            yield from self._postings.get(word, ())
+
+    def search(self, query: str, limit: int | None = AUTOCOMPLETE_LIMIT, predicate: Callable[[dict], bool] = None) -> list[dict]:
+        query_words = words(query)
+        if not query_words:
+            candidates = iter(self.entries)
+        else:
+            # drive the lookup off the longest word, it has the narrowest range
+            query_words.sort(key=len, reverse=True)
+            candidates = self._prefixed(query_words[0])
+        results = []
+        seen = set()
+        for key in candidates:
+            if key in seen:
+                continue
+            seen.add(key)
+            name_words = self._words.get(key, [])
+            if not all(any(word.startswith(query_word) for word in name_words) for query_word in query_words[1:]):
+                continue
+            entry = self.entries[key]
+            if predicate is not None and not predicate(entry):
+                continue
+            results.append(entry)
+            if len(results) == limit:
+                break
+        return results
+
+
+class NameIndex:
+    def __init__(self):
+        self.players = PrefixIndex()
+        self.legends = PrefixIndex()
+        self.clans: dict[int, PrefixIndex] = defaultdict(PrefixIndex)
+        self._clan_members: dict[str, set[str]] = defaultdict(set)
+        self._clan_servers: dict[str, set[int]] = defaultdict(set)
+        self._families: dict[int, PrefixIndex] = {}
+        self.ready = False
+        # every `player_search` document is loaded, not only legends & family clan members
+        self.all_players = False
+
+    def update_player(self, document: dict):
+        """Add or update a `player_search` document (i.e from a tracking event)"""
+        tag = document.get('tag')
+        if not tag:
+            return
+        entry = {field: document.get(field) for field in PLAYER_FIELDS}
+        previous = self.players.entries.get(tag)
+        self.players.add(tag, entry.get('name'), entry)
+        if entry.get('league') == 'Legend League':
+            self.legends.add(tag, entry.get('name'), entry)
+        else:
+            self.legends.remove(tag)
+
+        old_clan = previous.get('clan') if previous else None
+        new_clan = entry.get('clan')
+        if old_clan and old_clan != new_clan:
+            self._clan_members[old_clan].discard(tag)
+            for server in self._clan_servers.get(old_clan, ()):
+                if server in self._families:
+                    self._families[server].remove(tag)
+        if new_clan:
+            self._clan_members[new_clan].add(tag)
+            for server in self._clan_servers.get(new_clan, ()):
+                if server in self._families:
+                    self._families[server].add(tag, entry.get('name'), entry)
+
+    def remove_player(self, tag: str):
+        previous = self.players.entries.get(tag)
+        self.players.remove(tag)
+        self.legends.remove(tag)
+        if previous and previous.get('clan'):
+            self._clan_members[previous.get('clan')].discard(tag)
+        for family in self._families.values():
+            family.remove(tag)
+
+    def update_clan(self, document: dict):
+        """Add or update a `clan_db` document (a clan linked to a server)"""
+        server, tag = document.get('server'), document.get('tag')
+        if server is None or not tag:
+            return
+        self.clans[server].add(tag, document.get('name'), {'tag': tag, 'name': document.get('name')})
+        self._clan_servers[tag].add(server)
+        self._families.pop(server, None)
+
+    def remove_clan(self, server: int, tag: str):
+        if server in self.clans:
+            self.clans[server].remove(tag)
+        if tag in self._clan_servers:
+            self._clan_servers[tag].discard(server)
+        self._families.pop(server, None)
+
+    def search_clans(self, server: int, query: str, limit: int | None = AUTOCOMPLETE_LIMIT) -> list[dict]:
+        clans = self.clans.get(server)
+        if clans is None:
+            return []
+        if not words(query):
+            return sorted(clans.entries.values(), key=lambda clan: normalize(clan.get('name')))[:limit]
+        return clans.search(query, limit=limit)
+
+    @property
+    def clan_tags(self) -> list[str]:
+        return [tag for tag, servers in self._clan_servers.items() if servers]
+
+    def family(self, server: int) -> PrefixIndex:
+        family = self._families.get(server)
+        if family is None:
+            family = self._families[server] = PrefixIndex()
+            clans = self.clans.get(server)
+            for clan_tag in clans.entries if clans is not None else ():
+                for tag in self._clan_members.get(clan_tag, ()):
+                    entry = self.players.entries.get(tag)
+                    if entry is not None:
+                        family.add(tag, entry.get('name'), entry)
+        return family
@@ -9,6 +9,8 @@ import aiohttp
 import disnake
 from typing import Any, Dict, List
 
+from utility.http import get_http_client
+
 
 async def fetch_prep_stats(base_url: str, clan_tag: str, include_heroes: bool = False, hero_sample_size: int = 30, token: str | None = None) -> Dict[str, Any]:
     params = {
@@ -20,11 +22,10 @@ async def fetch_prep_stats(base_url: str, clan_tag: str, include_heroes: bool =
     if token:
         headers['Authorization'] = f'Bearer {token}'
     url = f"{base_url.rstrip('/')}/war/prep-stats"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params, headers=headers, timeout=20) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
-            return data.get('data') or data
+    async with get_http_client().get(url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+        return data.get('data') or data
 
 
 def build_prep_embeds(data: Dict[str, Any]) -> list[disnake.Embed]:
@@ -0,0 +1,160 @@
+"""Long-lived worker pool for CPU-bound rendering (Plotly/Kaleido graphs and PIL images).
+
+Rendering holds the GIL for hundreds of milliseconds per image, so jobs run in separate
+processes that are started once and warmed up (PIL, plotly and Kaleido's browser) instead of
+a fresh executor per image. At most `queue_size` jobs are queued or running at a time, callers
+beyond that wait for a slot, and every job has a timeout. The instance is created on
+CustomClient at startup; helpers without a bot handle use `get_render_pool()`.
+"""
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from background.metrics_server import observe_render_job
+
+
+_render_pool: 'RenderPool | None' = None
+
+
+def _warm_worker():
+    from PIL import Image, ImageDraw, ImageFont  # noqa: F401
+
+    try:
+        import plotly.io as pio
+
+        # first Kaleido export starts its browser, pay that once per worker rather than on a user's graph
+        pio.to_image({'data': [], 'layout': {'width': 10, 'height': 10}}, format='png')
+    except Exception:
+        pass
+
+
+def render_figure(figure: dict, format: str = 'png', scale: float = 1.0) -> bytes:
+    import plotly.io as pio
+
+    return pio.to_image(figure, format=format, scale=scale)
+
+
+def encode_image(image, size: tuple[int, int] | None = None, format: str = 'png', **save_kwargs) -> bytes:
+    if size is not None:
+        image = image.resize(size)
+    temp = io.BytesIO()
+    image.save(temp, format=format, **save_kwargs)
+    return temp.getvalue()
+
+
+class RenderPool:
+    def __init__(self, workers: int = 2, queue_size: int = 64, timeout: float = 60):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.timeout = timeout
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(self.queue_size)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'RenderPool':
+        return cls(workers=config.render_workers, queue_size=config.render_queue_size, timeout=config.render_timeout)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # workers come from a forkserver: a clean single-threaded process, so they never inherit the bot's db/http threads
+        # (also when the pool is rebuilt after a crash). Workers re-import the entry script, which is why main.py stays light
+        if self._executor is None:
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['utility.render'])
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_warm_worker)
+        return self._executor
+
+    def start(self):
+        """Fork and warm the workers ahead of the first job"""
+        for _ in range(self.workers):
+            self.executor.submit(int)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'waiting': self.waiting,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+        }
+
+    async def run(self, func: Callable[..., Any], *args, kind: str = 'image', timeout: float | None = None, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` in a worker, `func` and its arguments must be picklable"""
+        timeout = self.timeout if timeout is None else timeout
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        status = 'ok'
+        future = None
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, _call, func, args, kwargs)
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            self.timed_out += 1
+            raise
+        except BrokenProcessPool:
+            status = 'error'
+            self.failed += 1
+            self._executor = None
+            raise
+        except Exception:
+            status = 'error'
+            self.failed += 1
+            raise
+        finally:
+            if status == 'ok':
+                self.completed += 1
+            if future is not None and not future.done():
+                # the worker can't be interrupted, the job keeps its slot until it finishes and the result is dropped
+                future.add_done_callback(self._release_abandoned)
+            else:
+                self.in_flight -= 1
+                self._slots.release()
+            observe_render_job(kind=kind, status=status, seconds=time.perf_counter() - queued_at, pool_stats=self.stats())
+
+    def _release_abandoned(self, future: asyncio.Future):
+        if not future.cancelled():
+            future.exception()
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+def _call(func: Callable[..., Any], args: tuple, kwargs: dict):
+    return func(*args, **kwargs)
+
+
+def create_render_pool(config) -> RenderPool:
+    global _render_pool
+    _render_pool = RenderPool.from_config(config)
+    return _render_pool
+
+
+def get_render_pool() -> RenderPool:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = RenderPool()
+    return _render_pool
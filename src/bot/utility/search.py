@@ -20,7 +20,13 @@ async def search_results(bot: CustomClient, query, use_cache=True):
     return tags
 
 
+def player_choice(document: dict) -> str:
+    return f'{create_superscript(document.get("th"))}{document.get("name")} ({document.get("clan_name")})' + ' | ' + document.get('tag')
+
+
 async def search_name_with_tag(bot: CustomClient, query: str, poster=False):
+    if bot.name_index.ready:
+        return [player_choice(document) for document in bot.name_index.legends.search(query)]
     names = []
     if query == '':
         pipeline = [{'$match': {'league': 'Legend League'}}, {'$limit': 25}]
@@ -40,11 +46,13 @@ async def search_name_with_tag(bot: CustomClient, query: str, poster=False):
         ]
     results = await bot.player_search.aggregate(pipeline=pipeline).to_list(length=None)
     for document in results:
-        names.append(f'{create_superscript(document.get("th"))}{document.get("name")} ({document.get("clan_name")})' + ' | ' + document.get('tag'))
+        names.append(player_choice(document))
     return names
 
 
 async def family_names(bot: CustomClient, query: str, guild):
+    if bot.name_index.ready:
+        return [player_choice(document) for document in bot.name_index.family(guild.id).search(query)]
     clan_tags = await bot.clan_db.distinct('tag', filter={'server': guild.id})
     names = []
     if query == '':
@@ -65,12 +73,13 @@ async def family_names(bot: CustomClient, query: str, guild):
         ]
     results = await bot.player_search.aggregate(pipeline=pipeline).to_list(length=None)
     for document in results:
-        clan = document.get('clan_name')
-        names.append(f'{create_superscript(document.get("th"))}{document.get("name")} ({clan})' + ' | ' + document.get('tag'))
+        names.append(player_choice(document))
     return names
 
 
 async def all_names(bot: CustomClient, query: str):
+    if bot.name_index.all_players:
+        return [player_choice(document) for document in bot.name_index.players.search(query)]
     names = []
     if query == '':
         pipeline = [{'$match': {}}, {'$limit': 25}]
@@ -89,6 +98,5 @@ async def all_names(bot: CustomClient, query: str):
         ]
     results = await bot.player_search.aggregate(pipeline=pipeline).to_list(length=None)
     for document in results:
-        clan = document.get('clan_name')
-        names.append(f'{create_superscript(document.get("th"))}{document.get("name")} ({clan})' + ' | ' + document.get('tag'))
+        names.append(player_choice(document))
     return names
@@ -0,0 +1,142 @@
+"""Per-season rollups behind the summary, donation and activity boards.
+
+A board used to load every member's stats and sort the whole family once per metric to show the top
+few. A rollup folds the members' season stats once into the top (and bottom) `size` entries of each
+metric plus the totals, and is stored as one small document per (kind, owner, season, member set).
+Boards read that document, it is rebuilt when it goes stale. A past season's rollup no longer changes
+once it has been built after the season ended, adding or removing a clan changes the member set and
+so the document a board reads.
+"""
+import hashlib
+import heapq
+from collections import defaultdict
+from typing import Iterable
+
+
+ROLLUP_SIZE = 50
+
+# player_stats sections keyed by season that the summary ranks as is
+SUMMARY_SEASON_METRICS = ('gold', 'elixir', 'dark_elixir', 'activity', 'attack_wins', 'season_trophies')
+
+
+def rollup_id(kind: str, owner: str | int, season: str, members: Iterable[str]) -> str:
+    """`members` are the tags (players or clans) the rollup is built from, in any order"""
+    digest = hashlib.sha1(','.join(sorted(set(members))).encode()).hexdigest()[:16]
+    return f'{kind}:{owner}:{season}:{digest}'
+
+
+def summary_metrics(stats: dict, season: str, raid_weeks: Iterable[str]) -> dict[str, int]:
+    """The summary's metrics for one `player_stats` document (projected to the season)"""
+    metrics = {metric: (stats.get(metric) or {}).get(season, 0) for metric in SUMMARY_SEASON_METRICS}
+    donations = (stats.get('donations') or {}).get(season) or {}
+    metrics['donated'] = donations.get('donated', 0)
+    metrics['received'] = donations.get('received', 0)
+    weeks = [(stats.get('capital_gold') or {}).get(week) or {} for week in raid_weeks]
+    metrics['capital_donated'] = sum(sum(week.get('donate') or []) for week in weeks)
+    metrics['capital_raided'] = sum(sum(week.get('raid') or []) for week in weeks)
+    return metrics
+
+
+class SeasonRollup:
+    def __init__(self):
+        # tag -> (name, metric -> value), a player seen more than once (i.e in two clans) is summed
+        self.players: dict[str, tuple[str | None, dict[str, int]]] = {}
+
+    def add(self, tag: str, name: str | None, metrics: dict[str, int]):
+        current_name, current = self.players.get(tag, (None, defaultdict(int)))
+        for metric, value in metrics.items():
+            current[metric] += value or 0
+        self.players[tag] = (name or current_name, current)
+
+    def document(self, size: int = ROLLUP_SIZE, ascending: Iterable[str] = (), details: bool = False) -> dict:
+        """
+        `ascending` metrics also keep their lowest `size` entries, for boards sorted low to high.
+        `details` keeps every metric of each ranked player, for boards showing more than one column
+        """
+        entries = defaultdict(list)
+        totals = defaultdict(int)
+        for tag, (name, metrics) in self.players.items():
+            for metric, value in metrics.items():
+                entries[metric].append((value, tag, name))
+                totals[metric] += value
+        # heaps keep this at O(members x log size) per metric, only `size` entries are ever ordered
+        top = {metric: [list(entry) for entry in heapq.nlargest(size, values)] for metric, values in entries.items()}
+        bottom = {metric: [list(entry) for entry in heapq.nsmallest(size, entries[metric])] for metric in ascending if metric in entries}
+        document = {'size': size, 'count': len(self.players), 'totals': dict(totals), 'top': top, 'bottom': bottom}
+        if details:
+            ranked_tags = {entry[1] for lists in (top, bottom) for values in lists.values() for entry in values}
+            document['players'] = {tag: dict(self.players[tag][1]) for tag in ranked_tags}
+        return document
+
+
+def ranked(rollup: dict, metric: str, limit: int, descending: bool = True) -> list[tuple[int, str, str | None]]:
+    """(value, tag, name) of the `limit` highest (or lowest) players for `metric`"""
+    entries = rollup.get('top' if descending else 'bottom', {}).get(metric, [])
+    return [tuple(entry) for entry in entries[:limit]]
+
+
+def war_stars_pipeline(member_tags: list[str], season_start: str, season_end: str, limit: int) -> list[dict]:
+    """Top war stars of `member_tags` in the season's non friendly wars, each war counted once"""
+    return [
+        {
+            '$match': {
+                '$and': [
+                    {
+                        '$or': [
+                            {'data.clan.members.tag': {'$in': member_tags}},
+                            {'data.opponent.members.tag': {'$in': member_tags}},
+                        ]
+                    },
+                    {'data.preparationStartTime': {'$gte': season_start}},
+                    {'data.preparationStartTime': {'$lte': season_end}},
+                    {'type': {'$ne': 'friendly'}},
+                ]
+            }
+        },
+        {
+            '$project': {
+                '_id': 0,
+                'uniqueKey': {
+                    '$concat': [
+                        {
+                            '$cond': {
+                                'if': {'$lt': ['$data.clan.tag', '$data.opponent.tag']},
+                                'then': '$data.clan.tag',
+                                'else': '$data.opponent.tag',
+                            }
+                        },
+                        {
+                            '$cond': {
+                                'if': {'$lt': ['$data.opponent.tag', '$data.clan.tag']},
+                                'then': '$data.opponent.tag',
+                                'else': '$data.clan.tag',
+                            }
+                        },
+                        '$data.preparationStartTime',
+                    ]
+                },
+                'data': 1,
+            }
+        },
+        {'$group': {'_id': '$uniqueKey', 'data': {'$first': '$data'}}},
+        {'$project': {'members': {'$concatArrays': ['$data.clan.members', '$data.opponent.members']}}},
+        {'$unwind': '$members'},
+        {'$match': {'members.tag': {'$in': member_tags}}},
+        {
+            '$project': {
+                '_id': 0,
+                'tag': '$members.tag',
+                'name': '$members.name',
+                'stars': {'$sum': '$members.attacks.stars'},
+            }
+        },
+        {
+            '$group': {
+                '_id': '$tag',
+                'name': {'$last': '$name'},
+                'totalStars': {'$sum': '$stars'},
+            }
+        },
+        {'$sort': {'totalStars': -1}},
+        {'$limit': limit},
+    ]
@@ -0,0 +1,92 @@
+"""Server settings cached in every cluster, invalidated on write.
+
+Settings (the `server_db` aggregation with its role/clan lookups, and the embed color) live in the
+process-local `SETTINGS_CACHE`. A write calls `invalidate`, which drops the server's entries here and
+publishes the server id, every other cluster drops them on receipt. The TTL only bounds writes made
+outside the bot (and anything missed while the subscription was down).
+"""
+import asyncio
+from typing import Iterable
+
+
+INVALIDATION_CHANNEL = 'server-settings-invalidate'
+
+# per-server entries dropped together (the eval plan is built from the settings)
+SETTINGS_KEYS = ('server-settings', 'embed-color', 'eval-plan')
+
+RESUBSCRIBE_DELAY = 5
+
+
+class SettingsCache:
+    def __init__(self, cache, redis, ttl: int = 600):
+        self.cache = cache
+        self.redis = redis
+        self.ttl = ttl
+        self._servers: set[int] = set()
+
+    @classmethod
+    def from_config(cls, config, cache, redis) -> 'SettingsCache':
+        return cls(cache=cache, redis=redis, ttl=config.settings_cache_ttl)
+
+    @staticmethod
+    def key(kind: str, server_id: int) -> str:
+        return f'{server_id}-{kind}'
+
+    def get(self, kind: str, server_id: int):
+        return self.cache.get(self.key(kind, server_id))
+
+    def set(self, kind: str, server_id: int, value):
+        self._servers.add(server_id)
+        self.cache.ttl(self.key(kind, server_id), value, self.ttl)
+
+    def drop(self, server_id: int):
+        self._servers.discard(server_id)
+        for kind in SETTINGS_KEYS:
+            self.cache.pop(self.key(kind, server_id), None)
+
+    def clear(self):
+        for server_id in list(self._servers):
+            self.drop(server_id)
+
+    async def invalidate(self, *server_ids: int | None):
+        """Drop these servers' settings in every cluster, call after writing to them"""
+        server_ids = [server_id for server_id in server_ids if server_id is not None]
+        if not server_ids:
+            return
+        for server_id in server_ids:
+            self.drop(server_id)
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, ','.join(str(server_id) for server_id in server_ids))
+        except Exception:
+            pass
+
+    async def listen(self):
+        """Apply invalidations published by other clusters, runs for the life of the bot"""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    data = message.get('data')
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    for server_id in self._parse(data):
+                        self.drop(server_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            # invalidations published while disconnected are lost, nothing cached before can be trusted
+            self.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    @staticmethod
+    def _parse(data) -> Iterable[int]:
+        for server_id in str(data or '').split(','):
+            if server_id.strip().isdigit():
+                yield int(server_id)
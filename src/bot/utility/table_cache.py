@@ -0,0 +1,112 @@
+"""Disk cache for rendered table images, keyed by a hash of the table's content.
+
+The same board (same rows, badges, logo & title) always renders to the same png, so a board that
+hasn't changed since the last click is served from disk instead of being drawn again. Every change
+to a board is a new key, so the directory is bounded in bytes and the least recently read images
+are removed first. Reads and writes block, callers on the event loop run them in a thread.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+
+_table_cache: 'TableCache | None' = None
+
+
+def table_key(table: dict) -> str:
+    """Stable hash of everything that ends up in the image"""
+    content = {
+        'columns': table.get('columns', []),
+        'rows': table.get('rows', []),
+        'badges': table.get('badges', []),
+        'logo': table.get('logo'),
+        'title': table.get('title', ''),
+    }
+    return hashlib.sha1(json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+class TableCache:
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'table-cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = sum(size for _, size, _ in self._files())
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'TableCache':
+        return cls(cache_dir=config.table_cache_dir, max_bytes=config.table_cache_bytes)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+    def _files(self) -> list[tuple[float, int, str]]:
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.png'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # mtime is the last read, pruning removes the least recently read images
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        try:
+            temp = f'{path}.tmp'
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.prune()
+
+    def prune(self):
+        """Remove the least recently read images until the directory is back under 3/4 of `max_bytes`"""
+        files = sorted(self._files())
+        self.size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self.size <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def create_table_cache(config) -> TableCache:
+    global _table_cache
+    _table_cache = TableCache.from_config(config)
+    return _table_cache
+
+
+def get_table_cache() -> TableCache:
+    global _table_cache
+    if _table_cache is None:
+        _table_cache = TableCache()
+    return _table_cache
@@ -0,0 +1,41 @@
+"""Tenure (status) roles: which configured role a member should hold and when that next changes.
+
+Tenure counts calendar months since joining (a member who joined on the 31st has 1 month on the 1st),
+so a member's roles only change on the first of the month their next threshold is reached.
+"""
+from datetime import datetime, timezone
+
+
+def tenure_months(joined_at: datetime, now: datetime) -> int:
+    return (now.year - joined_at.year) * 12 + (now.month - joined_at.month)
+
+
+def month_start(joined_at: datetime, months: int) -> datetime:
+    """Start of the month in which a member who joined at `joined_at` reaches `months` of tenure"""
+    year, month = divmod(joined_at.month - 1 + months, 12)
+    return datetime(joined_at.year + year, month + 1, 1, tzinfo=timezone.utc)
+
+
+def earned_role(status_roles: list[dict], months: int) -> dict | None:
+    """The highest role (by months) that `months` of tenure earns"""
+    earned = [role for role in status_roles if months >= role['months']]
+    return max(earned, key=lambda role: role['months']) if earned else None
+
+
+def next_change(status_roles: list[dict], joined_at: datetime, now: datetime) -> datetime | None:
+    """When the member's earned role next changes, `None` once the top threshold is reached"""
+    months = tenure_months(joined_at, now)
+    upcoming = [role['months'] for role in status_roles if role['months'] > months]
+    return month_start(joined_at, min(upcoming)) if upcoming else None
+
+
+def tenure_role_changes(status_roles: list[dict], months: int, current_role_ids: set[int]) -> tuple[int | None, set[int]]:
+    """
+    (role id to add, role ids to remove) for a member, only the highest earned role is kept, every
+    other configured role is removed
+    """
+    earned = earned_role(status_roles, months)
+    earned_id = earned['id'] if earned else None
+    add = earned_id if earned_id is not None and earned_id not in current_role_ids else None
+    remove = {role['id'] for role in status_roles if role['id'] != earned_id and role['id'] in current_role_ids}
+    return add, remove
@@ -63,6 +63,7 @@ async def update_war_message(bot: CustomClient, war: coc.ClanWar, db_clan: Datab
                 }
             },
         )
+        await bot.settings_cache.invalidate(db_clan.server_id)
 
 
 def war_start_embed(new_war: coc.ClanWar):